@@ -2,6 +2,7 @@ const express = require("express")
 const cors = require("cors")
 const { spawn } = require("child_process")
 const path = require("path")
+const readline = require("readline")
 require("dotenv").config()
 
 const app = express()
@@ -31,8 +32,10 @@ app.use(express.static(path.join(__dirname, "..", "frontend")))
 
 
 app.use((req, res, next) => {
-  console.log(`[v0] ${req.method} ${req.url}`)
-  console.log(`[v0] Headers:`, req.headers)
+  // Aurora predictions are the hot path, logged only at debug level
+  const logRequest = req.url.startsWith("/api/predict/aurora") ? auroraDebug : console.log
+  logRequest(`[v0] ${req.method} ${req.url}`)
+  logRequest(`[v0] Headers:`, req.headers)
   next()
 })
 
@@ -40,11 +43,208 @@ app.get("/api/health", (req, res) => {
   res.json({ status: "ok", message: "Server is running" })
 })
 
+// Long-running Python prediction server (scripts/aurora_server.py).
+// It loads the aurora model once and answers newline-delimited JSON requests,
+// so a prediction no longer pays for a fresh interpreter and model load.
+const AURORA_REQUEST_TIMEOUT_MS = 10000
+// Per-prediction logs only at AURORA_LOG_LEVEL=debug, the level setting the Python side reads too
+const AURORA_DEBUG = (process.env.AURORA_LOG_LEVEL || "").toLowerCase() === "debug"
+// A server that exits is restarted on the next request after a delay that
+// doubles with each recent failure, up to a cap. After AURORA_FAILURE_LIMIT
+// failures within AURORA_FAILURE_WINDOW_MS it is not restarted again. Requests
+// made while it is down get a 503 instead of spawning another one.
+const AURORA_RESTART_DELAY_MS = 100
+const AURORA_MAX_RESTART_DELAY_MS = 10000
+const AURORA_FAILURE_LIMIT = 5
+const AURORA_FAILURE_WINDOW_MS = 60000
+let auroraServer = null
+let auroraNextId = 1
+const auroraPending = new Map()
+const auroraFailures = []
+let auroraRestartAt = 0
+let auroraGaveUp = false
+
+class AuroraUnavailableError extends Error {
+  constructor(message, retryAfterMs) {
+    super(message)
+    this.retryAfterMs = retryAfterMs
+  }
+}
+
+function auroraDebug(...args) {
+  if (AURORA_DEBUG) console.log(...args)
+}
+
+function recordAuroraFailure() {
+  const now = Date.now()
+  auroraFailures.push(now)
+  while (auroraFailures.length && auroraFailures[0] <= now - AURORA_FAILURE_WINDOW_MS) auroraFailures.shift()
+
+  if (auroraFailures.length >= AURORA_FAILURE_LIMIT) {
+    auroraGaveUp = true
+    console.error(
+      `[v0] Aurora prediction server failed ${auroraFailures.length} times in ${AURORA_FAILURE_WINDOW_MS / 1000}s, not restarting it`,
+    )
+    return
+  }
+  const delay = Math.min(AURORA_RESTART_DELAY_MS * 2 ** (auroraFailures.length - 1), AURORA_MAX_RESTART_DELAY_MS)
+  auroraRestartAt = now + delay
+}
+
+function getAuroraServer() {
+  if (auroraServer) return auroraServer
+  if (auroraGaveUp) {
+    throw new AuroraUnavailableError("Prediction server failed too often and was not restarted")
+  }
+  const wait = auroraRestartAt - Date.now()
+  if (wait > 0) {
+    throw new AuroraUnavailableError("Prediction server is restarting", wait)
+  }
+
+  const pythonScript = path.join(__dirname, "..", "scripts", "aurora_server.py")
+  const child = spawn("python3", [pythonScript])
+  const lines = readline.createInterface({ input: child.stdout })
+
+  lines.on("line", (line) => {
+    let response
+    try {
+      response = JSON.parse(line)
+    } catch (parseError) {
+      console.error("[v0] Failed to parse Python output:", line)
+      return
+    }
+
+    const pending = auroraPending.get(response.id)
+    if (!pending) return
+    auroraPending.delete(response.id)
+    clearTimeout(pending.timer)
+
+    delete response.id
+    pending.resolve(response)
+  })
+
+  child.stderr.on("data", (data) => {
+    console.error("[v0] Python error:", data.toString())
+  })
+
+  let failed = false
+  const failPending = (error) => {
+    if (auroraServer === child) auroraServer = null
+    // The error, stdin error and close events of one child count as one failure
+    if (!failed) {
+      failed = true
+      recordAuroraFailure()
+    }
+    for (const pending of auroraPending.values()) {
+      clearTimeout(pending.timer)
+      pending.reject(error)
+    }
+    auroraPending.clear()
+  }
+
+  child.on("error", (error) => failPending(new AuroraUnavailableError(error.message)))
+  child.stdin.on("error", failPending)
+  child.on("close", (code) => {
+    console.error("[v0] Aurora prediction server exited with code", code)
+    failPending(new AuroraUnavailableError(`Prediction server exited with code ${code}`))
+  })
+
+  auroraServer = child
+  return child
+}
+
+function sendAuroraRequest(request) {
+  return new Promise((resolve, reject) => {
+    const server = getAuroraServer()
+    const id = auroraNextId++
+
+    const timer = setTimeout(() => {
+      auroraPending.delete(id)
+      reject(new Error("Prediction timed out"))
+    }, AURORA_REQUEST_TIMEOUT_MS)
+
+    auroraPending.set(id, { resolve, reject, timer })
+    server.stdin.write(JSON.stringify({ id, ...request }) + "\n")
+  })
+}
+
+// 503 with Retry-After while the prediction server is down, 500 otherwise
+function sendAuroraError(res, error, message) {
+  if (error instanceof AuroraUnavailableError) {
+    if (error.retryAfterMs !== undefined) res.set("Retry-After", String(Math.ceil(error.retryAfterMs / 1000)))
+    return res.status(503).json({ error: message, details: error.message })
+  }
+  res.status(500).json({ error: message, details: error.message })
+}
+
+// With a time, the server answers from the forecast cube of OVATION snapshots
+function requestAuroraPrediction(latitude, longitude, time) {
+  return sendAuroraRequest(time === undefined ? { latitude, longitude } : { latitude, longitude, time })
+}
+
+// Timing spans and cache counters of the prediction server, as JSON or,
+// with ?format=prometheus, as Prometheus text
+app.get("/api/predict/aurora/stats", async (req, res) => {
+  try {
+    const format = req.query.format === "prometheus" ? "prometheus" : "json"
+    const result = await sendAuroraRequest({ stats: format })
+    if (!result.success) {
+      return res.status(500).json({ error: "Stats unavailable", details: result.error })
+    }
+
+    if (format === "prometheus") {
+      res.type("text/plain; version=0.0.4").send(result.prometheus)
+    } else {
+      res.json(result.stats)
+    }
+  } catch (error) {
+    console.error("[v0] Error reading aurora stats:", error)
+    sendAuroraError(res, error, "Stats unavailable")
+  }
+})
+
+// Max, mean, percentiles and best spot over a region or route. The body is
+// one of { bbox: [south, west, north, east] }, { polygon: [[lat, lon], ...] }
+// or { path: [[lat, lon], ...] }, with optional percentiles, resolution,
+// step_km and time (see scripts/aurora_regions.py)
+app.post("/api/predict/aurora/aggregate", async (req, res) => {
+  try {
+    const result = await sendAuroraRequest({ aggregate: req.body })
+    if (!result.success) {
+      const status = result.error && result.error.startsWith("Invalid input") ? 400 : 500
+      return res.status(status).json({ error: "Aggregate failed", details: result.error })
+    }
+
+    res.json(result)
+  } catch (error) {
+    console.error("[v0] Error in aurora aggregate:", error)
+    sendAuroraError(res, error, "Aggregate failed")
+  }
+})
+
+// Closest grid cells whose predicted intensity reaches a threshold. The body
+// is { latitude, longitude, threshold } with optional limit, max_distance_km
+// and time (see scripts/aurora_nearby.py)
+app.post("/api/predict/aurora/nearest", async (req, res) => {
+  try {
+    const result = await sendAuroraRequest({ nearest: req.body })
+    if (!result.success) {
+      const status = result.error && result.error.startsWith("Invalid input") ? 400 : 500
+      return res.status(status).json({ error: "Nearest search failed", details: result.error })
+    }
+
+    res.json(result)
+  } catch (error) {
+    console.error("[v0] Error in aurora nearest search:", error)
+    sendAuroraError(res, error, "Nearest search failed")
+  }
+})
+
 app.post("/api/predict/aurora", async (req, res) => {
   try {
-    const { latitude, longitude } = req.body
+    const { latitude, longitude, time } = req.body
 
-    console.log("[v0] Aurora prediction request:", { latitude, longitude })
+    auroraDebug("[v0] Aurora prediction request:", { latitude, longitude, time })
 
     if (latitude === undefined || longitude === undefined) {
       return res.status(400).json({ error: "Latitude and longitude are required" })
@@ -55,40 +255,18 @@ app.post("/api/predict/aurora", async (req, res) => {
       return res.status(400).json({ error: "Invalid coordinates" })
     }
 
-    // Call Python script
-    const pythonScript = path.join(__dirname, "..", "scripts", "aurora_prediction.py")
-    const pythonProcess = spawn("python3", [pythonScript, latitude.toString(), longitude.toString()])
-
-    let dataString = ""
-    let errorString = ""
-
-    pythonProcess.stdout.on("data", (data) => {
-      dataString += data.toString()
-    })
-
-    pythonProcess.stderr.on("data", (data) => {
-      errorString += data.toString()
-      console.error("[v0] Python error:", data.toString())
-    })
+    // Ask the long-running Python prediction server
+    const result = await requestAuroraPrediction(latitude, longitude, time)
+    if (!result.success) {
+      console.error("[v0] Python prediction failed:", result.error)
+      return res.status(500).json({ error: "Prediction failed", details: result.error })
+    }
 
-    pythonProcess.on("close", (code) => {
-      if (code !== 0) {
-        console.error("[v0] Python script failed:", errorString)
-        return res.status(500).json({ error: "Prediction failed", details: errorString })
-      }
-
-      try {
-        const result = JSON.parse(dataString)
-        console.log("[v0] Aurora prediction result:", result)
-        res.json(result)
-      } catch (parseError) {
-        console.error("[v0] Failed to parse Python output:", dataString)
-        res.status(500).json({ error: "Failed to parse prediction result" })
-      }
-    })
+    auroraDebug("[v0] Aurora prediction result:", result)
+    res.json(result)
   } catch (error) {
     console.error("[v0] Error in aurora prediction:", error)
-    res.status(500).json({ error: "Internal server error", details: error.message })
+    sendAuroraError(res, error, "Prediction failed")
   }
 })
 
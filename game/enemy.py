@@ -10,6 +10,7 @@ class Enemy(pygame.sprite.Sprite):
         super().__init__(groups)
         self.sprite_type = 'enemy'
         self.obstacle_sprites = obstacle_sprites
+        self.collision_grid = None  # floor blocks TileGrid, set by the spawner
         
         # Create a simple enemy graphic (you can replace with an image)
         self.original_image = pygame.image.load(resource_path('graphics/enemy.png'))  # GRAPHIC NEEDED: Replace with enemy sprite
@@ -85,6 +86,30 @@ class Enemy(pygame.sprite.Sprite):
 
     def check_collisions(self, direction):
         """Simple collision detection with obstacles"""
+        # floor blocks: only the tiles under the hitbox, pushed out to the side of the tile centre the enemy is on.
+        # Tiles are visited once each in map order, like the obstacle sprites were, including ones a push moves into
+        if self.collision_grid is not None:
+            last = None
+            while True:
+                tiles = [tile for tile in self.collision_grid.solid_tiles(self.hitbox)
+                         if last is None or (tile.top, tile.left) > last]
+                if not tiles:
+                    break
+                tile = tiles[0]
+                last = (tile.top, tile.left)
+                if direction == 'horizontal':
+                    if self.x > tile.centerx:
+                        self.hitbox.left = tile.right
+                    else:
+                        self.hitbox.right = tile.left
+                    self.x = self.hitbox.centerx
+                else:  # vertical
+                    if self.y > tile.centery:
+                        self.hitbox.top = tile.bottom
+                    else:
+                        self.hitbox.bottom = tile.top
+                    self.y = self.hitbox.centery
+
         for sprite in self.obstacle_sprites:
             if hasattr(sprite, 'hitbox'):
                 if isinstance(sprite.hitbox, CircleHitbox):
@@ -166,6 +191,8 @@ class Enemy(pygame.sprite.Sprite):
         # Notify story manager
         if hasattr(self, 'level') and hasattr(self.level, 'story_manager'):
             self.level.story_manager.on_enemy_killed()
+        if hasattr(self, 'level'):
+            self.level.remove_from_chunks(self)
         self.kill()
 
     def enemy_update(self, player):
@@ -216,4 +243,5 @@ class EnemySpawner:
             enemy = Enemy(spawn_x, spawn_y, [], self.level.obstacle_sprites)
             enemy.level = self.level
             enemy.bullet_group = self.level.bullet_group
-            self.level.add_to_chunk(enemy, spawn_x, spawn_y)
+            enemy.collision_grid = self.level.collision_grid
+            self.level.add_to_chunk(enemy, spawn_x, spawn_y, dynamic=True)
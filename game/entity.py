@@ -7,6 +7,7 @@ class Entity(pygame.sprite.Sprite):
         self.frame_index = 0
         self.animation_speed = 0.1
         self.direction = pygame.math.Vector2()
+        self.collision_grid = None  # floor blocks TileGrid, set by the level
 
     def move(self, direction, speed):
         if direction.magnitude() != 0:
@@ -27,6 +28,11 @@ class Entity(pygame.sprite.Sprite):
         self.rect.center = self.hitbox.center
 
     def collision(self, direction, movement_delta=None):
+        # floor blocks: rect-vs-grid against only the tiles under the hitbox
+        if self.collision_grid is not None:
+            axis_direction = self.direction.x if direction == 'horizontal' else self.direction.y
+            self.collision_grid.resolve(self.hitbox, direction, axis_direction if movement_delta is None else movement_delta)
+
         if direction == 'horizontal':
             for sprite in self.obstacle_sprites:
                 if sprite.hitbox.colliderect(self.hitbox):
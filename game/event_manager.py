@@ -346,6 +346,7 @@ class EventManager:
             self.events.remove(event)
         if event in self.level.events:
             self.level.events.remove(event)
+        self.level.remove_from_chunks(event)
         event.kill()
     
     def clear_all_events(self):
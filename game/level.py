@@ -2,7 +2,7 @@ import pygame
 import state
 from player import Player  
 from enemy import Enemy, EnemySpawner
-from tile import Tile
+from tile import Tile, TileGrid
 from settings import *
 from utility import import_csv_layout, import_image_from_folder, resource_path
 from random import choice
@@ -14,6 +14,7 @@ from dialog import StoryManager
 from event_manager import EventManager
 from debug import debug
 from quiz import Quiz
+from spatial_hash import SpatialHash
 
 class LevelManager:
     def __init__(self):
@@ -55,7 +56,7 @@ class Level:
         # sprite groups
         self.visible_sprites = YSortCameraGroup()
         self.obstacle_sprites = pygame.sprite.Group() 
-        self.bullet_group = pygame.sprite.Group()
+        self.bullet_group = BulletGroup(self.visible_sprites)
         self.enemy_group = pygame.sprite.Group()
 
         # events
@@ -69,10 +70,20 @@ class Level:
         # NEW: Story management system
         self.story_manager = None  # Will be initialized after player is created
 
-        # chunk system
+        # chunk system: spatial hashes keyed by chunk, enemies and the player move between chunks
         self.chunk_size = 1000
-        self.chunks = {}
-        self.obstacle_chunks = {}
+        self.chunks = SpatialHash(self.chunk_size)
+        self.obstacle_chunks = SpatialHash(self.chunk_size)
+
+        # active set: sprites of the active chunks, kept in visible_sprites / obstacle_sprites
+        # and changed only when the player changes chunk or a sprite enters, leaves or moves chunks
+        self.active_chunk_keys = set()
+        self.active_region = None
+        self.active_changes = 0
+        self.active_set_stats = {'frames': 0, 'unchanged_frames': 0, 'region_changes': 0, 'sprite_changes': 0}
+
+        # floor blocks, as an occupancy grid instead of one sprite per tile
+        self.collision_grid = None
 
         # Enemy spawning system
         self.enemy_spawner = None
@@ -87,6 +98,7 @@ class Level:
 
         # setup map
         self.create_map()
+        self.visible_sprites.add(self.player)
         
         # NEW: Initialize story manager after map is created
         self.story_manager = StoryManager(self)
@@ -100,86 +112,97 @@ class Level:
         # self.event_manager.setup_tutorial_events()   # Uncomment for tutorial
         # self.event_manager.setup_custom_events()     # Add custom events
 
-    def add_to_chunk(self, sprite, x, y, is_obstacle=False):
-        """Add a sprite to the correct chunk based on world coords."""
-        cx = x // self.chunk_size
-        cy = y // self.chunk_size
-        
-        if (cx, cy) not in self.chunks:
-            self.chunks[(cx, cy)] = []
-        self.chunks[(cx, cy)].append(sprite)
-        
+    def add_to_chunk(self, sprite, x, y, is_obstacle=False, dynamic=False):
+        """Add a sprite to the correct chunk based on world coords. Dynamic sprites follow their moves."""
+        self.chunks.insert(sprite, (x, y), dynamic)
         if is_obstacle:
-            if (cx, cy) not in self.obstacle_chunks:
-                self.obstacle_chunks[(cx, cy)] = []
-            self.obstacle_chunks[(cx, cy)].append(sprite)
-    
+            self.obstacle_chunks.insert(sprite, (x, y), dynamic)
+        self.sync_active(sprite)
+
+    def move_in_chunks(self, sprite):
+        """Move a dynamic sprite to the chunk of its current position."""
+        if self.chunks.move(sprite, sprite.rect.center):
+            if sprite in self.obstacle_chunks:
+                self.obstacle_chunks.move(sprite, sprite.rect.center)
+            self.sync_active(sprite)
+
     def remove_from_chunks(self, sprite):
-        """Remove a sprite from all chunks (used for enemy death)"""
-        for chunk_list in self.chunks.values():
-            if sprite in chunk_list:
-                chunk_list.remove(sprite)
-        
-        for chunk_list in self.obstacle_chunks.values():
-            if sprite in chunk_list:
-                chunk_list.remove(sprite)
-    
-    def clean_dead_enemies(self):
-        """Remove dead enemies from chunk system"""
-        for chunk_key in list(self.chunks.keys()):
-            # Remove enemies that have been killed (no longer in any groups)
-            self.chunks[chunk_key] = [s for s in self.chunks[chunk_key] 
-                                    if not (hasattr(s, 'sprite_type') and 
-                                            s.sprite_type == 'enemy' and 
-                                            hasattr(s, 'dead') and s.dead)]
-        
-        for chunk_key in list(self.obstacle_chunks.keys()):
-            self.obstacle_chunks[chunk_key] = [s for s in self.obstacle_chunks[chunk_key] 
-                                            if not (hasattr(s, 'sprite_type') and 
-                                                    s.sprite_type == 'enemy' and 
-                                                    hasattr(s, 'dead') and s.dead)]
-
-
-    def get_active_chunks(self):
-        """Return all sprites from chunks around the player."""
-        player_cx = int(self.player.x) // self.chunk_size
-        player_cy = int(self.player.y) // self.chunk_size
-
-        active = []
-        for dx in range(-1, 2):
-            for dy in range(-1, 2):
-                key = (player_cx + dx, player_cy + dy)
-                if key in self.chunks:
-                    active.extend(self.chunks[key])  # Just add everything
-        return active
-
-    def get_active_obstacles(self):
-        """Return all obstacle sprites from chunks around the player."""
-        player_cx = int(self.player.x) // self.chunk_size
-        player_cy = int(self.player.y) // self.chunk_size
-
-        active_obstacles = []
-        for dx in range(-1, 2):
-            for dy in range(-1, 2):
-                key = (player_cx + dx, player_cy + dy)
-                if key in self.obstacle_chunks:
-                    active_obstacles.extend(self.obstacle_chunks[key])
-        return active_obstacles
-        
+        """Remove a sprite from the chunk system (used for enemy death)"""
+        self.chunks.remove(sprite)
+        self.obstacle_chunks.remove(sprite)
+        self.sync_active(sprite)
+
+    def sync_active(self, sprite):
+        """Add a sprite to the active set or take it out, depending on whether its chunk is active."""
+        if sprite is getattr(self, 'player', None):
+            return
+        if self.chunks.sprite_cells.get(sprite) in self.active_chunk_keys:
+            if not self.visible_sprites.has(sprite):
+                self.visible_sprites.add(sprite)
+                if sprite in self.obstacle_chunks:
+                    self.obstacle_sprites.add(sprite)
+                self.active_changes += 1
+        elif self.visible_sprites.has(sprite):
+            self.visible_sprites.remove(sprite)
+            self.obstacle_sprites.remove(sprite)
+            self.active_changes += 1
+
+    def get_simulation_rect(self):
+        """
+        Return the world rect to simulate: the camera view at its current zoom plus SIMULATION_MARGIN,
+        and never less than SIMULATION_MIN_RADIUS around the player.
+        """
+        simulation_rect = self.visible_sprites.get_view_rect(self.player).inflate(SIMULATION_MARGIN*2, SIMULATION_MARGIN*2)
+        player_rect = pygame.Rect(0, 0, SIMULATION_MIN_RADIUS*2, SIMULATION_MIN_RADIUS*2)
+        player_rect.center = (self.player.x, self.player.y)
+        return simulation_rect.union(player_rect)
+
+    def get_active_region(self):
+        """Return the (left, top, right, bottom) chunk coords of the chunks overlapping the simulation rect."""
+        rect = self.get_simulation_rect()
+        left, top = self._get_chunk_coords(rect.topleft)
+        right, bottom = self._get_chunk_coords((rect.right - 1, rect.bottom - 1))
+        return (left, top, right, bottom)
+
+    def get_active_chunk_keys(self):
+        """Return the keys of the chunks in the active region."""
+        left, top, right, bottom = self.active_region
+        return {(cx, cy) for cx in range(left, right + 1) for cy in range(top, bottom + 1)}
+
+    def update_active_chunks(self):
+        """
+        When the active region moved or changed size (the player walked or the camera zoomed), swap in the
+        sprites of the chunks that became active and drop the rest. Returns True if the active chunks changed.
+        """
+        region = self.get_active_region()
+        if region == self.active_region:
+            return False
+        self.active_region = region
+        keys = self.get_active_chunk_keys()
+
+        for key in self.active_chunk_keys - keys:
+            for sprite in self.chunks.get(key):
+                if sprite is not self.player:
+                    self.visible_sprites.remove(sprite)
+            self.obstacle_sprites.remove(*self.obstacle_chunks.get(key))
+        for key in keys - self.active_chunk_keys:
+            self.visible_sprites.add(sprite for sprite in self.chunks.get(key) if sprite is not self.player)
+            self.obstacle_sprites.add(*self.obstacle_chunks.get(key))
+
+        self.active_chunk_keys = keys
+        return True
+
+    def update_moving_chunks(self, keys):
+        """Re-bucket the moving sprites of the given chunks after they moved this frame."""
+        moving = [sprite for key in keys for sprite in self.chunks.get_dynamic(key)]
+        for sprite in moving:
+            self.move_in_chunks(sprite)
+
     def _get_chunk_coords(self, pos):
-        x, y = pos
-        return (floor(x / self.chunk_size), floor(y / self.chunk_size))
+        return self.chunks.cell_of(pos)
     
     def add_object(self, obj, pos, is_obstacle = False):
-        cx, cy = self._get_chunk_coords(pos)
-        if (cx, cy) not in self.chunks:
-            self.chunks[(cx, cy)] = []
-        self.chunks[(cx, cy)].append(obj)
-
-        if is_obstacle:
-            if (cx, cy) not in self.obstacle_chunks:
-                self.obstacle_chunks[(cx, cy)] = []
-            self.obstacle_chunks[(cx, cy)].append(obj)
+        self.add_to_chunk(obj, pos[0], pos[1], is_obstacle)
 
     def create_map(self):
         layouts = {
@@ -191,6 +214,8 @@ class Level:
             'planets': import_csv_layout(resource_path(f'graphics/maps/{self.level_name}/map_data/{self.level_name}_planets.csv')),
 
         }
+        self.collision_grid = TileGrid(layouts['floorblocks'])
+
         graphics = {
             # 'grass': import_image_from_folder(resource_path('graphics/maps/' + self.level_name + '/grass')),
             # 'objects': import_image_from_folder(resource_path('graphics/maps/' + self.level_name + '/objects')),
@@ -203,10 +228,6 @@ class Level:
                         x = col_index * TILE_SIZE
                         y = row_index * TILE_SIZE
 
-                        if style == 'floorblocks':
-                            tile = Tile((x, y), [], 'invisible')
-                            self.add_to_chunk(tile, x, y, is_obstacle=True)
-
                         if style == 'grass':
                             grass_surf = choice(graphics['grass'])
                             tile = Tile((x, y), [], 'grass', grass_surf)
@@ -226,7 +247,8 @@ class Level:
                                     self.obstacle_sprites,
                                     self.bullet_group
                                 )
-                                self.add_to_chunk(self.player, x, y)
+                                self.player.collision_grid = self.collision_grid
+                                self.add_to_chunk(self.player, self.player.x, self.player.y, dynamic=True)
                                 self.enemy_spawner = EnemySpawner(self)
                         if style == 'planets':
                             planet = Planet(celestial_bodies[str(val)], x, y, [])
@@ -257,7 +279,10 @@ class Level:
                     bullet.kill()
                     continue
             
-            # All bullets collide with obstacles
+            # All bullets collide with floor blocks and obstacles
+            if self.collision_grid.collides(bullet.rect):
+                bullet.kill()
+                continue
             for obstacle in self.obstacle_sprites:
                 if hasattr(obstacle, 'hitbox'):
                     if isinstance(obstacle.hitbox, CircleHitbox):
@@ -328,23 +353,8 @@ class Level:
             self.restart()
             return
         
-        self.clean_dead_enemies()
+        region_changed = self.update_active_chunks()
 
-        active_sprites = self.get_active_chunks()
-        active_obstacles = self.get_active_obstacles()
-        
-        self.visible_sprites.empty()
-        self.obstacle_sprites.empty()
-        
-        self.visible_sprites.add(self.player)
-        
-        for sprite in active_sprites:
-            if sprite != self.player:
-                self.visible_sprites.add(sprite)
-        
-        self.visible_sprites.add(self.bullet_group.sprites())
-        
-        self.obstacle_sprites.add(active_obstacles)
         self.visible_sprites.events = self.events
         self.visible_sprites.custom_draw(self.player, self.story_manager)
 
@@ -366,9 +376,31 @@ class Level:
                 self.event_manager.check_event_collisions(self.player)
 
             self.visible_sprites.enemy_update(self.player)
+
+            # enemies chasing the player and the player itself may have crossed into another chunk
+            self.update_moving_chunks(self.active_chunk_keys)
+
+        # count the frames that needed no change to the active set
+        stats = self.active_set_stats
+        stats['frames'] += 1
+        stats['region_changes'] += region_changed
+        stats['sprite_changes'] += self.active_changes
+        if not region_changed and not self.active_changes:
+            stats['unchanged_frames'] += 1
+        self.active_changes = 0
         
         # debug(f"Speed: {self.player.speed:.2f}, Pos: ({int(self.player.x)}, {int(self.player.y)}), Health: {self.player.health}")
 
+class BulletGroup(pygame.sprite.Group):
+    """Bullet group that also puts each new bullet in the visible sprites; kill() takes it out of both."""
+    def __init__(self, visible_sprites):
+        super().__init__()
+        self.visible_sprites = visible_sprites
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.visible_sprites.add(sprite)
+
 class YSortCameraGroup(pygame.sprite.Group):
     def __init__(self):
         super().__init__()
@@ -409,6 +441,22 @@ class YSortCameraGroup(pygame.sprite.Group):
         self.health_bar_bg_rect = self.health_bar_bg.get_rect(topleft = (10,10))
         self.health_bar = pygame.image.load(resource_path('graphics/ui/health_bar.png')).convert_alpha()
     
+    def get_view_rect(self, target):
+        """Return the world rect the camera shows around target at the current zoom."""
+        # sprites are blitted unscaled, so zooming in never shows less than the screen
+        scale = min(self.zoom_scale, 1)
+        width, height = self.display_surface.get_size()
+        view_rect = pygame.Rect(0, 0, width / scale, height / scale)
+        view_rect.center = (target.x, target.y)
+        return view_rect
+
+    def is_on_screen(self, sprite, render_rect):
+        # events also draw their trigger area around them
+        reach = getattr(sprite, 'trigger_radius', 0)
+        if reach:
+            return sprite.rect.inflate(reach*2, reach*2).colliderect(render_rect)
+        return sprite.rect.colliderect(render_rect)
+
     def center_camera(self, target):
         # Use the player's actual position (x, y) instead of rect
         self.offset.x = target.x - self.half_width
@@ -526,7 +574,10 @@ class YSortCameraGroup(pygame.sprite.Group):
         offset_pos = self.floor_rect.topleft - self.offset
         self.display_surface.blit(self.floor_surf, offset_pos)
 
-        for sprite in sorted(self.sprites(), key = lambda sprite: sprite.rect.bottom):
+        # only draw the simulated sprites that are on screen
+        render_rect = self.get_view_rect(player).inflate(RENDER_MARGIN*2, RENDER_MARGIN*2)
+        on_screen = [sprite for sprite in self.sprites() if self.is_on_screen(sprite, render_rect)]
+        for sprite in sorted(on_screen, key = lambda sprite: sprite.rect.bottom):
             if hasattr(sprite, 'sprite_type') and sprite.sprite_type == 'player' and sprite.invulnerable:
                 if int(pygame.time.get_ticks() / 100) % 2:
                     offset_pos = sprite.rect.topleft - self.offset
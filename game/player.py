@@ -187,6 +187,11 @@ class Player(Entity):
 
     def collision(self, direction, movement_delta=None):
         """Enhanced collision system supporting both rectangular and circular hitboxes"""
+        # floor blocks: rect-vs-grid against only the tiles under the hitbox
+        if self.collision_grid is not None:
+            axis_direction = self.direction.x if direction == 'horizontal' else self.direction.y
+            self.collision_grid.resolve(self.hitbox, direction, axis_direction if movement_delta is None else movement_delta)
+
         if direction == 'horizontal':
             for sprite in self.obstacle_sprites:
                 if self.check_collision_with_obstacle(sprite):
@@ -8,6 +8,11 @@ FPS = 60
 MAP_WIDTH = 200*TILE_SIZE  # Width of the game world in pixels
 MAP_HEIGHT = 200*TILE_SIZE  # Height of the game world in pixels
 
+# chunk activation around the camera view (world pixels)
+SIMULATION_MARGIN = 500  # simulate this far beyond the view, enemies detect the player from 500px
+SIMULATION_MIN_RADIUS = 800  # and at least this far around the player, enemies spawn 600px away
+RENDER_MARGIN = 2*TILE_SIZE  # draw this far beyond the view so sprites don't pop in at the edges
+
 
 celestial_bodies = {
     '0': 'earth',
@@ -0,0 +1,78 @@
+from math import floor
+
+class SpatialHash:
+    """Sprites bucketed by world position into square cells, with O(1) insert, move and remove."""
+
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        # cell -> sprites in it; dicts keep insertion order, so draw order stays stable
+        self.cells = {}
+        # cell -> the sprites in it that move (enemies, the player)
+        self.dynamic_cells = {}
+        # sprite -> the cell it is in
+        self.sprite_cells = {}
+        self.dynamic = set()
+
+    def cell_of(self, pos):
+        x, y = pos
+        return (floor(x / self.cell_size), floor(y / self.cell_size))
+
+    def __contains__(self, sprite):
+        return sprite in self.sprite_cells
+
+    def __len__(self):
+        return len(self.sprite_cells)
+
+    def insert(self, sprite, pos, dynamic=False):
+        """Add a sprite at a world position; dynamic sprites are tracked for move()."""
+        if sprite in self.sprite_cells:
+            self.remove(sprite)
+        key = self.cell_of(pos)
+        self.cells.setdefault(key, {})[sprite] = None
+        self.sprite_cells[sprite] = key
+        if dynamic:
+            self.dynamic.add(sprite)
+            self.dynamic_cells.setdefault(key, {})[sprite] = None
+        return key
+
+    def move(self, sprite, pos):
+        """Update a sprite's cell after it moved. Returns True if it changed cells."""
+        old_key = self.sprite_cells.get(sprite)
+        if old_key is None:
+            return False
+        key = self.cell_of(pos)
+        if key == old_key:
+            return False
+        self._discard(self.cells, old_key, sprite)
+        self.cells.setdefault(key, {})[sprite] = None
+        if sprite in self.dynamic:
+            self._discard(self.dynamic_cells, old_key, sprite)
+            self.dynamic_cells.setdefault(key, {})[sprite] = None
+        self.sprite_cells[sprite] = key
+        return True
+
+    def remove(self, sprite):
+        """Remove a sprite. Returns the cell it was in, or None if it was not here."""
+        key = self.sprite_cells.pop(sprite, None)
+        if key is None:
+            return None
+        self._discard(self.cells, key, sprite)
+        if sprite in self.dynamic:
+            self.dynamic.discard(sprite)
+            self._discard(self.dynamic_cells, key, sprite)
+        return key
+
+    def get(self, key):
+        """Return the sprites in a cell (read-only view)."""
+        return self.cells.get(key, {}).keys()
+
+    def get_dynamic(self, key):
+        """Return the moving sprites in a cell (read-only view)."""
+        return self.dynamic_cells.get(key, {}).keys()
+
+    def _discard(self, cells, key, sprite):
+        cell = cells[key]
+        del cell[sprite]
+        # drop empty cells so the dict only holds occupied ones
+        if not cell:
+            del cells[key]
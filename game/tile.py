@@ -18,4 +18,62 @@ class Tile(pygame.sprite.Sprite):
             self.rect = self.image.get_rect(topleft = pos)
             self.hitbox = self.rect.inflate(0, 0)
         if self.sprite_type == 'invisible':
-            self.image.set_alpha(0)
\ No newline at end of file
+            self.image.set_alpha(0)
+
+class TileGrid:
+    """Solid map tiles as a bytearray occupancy grid, one byte per tile, for O(1) tile lookup."""
+    def __init__(self, layout, tile_size=TILE_SIZE):
+        self.tile_size = tile_size
+        self.rows = len(layout)
+        self.cols = max((len(row) for row in layout), default=0)
+        self.cells = bytearray(self.rows * self.cols)
+        for row_index, row in enumerate(layout):
+            for col_index, val in enumerate(row):
+                if val != '-1':
+                    self.cells[row_index * self.cols + col_index] = 1
+
+    def __len__(self):
+        return sum(self.cells)
+
+    def is_solid(self, col, row):
+        # outside the map is open, like it was before the grid
+        return 0 <= col < self.cols and 0 <= row < self.rows and self.cells[row * self.cols + col] == 1
+
+    def solid_tiles(self, rect):
+        """Return the rects of the solid tiles overlapping rect (touching edges don't count, like colliderect)."""
+        size = self.tile_size
+        tiles = []
+        for row in range(max(rect.top // size, 0), min((rect.bottom - 1) // size, self.rows - 1) + 1):
+            for col in range(max(rect.left // size, 0), min((rect.right - 1) // size, self.cols - 1) + 1):
+                if self.cells[row * self.cols + col]:
+                    tiles.append(pygame.Rect(col * size, row * size, size, size))
+        return tiles
+
+    def collides(self, rect):
+        return bool(self.solid_tiles(rect))
+
+    def collidepoint(self, point):
+        return self.is_solid(int(point[0] // self.tile_size), int(point[1] // self.tile_size))
+
+    def resolve(self, hitbox, direction, movement_delta):
+        """
+        Push hitbox out of the solid tiles it overlaps, back against its movement along direction
+        ('horizontal' or 'vertical'). Returns True if it was pushed out; without
+        movement along direction there is no side to push back to, so nothing happens.
+        """
+        if not movement_delta:
+            return False
+        tiles = self.solid_tiles(hitbox)
+        if not tiles:
+            return False
+        if direction == 'horizontal':
+            if movement_delta > 0:  # moving right
+                hitbox.right = min(tile.left for tile in tiles)
+            elif movement_delta < 0:  # moving left
+                hitbox.left = max(tile.right for tile in tiles)
+        else:
+            if movement_delta > 0:  # moving down
+                hitbox.bottom = min(tile.top for tile in tiles)
+            elif movement_delta < 0:  # moving up
+                hitbox.top = max(tile.bottom for tile in tiles)
+        return True
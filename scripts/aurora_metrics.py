@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Aurora Prediction Instrumentation
+Leveled logging and timing spans for the prediction path, built on the
+standard library alone so the one-shot CLI stays fast to start (the logging
+module would add about 10 ms of imports).
+
+Log lines keep the "[v0] " prefix and go to stderr only when their level is
+at or above AURORA_LOG_LEVEL: debug, info, warning (the default), error or
+off. Messages are %-formatted only when emitted, so a disabled level costs
+one comparison.
+
+Spans time the stages of a prediction:
+
+    model_load    loading a backend from disk
+    input_prep    cache lookups and building the model's input arrays
+    inference     the model call itself
+    postprocess   clamping, banding and building the response
+
+Totals are read with timings.snapshot() as a JSON-serializable dict, or with
+prometheus_text() in the Prometheus text exposition format.
+"""
+
+import sys
+import os
+import threading
+from bisect import bisect_left
+from time import perf_counter
+
+# Environment variable setting the lowest level written to stderr
+LOG_LEVEL_ENV = 'AURORA_LOG_LEVEL'
+LOG_LEVELS = {'debug': 10, 'info': 20, 'warning': 30, 'error': 40, 'off': 100}
+DEFAULT_LOG_LEVEL = 'warning'
+
+# Upper bounds, in seconds, of the span latency histogram buckets
+SPAN_BUCKETS = [0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0]
+
+_log_level = LOG_LEVELS.get(os.environ.get(LOG_LEVEL_ENV, DEFAULT_LOG_LEVEL).lower(),
+                            LOG_LEVELS[DEFAULT_LOG_LEVEL])
+
+def set_log_level(name):
+    """Set the lowest level written to stderr (debug, info, warning, error or off)."""
+    global _log_level
+    if name.lower() not in LOG_LEVELS:
+        raise ValueError(f"Unknown log level {name!r}, expected one of {', '.join(LOG_LEVELS)}")
+    _log_level = LOG_LEVELS[name.lower()]
+
+def log_enabled(level):
+    """Return whether messages at level are written."""
+    return LOG_LEVELS[level] >= _log_level
+
+def log(level, message, *args):
+    """Write '[v0] message % args' to stderr if level is enabled."""
+    if LOG_LEVELS[level] < _log_level:
+        return
+    if args:
+        message = message % args
+    print(f"[v0] {message}", file=sys.stderr)
+
+class Span:
+    """Context manager adding its elapsed time to a SpanStats entry."""
+
+    __slots__ = ('stats', 'name', 'start')
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.stats.observe(self.name, perf_counter() - self.start)
+        return False
+
+class SpanStats:
+    """Thread-safe counts, totals and latency histograms of named spans."""
+
+    def __init__(self, buckets=SPAN_BUCKETS):
+        self.buckets = buckets
+        # name -> [count, total seconds, max seconds, per-bucket counts]
+        self._spans = {}
+        self._lock = threading.Lock()
+
+    def span(self, name):
+        """Return a context manager timing one occurrence of the named span."""
+        return Span(self, name)
+
+    def observe(self, name, seconds):
+        """Record one occurrence of the named span."""
+        bucket = bisect_left(self.buckets, seconds)
+        with self._lock:
+            entry = self._spans.get(name)
+            if entry is None:
+                entry = self._spans[name] = [0, 0.0, 0.0, [0] * (len(self.buckets) + 1)]
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+            entry[3][bucket] += 1
+
+    def reset(self):
+        """Forget every recorded span."""
+        with self._lock:
+            self._spans.clear()
+
+    def snapshot(self):
+        """
+        Return the span totals.
+
+        Returns:
+            dict: Span name -> count, total_ms, mean_ms and max_ms
+        """
+        with self._lock:
+            entries = {name: (entry[0], entry[1], entry[2]) for name, entry in self._spans.items()}
+        return {
+            name: {
+                'count': count,
+                'total_ms': total * 1000,
+                'mean_ms': total * 1000 / count,
+                'max_ms': maximum * 1000,
+            }
+            for name, (count, total, maximum) in entries.items()
+        }
+
+    def prometheus_lines(self, metric='aurora_span_seconds'):
+        """Return the spans as Prometheus histogram lines."""
+        with self._lock:
+            entries = {name: (entry[0], entry[1], list(entry[3])) for name, entry in self._spans.items()}
+
+        lines = [
+            f'# HELP {metric} Time spent in each stage of a prediction.',
+            f'# TYPE {metric} histogram',
+        ]
+        for name, (count, total, buckets) in sorted(entries.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, buckets):
+                cumulative += bucket_count
+                lines.append(f'{metric}_bucket{{span="{name}",le="{bound:g}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{span="{name}",le="+Inf"}} {count}')
+            lines.append(f'{metric}_sum{{span="{name}"}} {total:.9f}')
+            lines.append(f'{metric}_count{{span="{name}"}} {count}')
+        return lines
+
+# Spans recorded by the prediction path
+timings = SpanStats()
+
+def span(name):
+    """Time one occurrence of the named span in timings."""
+    return Span(timings, name)
+
+def prometheus_text(gauges=None):
+    """
+    Render timings, plus optional numeric gauges, as Prometheus text.
+
+    Args:
+        gauges (dict): Metric name -> number, e.g. {'aurora_cache_hits': 12}
+
+    Returns:
+        str: The text exposition, ending with a newline
+    """
+    lines = timings.prometheus_lines()
+    for name, value in (gauges or {}).items():
+        lines.append(f'# TYPE {name} gauge')
+        lines.append(f'{name} {value}')
+    return '\n'.join(lines) + '\n'
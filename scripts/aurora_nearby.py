@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Aurora Nearest Viewing Location Search
+Answers "where is the closest place I could see the aurora?": given a
+location and an intensity threshold, returns the closest grid cells, by
+great-circle distance, whose predicted intensity reaches the threshold,
+nearest first and the brighter cell first among equally near ones.
+
+The loaded model (or the forecast cube at a given time) is evaluated once
+over a global grid, and the cells are indexed with KD-trees on their 3D unit
+vectors, where straight-line (chord) distance orders points exactly like
+great-circle distance. One tree is built per INTENSITY_TIER band of
+thresholds, over the cells at or above the band, the first time a query
+needs it; a query then reads its nearest candidates from the tree and drops
+those below its exact threshold. Indexes are rebuilt when the model file
+changes.
+
+Nearest request (aurora_server.py {"nearest": {...}}, or the JSON argument of
+this script):
+
+    {"latitude": 59.9, "longitude": 10.7, "threshold": 30}
+
+plus optional "limit" (default 5), "max_distance_km" and "time".
+
+Usage:
+    python aurora_nearby.py '{"latitude": 59.9, "longitude": 10.7, "threshold": 30}'
+"""
+
+import sys
+import json
+import math
+import threading
+from collections import OrderedDict
+import numpy as np
+
+from aurora_metrics import log, span
+from aurora_prediction import load_forecast_cube, load_model, parse_time, refresh_model_if_changed, validate_coordinates
+from aurora_regions import EARTH_RADIUS_KM, evaluate, to_unit_vectors
+
+# Step in degrees of the global grid the index is built over
+INDEX_RESOLUTION = 0.5
+
+# Thresholds share a tree per band of this many intensity points; thresholds
+# are clamped to the intensity range, so there are at most 21 trees
+INTENSITY_TIER = 5.0
+MIN_INTENSITY = 0.0
+MAX_INTENSITY = 100.0
+
+DEFAULT_LIMIT = 5
+
+# Indexes kept, one per model or forecast time
+INDEX_CACHE_SIZE = 4
+
+def global_nodes(resolution):
+    """
+    Return the (latitudes, longitudes) of a global grid without duplicate
+    points: the 180 meridian is left to -180, and each pole is one node.
+    """
+    latitudes = np.arange(round(180 / resolution) + 1) * resolution - 90.0
+    longitudes = np.arange(round(360 / resolution)) * resolution - 180.0
+    lat_mesh, lon_mesh = np.meshgrid(latitudes, longitudes, indexing='ij')
+    keep = (np.abs(lat_mesh) < 90.0) | (lon_mesh == -180.0)
+    return lat_mesh[keep], lon_mesh[keep]
+
+def km_to_chord(distance_km):
+    """Convert a great-circle distance to the straight-line distance between unit vectors."""
+    return 2.0 * math.sin(min(distance_km / EARTH_RADIUS_KM, math.pi) / 2.0)
+
+def chord_to_km(chords):
+    """Convert straight-line distances between unit vectors to great-circle km."""
+    return 2.0 * np.arcsin(np.clip(chords / 2.0, 0.0, 1.0)) * EARTH_RADIUS_KM
+
+class ViewingIndex:
+    """KD-trees over one predicted global grid, one per intensity tier, built on first use."""
+
+    def __init__(self, latitudes, longitudes, intensities):
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+        self.intensities = intensities
+        self.vectors = to_unit_vectors(latitudes, longitudes)
+        # tier -> (KD-tree, grid cell of each tree point)
+        self._trees = {}
+        self._lock = threading.Lock()
+
+    def tree(self, tier):
+        """Return the KD-tree over the cells at or above an intensity tier."""
+        with self._lock:
+            entry = self._trees.get(tier)
+            if entry is None:
+                try:
+                    from scipy.spatial import cKDTree
+                except ImportError:
+                    raise RuntimeError("Nearest search needs scipy: pip install -r scripts/requirements.txt") from None
+                cells = np.flatnonzero(self.intensities >= tier)
+                with span('model_load'):
+                    entry = self._trees[tier] = (cKDTree(self.vectors[cells]), cells)
+                log('debug', "Built viewing index for intensity >= %g over %d cells", tier, len(cells))
+            return entry
+
+    def nearest(self, latitude, longitude, threshold, limit=DEFAULT_LIMIT, max_distance_km=None):
+        """
+        Find the closest cells with intensity at or above threshold.
+
+        Returns:
+            list: Dicts of latitude, longitude, intensity and distance_km,
+                  nearest first
+        """
+        threshold = min(max(threshold, MIN_INTENSITY), MAX_INTENSITY)
+        tree, cells = self.tree(math.floor(threshold / INTENSITY_TIER) * INTENSITY_TIER)
+        if not len(cells) or limit <= 0:
+            return []
+
+        point = to_unit_vectors([latitude], [longitude])[0]
+        bound = km_to_chord(max_distance_km) if max_distance_km is not None else np.inf
+
+        # Widen the search until enough candidates clear the exact threshold
+        k = min(limit * 2, len(cells))
+        while True:
+            chords, hits = tree.query(point, k=k, distance_upper_bound=bound)
+            chords, hits = np.atleast_1d(chords), np.atleast_1d(hits)
+            # Points beyond the bound come back with index len(cells)
+            found = hits < len(cells)
+            chords, candidates = chords[found], cells[hits[found]]
+            passing = self.intensities[candidates] >= threshold
+            if passing.sum() >= limit or k == len(cells) or len(candidates) < k:
+                break
+            k = min(k * 4, len(cells))
+
+        chords, candidates = chords[passing], candidates[passing]
+        order = np.lexsort((-self.intensities[candidates], chords))[:limit]
+        distances = chord_to_km(chords[order])
+        return [
+            {
+                'latitude': round(float(self.latitudes[cell]), 4),
+                'longitude': round(float(self.longitudes[cell]), 4),
+                'intensity': round(float(self.intensities[cell]), 2),
+                'distance_km': round(float(distance), 1),
+            }
+            for cell, distance in zip(candidates[order].tolist(), distances.tolist())
+        ]
+
+# Built indexes: key -> (source the index was built from, index, model_type, version, forecast)
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+def get_index(timestamp=None):
+    """
+    Return the viewing index for the loaded model, or for the forecast cube
+    at a time, building it if the model or cube changed since.
+
+    Returns:
+        tuple: (ViewingIndex, model_type, model version, forecast dict or None)
+    """
+    if timestamp is not None:
+        seconds = parse_time(timestamp)
+        key, source = ('cube', seconds), load_forecast_cube()
+    else:
+        refresh_model_if_changed()
+        key, source = ('model',), load_model()
+
+    with _indexes_lock:
+        entry = _indexes.get(key)
+        if entry is not None and entry[0] is source:
+            _indexes.move_to_end(key)
+            return entry[1:]
+
+        latitudes, longitudes = global_nodes(INDEX_RESOLUTION)
+        intensities, model_type, version, forecast = evaluate(latitudes, longitudes,
+                                                              None if timestamp is None else seconds)
+        entry = _indexes[key] = (source, ViewingIndex(latitudes, longitudes, intensities), model_type, version,
+                                 forecast)
+        log('info', "Built %s viewing index over %d cells", model_type, len(latitudes))
+        if len(_indexes) > INDEX_CACHE_SIZE:
+            _indexes.popitem(last=False)
+        return entry[1:]
+
+def nearest_query(query):
+    """
+    Answer one nearest request (see the module docstring).
+
+    Returns:
+        dict: {'success', 'locations', 'model_type', 'model_version'} plus 'forecast' for timed queries
+    """
+    latitude = float(query['latitude'])
+    longitude = float(query['longitude'])
+    validate_coordinates(latitude, longitude)
+    threshold = float(query['threshold'])
+    if not math.isfinite(threshold):
+        raise ValueError("threshold must be a finite number")
+    # Intensities are 0-100, so thresholds beyond that select the same cells as the bounds
+    threshold = min(max(threshold, MIN_INTENSITY), MAX_INTENSITY)
+    limit = int(query.get('limit', DEFAULT_LIMIT))
+    max_distance_km = query.get('max_distance_km')
+    if max_distance_km is not None:
+        max_distance_km = float(max_distance_km)
+        if not max_distance_km >= 0:
+            raise ValueError("max_distance_km must not be negative")
+
+    index, model_type, version, forecast = get_index(query.get('time'))
+    with span('inference'):
+        locations = index.nearest(latitude, longitude, threshold, limit, max_distance_km)
+
+    result = {'success': True, 'locations': locations, 'model_type': model_type, 'model_version': version}
+    if forecast is not None:
+        result['forecast'] = forecast
+    return result
+
+def main():
+    """Main entry point for the script."""
+    if len(sys.argv) != 2:
+        print(json.dumps({
+            'success': False,
+            'error': 'Usage: python aurora_nearby.py \'{"latitude": 59.9, "longitude": 10.7, "threshold": 30}\''
+        }))
+        sys.exit(1)
+
+    try:
+        print(json.dumps(nearest_query(json.loads(sys.argv[1]))))
+    except (ValueError, KeyError, TypeError) as e:
+        print(json.dumps({
+            'success': False,
+            'error': f'Invalid input: {str(e)}'
+        }))
+        sys.exit(1)
+    except Exception as e:
+        print(json.dumps({
+            'success': False,
+            'error': f'Prediction failed: {str(e)}'
+        }))
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
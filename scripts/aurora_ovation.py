@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+OVATION Snapshot Reader
+Streams a NOAA SWPC OVATION aurora forecast (ovation_aurora_latest.json) into
+NumPy arrays without building the JSON object tree in memory.
+
+A snapshot looks like:
+
+    {"Observation Time": "2025-10-01T00:00:00Z",
+     "Forecast Time": "2025-10-01T00:30:00Z",
+     "Data Format": "[Longitude, Latitude, Aurora]",
+     "coordinates": [[0, -90, 4], [0, -89, 0], ...]}
+
+The fields before "coordinates" are decoded as JSON metadata. The coordinates
+array is then read in fixed-size chunks whose brackets and commas become
+spaces, and each chunk is parsed with np.fromstring, so memory use is bounded
+by the chunk size. Fields after the coordinates array are ignored.
+"""
+
+import json
+import re
+import numpy as np
+
+# Bytes read from the snapshot per parsing step
+READ_CHUNK_SIZE = 1 << 20
+
+# Bytes searched for the "coordinates" key before giving up
+HEADER_LIMIT = 1 << 16
+
+EXPECTED_DATA_FORMAT = '[Longitude, Latitude, Aurora]'
+
+_COORDINATES_KEY = re.compile(rb'"coordinates"\s*:\s*\[')
+_ARRAY_END = re.compile(rb'\]\s*\]')
+_SEPARATORS = bytes.maketrans(b'[],', b'   ')
+
+def read_header(f):
+    """
+    Read the metadata before the coordinates array, leaving f positioned just
+    inside the array's opening bracket.
+
+    Returns:
+        dict: The snapshot's metadata fields
+    """
+    start = f.tell()
+    head = f.read(HEADER_LIMIT)
+    match = _COORDINATES_KEY.search(head)
+    if match is None:
+        raise ValueError("No coordinates array found in the OVATION snapshot")
+    f.seek(start + match.end())
+
+    # Close the object after the last field before "coordinates"
+    prefix = head[:match.start()].decode('utf-8').rstrip().rstrip(',')
+    metadata = json.loads(prefix + '}')
+
+    data_format = metadata.get('Data Format', EXPECTED_DATA_FORMAT)
+    if data_format != EXPECTED_DATA_FORMAT:
+        raise ValueError(f"Unsupported OVATION data format {data_format!r}, expected {EXPECTED_DATA_FORMAT!r}")
+    return metadata
+
+def iter_coordinates(f, chunk_size=READ_CHUNK_SIZE):
+    """
+    Parse the coordinates array from f, positioned by read_header.
+
+    Yields:
+        ndarray: (n, 3) float64 rows of [longitude, latitude, aurora]
+    """
+    carry = b''
+    while True:
+        data = f.read(chunk_size)
+        text = carry + data
+
+        end = _ARRAY_END.search(text)
+        if end is not None:
+            body, carry = text[:end.start()], b''
+        elif not data:
+            if text.strip().startswith(b']'):
+                return
+            raise ValueError("OVATION snapshot ended inside the coordinates array")
+        else:
+            # Keep the last closing bracket, so a split "] ]" is still found
+            last = text.rfind(b']')
+            if last < 0:
+                carry = text
+                continue
+            body, carry = text[:last], text[last:]
+
+        body = body.translate(_SEPARATORS)
+        # np.fromstring reads whitespace alone as [-1.0], so skip empty bodies
+        if body.strip():
+            values = np.fromstring(body, dtype=np.float64, sep=' ')
+            if len(values) % 3:
+                raise ValueError("OVATION coordinates must be [longitude, latitude, aurora] triples")
+            yield values.reshape(-1, 3)
+        if end is not None:
+            return
+
+def read_ovation(path, chunk_size=READ_CHUNK_SIZE):
+    """
+    Read an OVATION snapshot file.
+
+    Returns:
+        tuple: (metadata dict, (n, 3) float64 array of [longitude, latitude, aurora])
+    """
+    with open(path, 'rb') as f:
+        metadata = read_header(f)
+        chunks = list(iter_coordinates(f, chunk_size))
+
+    coordinates = np.concatenate(chunks) if chunks else np.empty((0, 3), dtype=np.float64)
+    return metadata, coordinates
@@ -3,12 +3,1074 @@
 Aurora Prediction Script
 Takes latitude and longitude as input and predicts aurora probability (0-100)
 using the trained ML model (ONNX or PKL format).
+
+Usage:
+    python aurora_prediction.py <latitude> <longitude> [time]
+    python aurora_prediction.py --batch < coordinates
+
+In batch mode each stdin line is either "latitude,longitude[,time]" (CSV) or
+a JSON object with latitude, longitude and optionally time (NDJSON); one JSON
+result line is written per input line, in order.
+
+With a time (ISO 8601, or Unix seconds), the prediction comes from the
+forecast cube of OVATION snapshots (see ingest_aurora_cube.py) instead of
+the model, interpolated between the snapshots around that time.
+
+Model artifacts are read from ml/ at the repository root (written there by
+train_aurora_model.py), or from the directory named by AURORA_MODEL_DIR.
 """
 
 import sys
 import json
+import math
 import os
-import numpy as np
+import struct
+import threading
+import time
+from collections import OrderedDict
+from bisect import bisect_left
+
+from aurora_metrics import log, span
+
+# Directory holding the model artifacts: ml/ at the repository root unless overridden
+MODEL_DIR_ENV = 'AURORA_MODEL_DIR'
+MODEL_DIR = os.environ.get(MODEL_DIR_ENV) or os.path.join(os.path.dirname(__file__), '..', 'ml')
+ONNX_MODEL_PATH = os.path.join(MODEL_DIR, 'aurora_model.onnx')
+PKL_MODEL_PATH = os.path.join(MODEL_DIR, 'aurora_model_temp.pkl')
+GRID_PATH = os.path.join(MODEL_DIR, 'aurora_grid.npy')
+FOREST_PATH = os.path.join(MODEL_DIR, 'aurora_forest')
+QFOREST_PATH = os.path.join(MODEL_DIR, 'aurora_forest.qbin')
+GRID_BIN_PATH = os.path.join(MODEL_DIR, 'aurora_grid.bin')
+
+# Model registry manifest (see aurora_registry.py). When present, its current
+# version is served instead of trying the backends above in order.
+MANIFEST_PATH = os.path.join(MODEL_DIR, 'model_manifest.json')
+
+# Input feature order every backend feeds its model; registered models must match
+MODEL_FEATURE_ORDER = ['longitude', 'latitude']
+
+# Longitude conventions: requests and the lookup grids use -180..180 (east
+# positive), while the OVATION data the model is trained on uses 0..360 east.
+# Model features always go through to_ovation_longitude.
+
+# Points predicted with a reloaded model before it is swapped in
+WARMUP_POINTS = 64
+
+# Compact grid file: this header (magic, format version, latitude rows,
+# longitude columns) followed by the grid as little-endian float32
+GRID_BIN_HEADER = struct.Struct('<4sIII')
+GRID_BIN_MAGIC = b'AURG'
+GRID_BIN_VERSION = 1
+
+# Forecast cube (see ingest_aurora_cube.py): this header (magic, format
+# version, latitude rows, longitude columns, snapshots) followed by one
+# record per snapshot, oldest first: its forecast time in Unix seconds as
+# float64, then its intensity grid as float32, laid out like the lookup grid
+CUBE_PATH = os.path.join(MODEL_DIR, 'aurora_cube.bin')
+CUBE_HEADER = struct.Struct('<4sIIII')
+CUBE_MAGIC = b'AURT'
+CUBE_VERSION = 1
+
+# Heavy modules (numpy, onnxruntime, pickle) are imported inside the
+# functions that need them, so the one-shot CLI can answer from the compact
+# grid with the standard library alone (see predict_aurora_fast).
+
+# Names of the arrays written by export_aurora_forest.py
+FOREST_ARRAYS = ['roots', 'feature', 'threshold', 'left', 'right', 'leaf', 'value', 'classes']
+
+# Rows evaluated together by the NumPy forest evaluator, to bound memory
+FOREST_CHUNK_SIZE = 4096
+
+# Quantized forest file (see quantize_aurora_forest.py): this header (magic,
+# format version, trees, nodes, leaves, leaf entries, classes, threshold
+# scale) followed by the sections of qforest_layout, each 8-byte aligned
+QFOREST_HEADER = struct.Struct('<4sIIIIIII')
+QFOREST_MAGIC = b'AURQ'
+QFOREST_VERSION = 1
+
+# Packed 8-byte node: the left child, whose right sibling follows it, or
+# -(leaf + 1) at leaves; the threshold times the scale; the split feature
+QFOREST_NODE_DTYPE = [('child', '<i4'), ('threshold', '<i2'), ('feature', 'u1'), ('pad', 'u1')]
+
+# Environment variable forcing one backend (table, qforest, forest, onnx or pkl) instead of
+# the default preference order
+BACKEND_ENV = 'AURORA_BACKEND'
+
+# ONNX Runtime session settings, read from the environment when a session is
+# created; 0 threads lets ONNX Runtime choose
+ONNX_INTRA_OP_THREADS_ENV = 'AURORA_ONNX_INTRA_OP_THREADS'
+ONNX_INTER_OP_THREADS_ENV = 'AURORA_ONNX_INTER_OP_THREADS'
+ONNX_GRAPH_OPTIMIZATION_ENV = 'AURORA_ONNX_GRAPH_OPTIMIZATION'  # disable, basic, extended or all
+ONNX_EXECUTION_MODE_ENV = 'AURORA_ONNX_EXECUTION_MODE'  # sequential or parallel
+
+# Environment variable naming the Unix socket of a running aurora_server.py
+SERVER_SOCKET_ENV = 'AURORA_PREDICTION_SOCKET'
+
+# Prediction cache settings: entries kept and the size in degrees of the
+# lat/lon cells that share one cached prediction. The cache trades accuracy
+# for speed (see PredictionCache), so it is off unless a size is set.
+CACHE_SIZE_ENV = 'AURORA_CACHE_SIZE'
+CACHE_RESOLUTION_ENV = 'AURORA_CACHE_RESOLUTION'
+DEFAULT_CACHE_SIZE = 0
+DEFAULT_CACHE_RESOLUTION = 0.1
+
+# Seconds between checks of whether the model file changed on disk
+MODEL_CHECK_INTERVAL = 1.0
+
+# Number of batch-mode input lines evaluated per model call
+BATCH_CHUNK_SIZE = 4096
+
+# Intensity band thresholds: a probability above the i-th threshold (and not
+# above the next one) falls in band i + 1
+COLOR_THRESHOLDS = [15, 30, 50, 70]
+AURORA_COLORS = [
+    "Faint Green (if visible)",
+    "Pale Green",
+    "Green and Pink",
+    "Green, Pink, and Purple",
+    "Green, Pink, Purple, and Red",
+]
+
+DESCRIPTION_THRESHOLDS = [5, 15, 30, 50, 70]
+AURORA_DESCRIPTIONS = [
+    "Very low chance from this location. Try locations closer to the poles!",
+    "Low probability - auroras unlikely but possible during strong storms!",
+    "Moderate chance - auroras may be visible on the {hemisphere} horizon!",
+    "Good chance of seeing auroras if skies are clear in the {hemisphere} regions!",
+    "Great! Strong aurora activity expected in the {hemisphere} hemisphere!",
+    "Excellent! Very high chance of seeing bright auroras in the {hemisphere} sky!",
+]
+
+# Loaded model as (model_type, predict, version), replaced as a whole when
+# its files change (see load_model and start_model_watcher)
+_model = None
+_model_loaded = False
+_model_paths = []
+_model_fingerprint = None
+_model_checked_at = 0.0
+_model_lock = threading.Lock()
+_model_watcher = None
+
+# Open forecast cube, reopened when ingest_aurora_cube.py appends to it
+_cube = None
+_cube_fingerprint = None
+_cube_checked_at = 0.0
+
+# ONNX sessions keyed by (model path, model mtime, session settings)
+_onnx_sessions = {}
+_onnx_sessions_lock = threading.Lock()
+
+def onnx_session_settings():
+    """Read the ONNX Runtime session settings from the environment."""
+    return (
+        int(os.environ.get(ONNX_INTRA_OP_THREADS_ENV, 0)),
+        int(os.environ.get(ONNX_INTER_OP_THREADS_ENV, 0)),
+        os.environ.get(ONNX_GRAPH_OPTIMIZATION_ENV, 'all').lower(),
+        os.environ.get(ONNX_EXECUTION_MODE_ENV, 'sequential').lower(),
+    )
+
+def create_onnx_session(onnx_model_path, settings):
+    """
+    Create a tuned ONNX Runtime session and run one warmup inference.
+    
+    The optimized graph is saved next to the model, so later starts load it
+    with graph optimization disabled instead of optimizing again.
+    """
+    import numpy as np
+    import onnxruntime as ort
+    
+    intra_op_threads, inter_op_threads, optimization, execution_mode = settings
+    levels = {
+        'disable': ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+        'basic': ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+        'extended': ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+        'all': ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+    }
+    modes = {
+        'sequential': ort.ExecutionMode.ORT_SEQUENTIAL,
+        'parallel': ort.ExecutionMode.ORT_PARALLEL,
+    }
+    
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = intra_op_threads
+    options.inter_op_num_threads = inter_op_threads
+    options.execution_mode = modes[execution_mode]
+    
+    base, extension = os.path.splitext(onnx_model_path)
+    optimized_path = f'{base}.optimized-{optimization}{extension}'
+    
+    if (optimization != 'disable' and os.path.exists(optimized_path)
+            and os.path.getmtime(optimized_path) >= os.path.getmtime(onnx_model_path)):
+        log('info', "Loading pre-optimized ONNX model from %s", optimized_path)
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+        session = ort.InferenceSession(optimized_path, options)
+    else:
+        options.graph_optimization_level = levels[optimization]
+        if optimization != 'disable' and os.access(os.path.dirname(optimized_path), os.W_OK):
+            options.optimized_model_filepath = optimized_path
+        session = ort.InferenceSession(onnx_model_path, options)
+    
+    # Warm up so the first real request doesn't pay for lazy initialization
+    session.run(None, {session.get_inputs()[0].name: np.zeros((1, 2), dtype=np.float32)})
+    return session
+
+def get_onnx_session(onnx_model_path):
+    """
+    Return a cached ONNX Runtime session for the model.
+    
+    Sessions are keyed by model path, modification time and session settings,
+    so replacing the model file yields a fresh session on the next call.
+    """
+    path = os.path.abspath(onnx_model_path)
+    key = (path, os.path.getmtime(path), onnx_session_settings())
+    
+    session = _onnx_sessions.get(key)
+    if session is not None:
+        return session
+    
+    with _onnx_sessions_lock:
+        session = _onnx_sessions.get(key)
+        if session is None:
+            session = create_onnx_session(path, key[2])
+            # Drop sessions for older versions of this model
+            for stale_key in [k for k in _onnx_sessions if k[0] == path]:
+                del _onnx_sessions[stale_key]
+            _onnx_sessions[key] = session
+    return session
+
+def to_ovation_longitude(longitudes):
+    """Map request longitudes (-180..180) to the 0..360 OVATION longitudes the model was trained on."""
+    import numpy as np
+    return np.mod(np.asarray(longitudes, dtype=np.float64), 360.0)
+
+def from_ovation_longitude(longitudes):
+    """Map OVATION longitudes (0..360) to the -180..180 request convention; 180 maps to -180."""
+    import numpy as np
+    return np.mod(np.asarray(longitudes, dtype=np.float64) + 180.0, 360.0) - 180.0
+
+def load_onnx_model(onnx_model_path):
+    """Load the ONNX model and return a (latitudes, longitudes) -> probabilities function."""
+    import numpy as np
+    log('info', "Loading ONNX model...")
+    
+    get_onnx_session(onnx_model_path)
+    
+    def predict(latitudes, longitudes):
+        with span('input_prep'):
+            input_array = np.column_stack((to_ovation_longitude(longitudes), latitudes)).astype(np.float32)
+        
+        # Run inference, fetching only the predicted label; the per-class
+        # probability map is costly to build and unused
+        with span('inference'):
+            session = get_onnx_session(onnx_model_path)
+            label_output = session.get_outputs()[0].name
+            result = session.run([label_output], {"float_input": input_array})
+        return np.asarray(result[0], dtype=np.float64)
+    
+    return predict
+
+def load_pkl_model(pkl_model_path):
+    """Load the pickled model and return a (latitudes, longitudes) -> probabilities function."""
+    import numpy as np
+    log('info', "Loading PKL model...")
+    
+    # The notebook saves the model with joblib.dump, which pickle can't read
+    try:
+        import joblib
+        model = joblib.load(pkl_model_path)
+    except ImportError:
+        import pickle
+        with open(pkl_model_path, 'rb') as f:
+            model = pickle.load(f)
+    
+    def predict(latitudes, longitudes):
+        # Prepare input features [longitude, latitude], the training order
+        with span('input_prep'):
+            features = np.column_stack((to_ovation_longitude(longitudes), latitudes))
+        
+        # Make prediction (0-100 scale)
+        with span('inference'):
+            return np.asarray(model.predict(features), dtype=np.float64)
+    
+    return predict
+
+def load_table_model(grid_path):
+    """
+    Memory-map a precomputed intensity grid (see build_aurora_grid.py) and
+    return a (latitudes, longitudes) -> probabilities function that
+    interpolates it bilinearly.
+    
+    The grid holds rows of latitudes from -90 to 90 and columns of longitudes
+    from -180 to 180, both inclusive, at the same step.
+    """
+    import numpy as np
+    log('info', "Loading lookup grid...")
+    
+    grid = np.load(grid_path, mmap_mode='r')
+    return make_grid_interpolator(grid)
+
+def make_grid_interpolator(grid):
+    """Return a bilinear (latitudes, longitudes) -> values function over a global grid."""
+    import numpy as np
+    n_lat, n_lon = grid.shape
+    step = 180.0 / (n_lat - 1)
+    if n_lon != round(360.0 / step) + 1:
+        raise ValueError(f"Grid shape {grid.shape} is not a global lat/lon grid")
+    
+    def predict(latitudes, longitudes):
+        with span('input_prep'):
+            rows = (np.asarray(latitudes, dtype=np.float64) + 90.0) / step
+            cols = (np.asarray(longitudes, dtype=np.float64) + 180.0) / step
+        
+        with span('inference'):
+            # Lower-left cell corner, kept inside the grid so the edges interpolate
+            row0 = np.clip(np.floor(rows).astype(np.intp), 0, n_lat - 2)
+            col0 = np.clip(np.floor(cols).astype(np.intp), 0, n_lon - 2)
+            fy = rows - row0
+            fx = cols - col0
+            
+            top = grid[row0, col0] * (1 - fx) + grid[row0, col0 + 1] * fx
+            bottom = grid[row0 + 1, col0] * (1 - fx) + grid[row0 + 1, col0 + 1] * fx
+            return top * (1 - fy) + bottom * fy
+    
+    return predict
+
+def load_compact_grid(grid_path):
+    """
+    Memory-map a compact binary grid (see build_aurora_grid.py) using only the
+    standard library and return a (latitude, longitude) -> probability function.
+    
+    Interpolates bilinearly exactly like load_table_model, reading only the
+    four grid cells around the queried point.
+    """
+    import mmap
+    
+    with open(grid_path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    magic, version, n_lat, n_lon = GRID_BIN_HEADER.unpack_from(data, 0)
+    if magic != GRID_BIN_MAGIC or version != GRID_BIN_VERSION:
+        raise ValueError(f"{grid_path} is not a version {GRID_BIN_VERSION} compact aurora grid")
+    step = 180.0 / (n_lat - 1)
+    if n_lon != round(360.0 / step) + 1:
+        raise ValueError(f"Grid shape ({n_lat}, {n_lon}) is not a global lat/lon grid")
+    
+    cell_pair = struct.Struct('<2f')
+    row_bytes = n_lon * 4
+    
+    def predict(latitude, longitude):
+        row = (latitude + 90.0) / step
+        col = (longitude + 180.0) / step
+        
+        # Lower-left cell corner, kept inside the grid so the edges interpolate
+        row0 = min(max(int(row // 1), 0), n_lat - 2)
+        col0 = min(max(int(col // 1), 0), n_lon - 2)
+        fy = row - row0
+        fx = col - col0
+        
+        offset = GRID_BIN_HEADER.size + row0 * row_bytes + col0 * 4
+        top_left, top_right = cell_pair.unpack_from(data, offset)
+        bottom_left, bottom_right = cell_pair.unpack_from(data, offset + row_bytes)
+        
+        top = top_left * (1 - fx) + top_right * fx
+        bottom = bottom_left * (1 - fx) + bottom_right * fx
+        return top * (1 - fy) + bottom * fy
+    
+    return predict
+
+def load_forest_model(forest_dir):
+    """
+    Memory-map the forest arrays written by export_aurora_forest.py and
+    return a (latitudes, longitudes) -> probabilities function that
+    evaluates them with NumPy only.
+    """
+    import numpy as np
+    log('info', "Loading exported forest...")
+    
+    arrays = {
+        name: np.load(os.path.join(forest_dir, f'{name}.npy'), mmap_mode='r')
+        for name in FOREST_ARRAYS
+    }
+    return make_forest_evaluator(arrays)
+
+def make_forest_evaluator(arrays):
+    """
+    Return a function evaluating exported forest arrays on coordinate batches.
+    
+    All trees are traversed together, one level per step, for every point in
+    the batch. Class probabilities are summed tree by tree and the label with
+    the highest total wins, as in RandomForestClassifier.predict.
+    """
+    import numpy as np
+    # Plain views of the arrays as stored: memory-mapped arrays are never
+    # copied, so their pages stay shared between processes
+    roots = np.asarray(arrays['roots'])
+    feature = np.asarray(arrays['feature'])
+    threshold = np.asarray(arrays['threshold'])
+    left = np.asarray(arrays['left'])
+    right = np.asarray(arrays['right'])
+    leaf = np.asarray(arrays['leaf'])
+    value = np.asarray(arrays['value'])
+    classes = np.asarray(arrays['classes'])
+    
+    def predict_chunk(features):
+        samples = np.arange(len(features))[:, None]
+        nodes = np.broadcast_to(roots, (len(features), len(roots))).copy()
+        
+        while True:
+            internal = left[nodes] >= 0
+            if not internal.any():
+                break
+            # Compare in float64 against the float32 inputs, as scikit-learn does
+            go_left = features[samples, feature[nodes]] <= threshold[nodes]
+            nodes = np.where(internal, np.where(go_left, left[nodes], right[nodes]), nodes)
+        
+        leaf_rows = leaf[nodes]
+        proba = np.zeros((len(features), value.shape[1]), dtype=np.float64)
+        for tree in range(len(roots)):
+            proba += value[leaf_rows[:, tree]]
+        return classes[np.argmax(proba, axis=1)]
+    
+    def predict(latitudes, longitudes):
+        # Features in training order [longitude, latitude], as float32 like scikit-learn
+        with span('input_prep'):
+            features = np.column_stack((to_ovation_longitude(longitudes), latitudes)).astype(np.float32).astype(np.float64)
+        with span('inference'):
+            return np.concatenate([
+                predict_chunk(features[start:start + FOREST_CHUNK_SIZE])
+                for start in range(0, max(len(features), 1), FOREST_CHUNK_SIZE)
+            ])
+    
+    return predict
+
+def qforest_layout(n_trees, n_nodes, n_leaves, n_entries, n_classes):
+    """
+    Return the sections of a quantized forest file in order, as
+    (name, dtype, length).
+    
+    Leaf i's class distribution is the entries from offsets[i] to
+    offsets[i + 1]: a class index and its probability times 65535.
+    """
+    return [
+        ('roots', '<i4', n_trees),
+        ('nodes', QFOREST_NODE_DTYPE, n_nodes),
+        ('offsets', '<u4', n_leaves + 1),
+        ('entry_class', 'u1', n_entries),
+        ('entry_weight', '<u2', n_entries),
+        ('classes', 'u1', n_classes),
+    ]
+
+def load_qforest_model(qforest_path):
+    """
+    Memory-map a quantized forest file in one mapping and return a
+    (latitudes, longitudes) -> probabilities function evaluating it.
+    """
+    import numpy as np
+    log('info', "Loading quantized forest...")
+    
+    data = np.memmap(qforest_path, dtype=np.uint8, mode='r')
+    magic, version, *counts, scale = QFOREST_HEADER.unpack_from(data, 0)
+    if magic != QFOREST_MAGIC or version != QFOREST_VERSION:
+        raise ValueError(f"{qforest_path} is not a version {QFOREST_VERSION} quantized aurora forest")
+    
+    sections = {'scale': scale}
+    offset = QFOREST_HEADER.size
+    for name, dtype, length in qforest_layout(*counts):
+        offset = -(-offset // 8) * 8
+        dtype = np.dtype(dtype)
+        sections[name] = data[offset:offset + dtype.itemsize * length].view(dtype)
+        offset += dtype.itemsize * length
+    return make_qforest_evaluator(sections)
+
+def make_qforest_evaluator(sections):
+    """
+    Return a function evaluating quantized forest sections on coordinate batches.
+    
+    Traverses like make_forest_evaluator, comparing the scaled inputs with
+    the integer thresholds, then sums the trees' sparse leaf distributions
+    and takes the most likely class.
+    """
+    import numpy as np
+    roots = np.asarray(sections['roots'])
+    nodes = np.asarray(sections['nodes'])
+    child = nodes['child']
+    offsets = np.asarray(sections['offsets'], dtype=np.intp)
+    entry_class = np.asarray(sections['entry_class'], dtype=np.intp)
+    entry_weight = np.asarray(sections['entry_weight'])
+    classes = np.asarray(sections['classes'], dtype=np.float64)
+    scale = float(sections['scale'])
+    n_classes = len(classes)
+    
+    def predict_chunk(features):
+        n = len(features)
+        samples = np.arange(n)[:, None]
+        current = np.broadcast_to(roots, (n, len(roots))).copy()
+        
+        while True:
+            packed = nodes[current]
+            internal = packed['child'] >= 0
+            if not internal.any():
+                break
+            go_right = features[samples, packed['feature']] > packed['threshold']
+            current = np.where(internal, packed['child'] + go_right, current)
+        
+        # Gather every tree's leaf entries and sum their weights per class
+        leaves = (-1 - child[current]).ravel()
+        starts = offsets[leaves]
+        counts = offsets[leaves + 1] - starts
+        first = np.cumsum(counts) - counts
+        entries = np.arange(counts.sum()) + np.repeat(starts - first, counts)
+        rows = np.repeat(np.arange(n), counts.reshape(n, len(roots)).sum(axis=1))
+        totals = np.bincount(rows * n_classes + entry_class[entries], weights=entry_weight[entries],
+                             minlength=n * n_classes)
+        return classes[np.argmax(totals.reshape(n, n_classes), axis=1)]
+    
+    def predict(latitudes, longitudes):
+        # Features [longitude, latitude] as float32 like scikit-learn, scaled
+        # like the thresholds (a power of two, so the scaling is exact)
+        with span('input_prep'):
+            features = np.column_stack((to_ovation_longitude(longitudes), latitudes)).astype(np.float32).astype(np.float64) * scale
+        with span('inference'):
+            return np.concatenate([
+                predict_chunk(features[start:start + FOREST_CHUNK_SIZE])
+                for start in range(0, max(len(features), 1), FOREST_CHUNK_SIZE)
+            ])
+    
+    return predict
+
+# Model backends in order of preference: name -> (model path, loader)
+BACKENDS = {
+    'Table': (GRID_PATH, load_table_model),
+    'QForest': (QFOREST_PATH, load_qforest_model),
+    'Forest': (FOREST_PATH, load_forest_model),
+    'ONNX': (ONNX_MODEL_PATH, load_onnx_model),
+    'PKL': (PKL_MODEL_PATH, load_pkl_model),
+}
+
+def load_backend(name):
+    """
+    Load one model backend by name, independent of the cached model.
+    
+    Returns:
+        function: Maps latitude and longitude arrays to raw probabilities
+    """
+    path, loader = BACKENDS[name]
+    log('debug', "Looking for %s model at: %s", name, os.path.abspath(path))
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{name} model not found at {path}")
+    return loader(path)
+
+def read_manifest(manifest_path=MANIFEST_PATH):
+    """Return the parsed model manifest."""
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def load_registered_model(manifest, manifest_path=MANIFEST_PATH, version=None):
+    """
+    Load a registered model version, the manifest's current one by default,
+    after checking its feature order and checksum.
+    
+    Returns:
+        tuple: ((model_type, predict, version), model path)
+    """
+    version = version or manifest['current']
+    entry = manifest['models'][version]
+    backend = entry['backend']
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r} for model version {version}")
+    if entry.get('feature_order') != MODEL_FEATURE_ORDER:
+        raise ValueError(f"Model version {version} expects features {entry.get('feature_order')}, "
+                         f"not {MODEL_FEATURE_ORDER}")
+    
+    path = os.path.join(os.path.dirname(manifest_path), entry['path'])
+    if model_hash(path) != entry['sha256']:
+        raise ValueError(f"Checksum mismatch for model version {version} at {path}")
+    return (backend, BACKENDS[backend][1](path), version), path
+
+def locate_model(backend=None):
+    """
+    Find the model that offline tools (textures, benchmarks, parity checks)
+    should evaluate, without loading it: the one find_model serves, or with
+    backend, that backend's model. With a manifest (and no AURORA_BACKEND)
+    only registered versions count: the current version, or for another
+    backend its most recently registered version.
+    
+    Returns:
+        tuple: (backend, model path, registered version or None)
+    
+    Raises:
+        FileNotFoundError: If there is no such model
+    """
+    forced = os.environ.get(BACKEND_ENV)
+    if os.path.exists(MANIFEST_PATH) and not forced:
+        manifest = read_manifest()
+        versions = [manifest['current']] + sorted(manifest['models'], reverse=True,
+                                                  key=lambda v: manifest['models'][v]['registered'])
+        for version in versions:
+            entry = manifest['models'].get(version)
+            if entry and backend in (None, entry['backend']):
+                return entry['backend'], os.path.join(os.path.dirname(MANIFEST_PATH), entry['path']), version
+        raise FileNotFoundError(f"No registered {backend or ''} model in {MANIFEST_PATH}")
+    
+    names = [name for name in BACKENDS if (backend or forced or name).lower() == name.lower()]
+    for name in names:
+        if os.path.exists(BACKENDS[name][0]):
+            return name, BACKENDS[name][0], None
+    raise FileNotFoundError(f"No model found for backend(s): {', '.join(names) or backend or forced}")
+
+def load_located_model(backend=None):
+    """
+    Load the model locate_model finds, checking registered versions like
+    find_model does.
+    
+    Returns:
+        tuple: ((model_type, predict, version), model path)
+    """
+    name, path, version = locate_model(backend)
+    if version is not None:
+        return load_registered_model(read_manifest(), version=version)
+    return (name, BACKENDS[name][1](path), None), path
+
+def find_model(strict=False):
+    """
+    Load the model to serve: the manifest's current version if there is a
+    manifest, otherwise the first backend that loads, in preference order
+    (the lookup grid, then the quantized forest, then the exported NumPy
+    forest, then the ONNX model, then the PKL model). Setting AURORA_BACKEND
+    ignores the manifest and restricts this to one backend.
+    
+    Args:
+        strict (bool): Raise if the registered model fails to load, instead
+                       of falling back to the unregistered backends
+    
+    Returns:
+        tuple: ((model_type, predict, version) or None, paths to watch for changes)
+    """
+    names = list(BACKENDS)
+    forced = os.environ.get(BACKEND_ENV)
+    if forced:
+        names = [name for name in names if name.lower() == forced.lower()]
+        if not names:
+            log('warning', "Unknown backend %r in %s, using fallback...", forced, BACKEND_ENV)
+    elif os.path.exists(MANIFEST_PATH):
+        try:
+            with span('model_load'):
+                model, path = load_registered_model(read_manifest())
+            log('info', "Loaded %s model version %s", model[0], model[2])
+            return model, [MANIFEST_PATH, path]
+        except Exception as e:
+            if strict:
+                raise
+            log('error', "Error loading registered model: %s, trying unregistered models...", e)
+    
+    for name in names:
+        try:
+            with span('model_load'):
+                model = (name, load_backend(name), None)
+            return model, [MANIFEST_PATH, BACKENDS[name][0]]
+        except FileNotFoundError:
+            log('info', "%s model not found, trying next model...", name)
+        except ImportError as e:
+            log('info', "%s dependencies not installed (%s), trying next model...", name, e)
+        except Exception as e:
+            log('error', "Error loading %s model: %s, trying next model...", name, e)
+    
+    return None, [MANIFEST_PATH]
+
+def load_model():
+    """
+    Load the model to serve (see find_model) once and reuse it for later
+    predictions.
+    
+    Returns:
+        tuple: (model_type, predict, version) where predict maps latitude and
+               longitude arrays to raw probabilities and version is the
+               registered model version or None, or None if no model could
+               be loaded
+    """
+    global _model, _model_loaded, _model_paths, _model_fingerprint
+    
+    if _model_loaded:
+        return _model
+    
+    with _model_lock:
+        if not _model_loaded:
+            log('debug', "Python script location: %s", os.path.abspath(__file__))
+            _model, _model_paths = find_model()
+            _model_fingerprint = paths_fingerprint(_model_paths)
+            _model_loaded = True
+    return _model
+
+def paths_fingerprint(paths):
+    """Return a value that changes whenever any of the files or directories changes."""
+    return tuple(file_fingerprint(path) for path in paths)
+
+def file_fingerprint(path):
+    """
+    Return a value that changes whenever the file, or any file in the
+    directory, at path is modified or replaced.
+    """
+    if path is None:
+        return None
+    
+    paths = [path]
+    if os.path.isdir(path):
+        paths = sorted(os.path.join(path, name) for name in os.listdir(path))
+    
+    fingerprint = []
+    for p in paths:
+        try:
+            stat = os.stat(p)
+        except OSError:
+            continue
+        fingerprint.append((p, stat.st_ino, stat.st_mtime_ns, stat.st_size))
+    return tuple(fingerprint)
+
+def model_hash(path):
+    """Return the SHA-256 hex digest of a model file, or of every file in a model directory."""
+    import hashlib
+    
+    digest = hashlib.sha256()
+    paths = [path]
+    if os.path.isdir(path):
+        paths = sorted(os.path.join(path, name) for name in os.listdir(path))
+    
+    for p in paths:
+        digest.update(os.path.basename(p).encode('utf-8'))
+        with open(p, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+def refresh_model_if_changed():
+    """
+    Drop the loaded model and the prediction cache if the manifest or the
+    model files changed.
+    
+    Checks at most once per MODEL_CHECK_INTERVAL seconds; the next
+    prediction then reloads the model from disk. Does nothing while
+    start_model_watcher reloads models in the background instead.
+    """
+    global _model_loaded, _model_checked_at
+    
+    if not _model_loaded or _model_watcher is not None:
+        return
+    
+    now = time.monotonic()
+    if now - _model_checked_at < MODEL_CHECK_INTERVAL:
+        return
+    _model_checked_at = now
+    
+    if paths_fingerprint(_model_paths) != _model_fingerprint:
+        log('info', "Model files changed, reloading and clearing the prediction cache...")
+        _model_loaded = False
+        prediction_cache.clear()
+
+def reload_model():
+    """
+    Load the model to serve again and, once it has answered a warm-up batch,
+    swap it in with one assignment, so predictions in flight finish on the
+    previous model and later ones use the new one.
+    
+    Raises:
+        Exception: If the model fails to load or predict; the previous model
+                   is kept
+    """
+    global _model, _model_loaded, _model_paths, _model_fingerprint
+    
+    model, paths = find_model(strict=True)
+    if model is None:
+        raise FileNotFoundError("No model could be loaded")
+    fingerprint = paths_fingerprint(paths)
+    
+    # Touch the new model's pages and sessions before it takes traffic
+    latitudes = [-90.0 + 180.0 * i / (WARMUP_POINTS - 1) for i in range(WARMUP_POINTS)]
+    longitudes = [-180.0 + 360.0 * i / (WARMUP_POINTS - 1) for i in range(WARMUP_POINTS)]
+    model[1](latitudes, longitudes)
+    
+    with _model_lock:
+        _model, _model_paths, _model_fingerprint = model, paths, fingerprint
+        _model_loaded = True
+    prediction_cache.clear()
+    log('info', "Now serving %s model version %s", model[0], model[2])
+
+def watch_model(interval):
+    """Poll the model files every interval seconds, reloading changed models."""
+    failed = None
+    while True:
+        time.sleep(interval)
+        fingerprint = paths_fingerprint(_model_paths)
+        if fingerprint == _model_fingerprint or fingerprint == failed:
+            continue
+        
+        try:
+            reload_model()
+            failed = None
+        except Exception as e:
+            log('error', "Error reloading model: %s, still serving version %s", e, _model[2] if _model else None)
+            # Don't retry until the files change again
+            failed = fingerprint
+
+def start_model_watcher(interval=MODEL_CHECK_INTERVAL):
+    """
+    Load the model, then watch the manifest and model files from a background
+    thread that loads a changed model there and swaps it in atomically
+    (see reload_model). For long-running processes; without it, predictions
+    reload a changed model themselves (see refresh_model_if_changed).
+    """
+    global _model_watcher
+    
+    load_model()
+    if _model_watcher is None:
+        _model_watcher = threading.Thread(target=watch_model, args=(interval,), name='aurora-model-watcher',
+                                          daemon=True)
+        _model_watcher.start()
+
+class PredictionCache:
+    """
+    Bounded LRU cache of model probabilities, keyed by lat/lon cells.
+    
+    Cells are resolution degrees wide, aligned to whole multiples of the
+    resolution. Every point in a cell shares the prediction made at the cell
+    center, so repeated clicks on the same region are answered without
+    inference, at the cost of quantizing answers to the cell: a cached
+    result may differ from the model's at the exact point by as much as the
+    model varies across one cell.
+    """
+    
+    def __init__(self, max_entries, resolution):
+        self.max_entries = max_entries
+        self.resolution = resolution
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+    
+    def key(self, latitude, longitude):
+        """Return the cell containing the coordinates."""
+        return (math.floor(latitude / self.resolution), math.floor(longitude / self.resolution))
+    
+    def center(self, key):
+        """Return the (latitude, longitude) of a cell's center, kept in range."""
+        latitude = min(max((key[0] + 0.5) * self.resolution, -90.0), 90.0)
+        longitude = min(max((key[1] + 0.5) * self.resolution, -180.0), 180.0)
+        return latitude, longitude
+    
+    def get(self, key):
+        """Return the cached probability for a cell, or None."""
+        with self._lock:
+            probability = self._entries.get(key)
+            if probability is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return probability
+    
+    def put(self, key, probability):
+        """Cache a cell's probability, evicting the least recently used cell if full."""
+        with self._lock:
+            self._entries[key] = probability
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        """Drop every cached prediction."""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+    
+    def stats(self):
+        """Return the cache counters as a dict."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'resolution': self.resolution,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+prediction_cache = PredictionCache(
+    int(os.environ.get(CACHE_SIZE_ENV, DEFAULT_CACHE_SIZE)),
+    float(os.environ.get(CACHE_RESOLUTION_ENV, DEFAULT_CACHE_RESOLUTION))
+)
+
+def parse_time(value):
+    """
+    Parse a query time: Unix seconds, or an ISO 8601 string, read as UTC
+    unless it carries an offset.
+    
+    Returns:
+        float: Unix seconds
+    
+    Raises:
+        ValueError: If the value is not a string or number, or not a valid time
+    """
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ValueError(f"time must be an ISO 8601 string or Unix seconds, got {type(value).__name__}")
+    try:
+        seconds = float(value)
+    except ValueError:
+        from datetime import datetime, timezone
+        moment = datetime.fromisoformat(value.strip())
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        seconds = moment.timestamp()
+    if not math.isfinite(seconds):
+        raise ValueError("time must be finite")
+    return seconds
+
+def format_time(seconds):
+    """Format Unix seconds as an ISO 8601 UTC string, like OVATION's timestamps."""
+    from datetime import datetime, timezone
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def cube_record_dtype(n_lat, n_lon):
+    """Return the NumPy dtype of one forecast cube record."""
+    return [('time', '<f8'), ('grid', '<f4', (n_lat, n_lon))]
+
+class ForecastCube:
+    """
+    Memory-mapped time x latitude x longitude cube of OVATION intensities.
+    
+    Only the snapshot times are read up front. A query interpolates the one
+    or two time slices around its time, reading just the grid cells around
+    the queried points.
+    """
+    
+    def __init__(self, path):
+        import numpy as np
+        with open(path, 'rb') as f:
+            header = f.read(CUBE_HEADER.size)
+        if len(header) < CUBE_HEADER.size:
+            raise ValueError(f"{path} is not an aurora forecast cube")
+        magic, version, n_lat, n_lon, count = CUBE_HEADER.unpack(header)
+        if magic != CUBE_MAGIC or version != CUBE_VERSION:
+            raise ValueError(f"{path} is not a version {CUBE_VERSION} aurora forecast cube")
+        if count == 0:
+            raise ValueError(f"{path} holds no snapshots")
+        
+        self.records = np.memmap(path, dtype=cube_record_dtype(n_lat, n_lon), mode='r',
+                                 offset=CUBE_HEADER.size, shape=(count,))
+        self.times = self.records['time'].tolist()
+    
+    def bracket(self, timestamp):
+        """
+        Find the snapshots around a time.
+        
+        Returns:
+            tuple: (earlier index, later index, weight of the later snapshot);
+                   times outside the cube get the first or last snapshot alone
+        """
+        after = bisect_left(self.times, timestamp)
+        if after == len(self.times):
+            return after - 1, after - 1, 0.0
+        if after == 0 or self.times[after] == timestamp:
+            return after, after, 0.0
+        before = after - 1
+        weight = (timestamp - self.times[before]) / (self.times[after] - self.times[before])
+        return before, after, weight
+    
+    def predict(self, latitudes, longitudes, timestamp):
+        """
+        Interpolate intensities at coordinates and a time, bilinearly in space
+        and linearly in time.
+        
+        Returns:
+            tuple: (intensities, dict describing the snapshots used)
+        """
+        before, after, weight = self.bracket(timestamp)
+        grids = self.records['grid']
+        values = make_grid_interpolator(grids[before])(latitudes, longitudes)
+        if weight > 0:
+            later = make_grid_interpolator(grids[after])(latitudes, longitudes)
+            values = values * (1 - weight) + later * weight
+        
+        forecast = {
+            'time': format_time(timestamp),
+            'snapshots': [format_time(self.times[index]) for index in dict.fromkeys((before, after))],
+            'weight': weight,
+        }
+        if not self.times[0] <= timestamp <= self.times[-1]:
+            forecast['outside_range'] = True
+        return values, forecast
+
+def load_forecast_cube():
+    """
+    Open the forecast cube once, reopening it when ingest_aurora_cube.py has
+    appended snapshots (checked at most once per MODEL_CHECK_INTERVAL).
+    
+    Returns:
+        ForecastCube: The open cube
+    """
+    global _cube, _cube_fingerprint, _cube_checked_at
+    
+    now = time.monotonic()
+    if _cube is not None and now - _cube_checked_at < MODEL_CHECK_INTERVAL:
+        return _cube
+    _cube_checked_at = now
+    
+    fingerprint = file_fingerprint(CUBE_PATH)
+    if _cube is None or fingerprint != _cube_fingerprint:
+        if not os.path.exists(CUBE_PATH):
+            raise FileNotFoundError(f"Forecast cube not found at {CUBE_PATH}")
+        with span('model_load'):
+            _cube = ForecastCube(CUBE_PATH)
+        _cube_fingerprint = fingerprint
+        log('info', "Opened forecast cube with %d snapshots", len(_cube.times))
+    return _cube
+
+def predict_probabilities(latitudes, longitudes, use_cache=True):
+    """
+    Run the loaded model on coordinates, answering from the prediction cache
+    where possible.
+    
+    With the cache, each point is predicted at the center of its cache cell
+    and only cells not already cached reach the model.
+    
+    Returns:
+        tuple: (probabilities, model_type, model version), or None if no
+               model is loaded
+    """
+    refresh_model_if_changed()
+    model = load_model()
+    if model is None:
+        return None
+    model_type, predict, version = model
+    
+    if not use_cache or not prediction_cache.enabled:
+        return predict(latitudes, longitudes), model_type, version
+    
+    with span('input_prep'):
+        keys = [prediction_cache.key(latitude, longitude) for latitude, longitude in zip(latitudes, longitudes)]
+        probabilities = [prediction_cache.get(key) for key in keys]
+        missing = list(dict.fromkeys(key for key, probability in zip(keys, probabilities) if probability is None))
+    
+    if missing:
+        centers = [prediction_cache.center(key) for key in missing]
+        values = predict([latitude for latitude, _ in centers], [longitude for _, longitude in centers])
+        with span('postprocess'):
+            computed = dict(zip(missing, (float(value) for value in values)))
+            # A model swapped out meanwhile must not fill the new model's cache
+            if _model is model:
+                for key, probability in computed.items():
+                    prediction_cache.put(key, probability)
+            probabilities = [computed[key] if probability is None else probability
+                             for key, probability in zip(keys, probabilities)]
+    
+    return probabilities, model_type, version
 
 def predict_aurora(latitude, longitude):
     """
@@ -22,99 +1084,195 @@ def predict_aurora(latitude, longitude):
         dict: Prediction results with intensity, color, and description
     """
     
-    onnx_model_path = os.path.join(os.path.dirname(__file__), '..', 'ml', 'aurora_model.onnx')
-    pkl_model_path = os.path.join(os.path.dirname(__file__), '..', 'ml', 'aurora_model_temp.pkl')
-    
-    print(f"[v0] Python script location: {os.path.abspath(__file__)}", file=sys.stderr)
-    print(f"[v0] Looking for ONNX model at: {os.path.abspath(onnx_model_path)}", file=sys.stderr)
-    print(f"[v0] ONNX model exists: {os.path.exists(onnx_model_path)}", file=sys.stderr)
-    print(f"[v0] Looking for PKL model at: {os.path.abspath(pkl_model_path)}", file=sys.stderr)
-    print(f"[v0] PKL model exists: {os.path.exists(pkl_model_path)}", file=sys.stderr)
-    
-    # Try ONNX model first (preferred for production)
-    if os.path.exists(onnx_model_path):
-        try:
-            import onnxruntime as ort
-            print(f"[v0] Loading ONNX model...", file=sys.stderr)
-            
-            session = ort.InferenceSession(onnx_model_path)
-            
-            input_array = np.array([[longitude, latitude]], dtype=np.float32)
-            print(f"[v0] Input array shape: {input_array.shape}, dtype: {input_array.dtype}", file=sys.stderr)
-            print(f"[v0] Input values: longitude={longitude}, latitude={latitude}", file=sys.stderr)
-            
-            # Run inference
-            result = session.run(None, {"float_input": input_array})
-            probability = float(result[0][0])
-            
-            print(f"[v0] ONNX prediction successful: {probability}", file=sys.stderr)
-            
-            # Ensure probability is in valid range
-            probability = max(0, min(100, probability))
+    try:
+        outcome = predict_probabilities([latitude], [longitude])
+        
+        if outcome is not None:
+            probabilities, model_type, version = outcome
+            probability = probabilities[0]
             
-            # Generate description based on probability and location
-            description = generate_description(probability, latitude)
-            color = get_aurora_colors(probability)
+            log('debug', "%s prediction successful: %s", model_type, probability)
             
-            return {
-                'success': True,
-                'prediction': {
-                    'intensity': round(probability, 2),
-                    'color': color,
-                    'description': description,
-                    'latitude': latitude,
-                    'longitude': longitude
-                },
-                'model_type': 'ONNX'
-            }
+            return build_result(probability, latitude, longitude, model_type, version)
             
-        except ImportError:
-            print(f"[v0] onnxruntime not installed, trying PKL model...", file=sys.stderr)
-        except Exception as e:
-            print(f"[v0] Error loading ONNX model: {str(e)}, trying PKL model...", file=sys.stderr)
+    except Exception as e:
+        log('error', "Error running model: %s, using fallback...", e)
     
-    # Try PKL model as backup
-    if os.path.exists(pkl_model_path):
-        try:
-            import pickle
-            print(f"[v0] Loading PKL model...", file=sys.stderr)
-            
-            with open(pkl_model_path, 'rb') as f:
-                model = pickle.load(f)
-            
-            # Prepare input features [latitude, longitude]
-            features = np.array([[latitude, longitude]])
-            
-            # Make prediction (0-100 scale)
-            probability = model.predict(features)[0]
-            
-            print(f"[v0] PKL prediction successful: {probability}", file=sys.stderr)
-            
-            # Ensure probability is in valid range
-            probability = max(0, min(100, probability))
+    # Fallback if no models available
+    log('warning', "No models found, using fallback prediction")
+    return fallback_prediction(latitude, longitude)
+
+def predict_aurora_fast(latitude, longitude):
+    """
+    One-shot prediction from the compact grid, importing nothing beyond the
+    standard library. Used by the CLI unless AURORA_BACKEND picks a backend
+    or a model manifest names the model to serve.
+    
+    Returns:
+        dict: Prediction results, or None if no compact grid is available
+    """
+    if os.environ.get(BACKEND_ENV) or os.path.exists(MANIFEST_PATH) or not os.path.exists(GRID_BIN_PATH):
+        return None
+    
+    try:
+        predict = load_compact_grid(GRID_BIN_PATH)
+    except (OSError, ValueError) as e:
+        log('warning', "Error loading compact grid: %s, loading model...", e)
+        return None
+    
+    return build_result(predict(latitude, longitude), latitude, longitude, 'Table')
+
+def build_result(probability, latitude, longitude, model_type, model_version=None):
+    """Build the JSON-serializable response for a raw model probability."""
+    with span('postprocess'):
+        # Ensure probability is in valid range
+        probability = max(0.0, min(100.0, float(probability)))
+        
+        # Generate description based on probability and location
+        description = generate_description(probability, latitude)
+        color = get_aurora_colors(probability)
+    
+    return {
+        'success': True,
+        'prediction': {
+            'intensity': round(probability, 2),
+            'color': color,
+            'description': description,
+            'latitude': latitude,
+            'longitude': longitude
+        },
+        'model_type': model_type,
+        'model_version': model_version
+    }
+
+def predict_aurora_batch(latitudes, longitudes, use_cache=False):
+    """
+    Predict aurora probability for many coordinates with one model call.
+    
+    Args:
+        latitudes (array-like): Latitudes (-90 to 90)
+        longitudes (array-like): Longitudes (-180 to 180), same length
+        use_cache (bool): Answer from the prediction cache where enabled,
+                          with its cell-quantized values; worthwhile for
+                          small batches of live requests
+    
+    Returns:
+        dict: Batch results; 'predictions' holds NumPy arrays of intensity,
+              color, description, latitude and longitude
+    """
+    import numpy as np
+    with span('input_prep'):
+        latitudes = np.asarray(latitudes, dtype=np.float64).ravel()
+        longitudes = np.asarray(longitudes, dtype=np.float64).ravel()
+    if latitudes.shape != longitudes.shape:
+        raise ValueError("Latitudes and longitudes must have the same length")
+    
+    try:
+        outcome = predict_probabilities(latitudes, longitudes, use_cache)
+        
+        if outcome is not None:
+            probabilities, model_type, version = outcome
+            probabilities = np.asarray(probabilities, dtype=np.float64)
             
-            # Generate description based on probability and location
-            description = generate_description(probability, latitude)
-            color = get_aurora_colors(probability)
+            log('debug', "%s batch prediction successful: %d points", model_type, len(probabilities))
             
-            return {
-                'success': True,
-                'prediction': {
-                    'intensity': round(probability, 2),
-                    'color': color,
-                    'description': description,
-                    'latitude': latitude,
-                    'longitude': longitude
-                },
-                'model_type': 'PKL'
-            }
+            return build_batch_result(probabilities, latitudes, longitudes, model_type, version)
             
-        except Exception as e:
-            print(f"[v0] Error loading PKL model: {str(e)}, using fallback...", file=sys.stderr)
+    except Exception as e:
+        log('error', "Error running model: %s, using fallback...", e)
     
     # Fallback if no models available
-    print(f"[v0] No models found, using fallback prediction", file=sys.stderr)
-    return fallback_prediction(latitude, longitude)
+    log('warning', "No models found, using fallback prediction")
+    return fallback_prediction_batch(latitudes, longitudes)
+
+def predict_forecast_batch(latitudes, longitudes, timestamp):
+    """
+    Predict aurora intensity for many coordinates at one time from the
+    forecast cube.
+    
+    Args:
+        latitudes (array-like): Latitudes (-90 to 90)
+        longitudes (array-like): Longitudes (-180 to 180), same length
+        timestamp (str or float): ISO 8601 time or Unix seconds
+    
+    Returns:
+        dict: Batch results like predict_aurora_batch's, plus a 'forecast'
+              entry naming the snapshots interpolated
+    """
+    import numpy as np
+    with span('input_prep'):
+        latitudes = np.asarray(latitudes, dtype=np.float64).ravel()
+        longitudes = np.asarray(longitudes, dtype=np.float64).ravel()
+        seconds = parse_time(timestamp)
+    if latitudes.shape != longitudes.shape:
+        raise ValueError("Latitudes and longitudes must have the same length")
+    
+    probabilities, forecast = load_forecast_cube().predict(latitudes, longitudes, seconds)
+    
+    batch = build_batch_result(probabilities, latitudes, longitudes, 'Cube')
+    batch['forecast'] = forecast
+    if forecast.get('outside_range'):
+        batch['note'] = 'Requested time is outside the forecast cube - using the nearest snapshot'
+    return batch
+
+def predict_aurora_at(latitude, longitude, timestamp):
+    """
+    Predict aurora intensity at given coordinates and time from the
+    forecast cube.
+    
+    Returns:
+        dict: Prediction results shaped like predict_aurora's, plus 'forecast'
+    """
+    return split_batch_result(predict_forecast_batch([latitude], [longitude], timestamp))[0]
+
+def build_batch_result(probabilities, latitudes, longitudes, model_type, model_version=None):
+    """Build the batch response for an array of raw model probabilities."""
+    import numpy as np
+    with span('postprocess'):
+        # Ensure probabilities are in valid range
+        probabilities = np.clip(probabilities, 0, 100)
+        
+        return {
+            'success': True,
+            'predictions': {
+                'intensity': np.round(probabilities, 2),
+                'color': get_aurora_colors_batch(probabilities),
+                'description': generate_description_batch(probabilities, latitudes),
+                'latitude': latitudes,
+                'longitude': longitudes
+            },
+            'model_type': model_type,
+            'model_version': model_version
+        }
+
+def fallback_prediction_batch(latitudes, longitudes):
+    """Vectorized version of fallback_prediction."""
+    import numpy as np
+    abs_lat = np.abs(latitudes)
+    
+    # Aurora probability increases with latitude
+    probabilities = np.select(
+        [abs_lat > 65, abs_lat > 55, abs_lat > 45],
+        [60 + (abs_lat - 65) * 2, 30 + (abs_lat - 55) * 3, 10 + (abs_lat - 45) * 2],
+        default=abs_lat / 5
+    )
+    
+    # Add some randomness for realism
+    probabilities = np.minimum(100, probabilities + np.random.uniform(-5, 5, size=probabilities.shape))
+    
+    return {
+        'success': True,
+        'predictions': {
+            'intensity': np.round(probabilities, 2),
+            'color': get_aurora_colors_batch(probabilities),
+            'description': generate_description_batch(probabilities, latitudes),
+            'latitude': latitudes,
+            'longitude': longitudes
+        },
+        'note': 'Using fallback prediction - ML model not found',
+        'model_type': 'Fallback',
+        'model_version': None
+    }
 
 def fallback_prediction(latitude, longitude):
     """
@@ -134,7 +1292,8 @@ def fallback_prediction(latitude, longitude):
         probability = max(0, abs_lat / 5)
     
     # Add some randomness for realism
-    probability = min(100, probability + np.random.uniform(-5, 5))
+    import random
+    probability = min(100, probability + random.uniform(-5, 5))
     
     description = generate_description(probability, latitude)
     color = get_aurora_colors(probability)
@@ -149,61 +1308,240 @@ def fallback_prediction(latitude, longitude):
             'longitude': longitude
         },
         'note': 'Using fallback prediction - ML model not found',
-        'model_type': 'Fallback'
+        'model_type': 'Fallback',
+        'model_version': None
     }
 
 def generate_description(probability, latitude):
     """Generate human-readable description of aurora visibility."""
-    abs_lat = abs(latitude)
     hemisphere = "Northern" if latitude >= 0 else "Southern"
-    
-    if probability > 70:
-        return f"Excellent! Very high chance of seeing bright auroras in the {hemisphere} sky!"
-    elif probability > 50:
-        return f"Great! Strong aurora activity expected in the {hemisphere} hemisphere!"
-    elif probability > 30:
-        return f"Good chance of seeing auroras if skies are clear in the {hemisphere} regions!"
-    elif probability > 15:
-        return f"Moderate chance - auroras may be visible on the {hemisphere} horizon!"
-    elif probability > 5:
-        return f"Low probability - auroras unlikely but possible during strong storms!"
-    else:
-        return f"Very low chance from this location. Try locations closer to the poles!"
+    band = bisect_left(DESCRIPTION_THRESHOLDS, probability)
+    return AURORA_DESCRIPTIONS[band].format(hemisphere=hemisphere)
 
 def get_aurora_colors(probability):
     """Determine aurora colors based on intensity."""
-    if probability > 70:
-        return "Green, Pink, Purple, and Red"
-    elif probability > 50:
-        return "Green, Pink, and Purple"
-    elif probability > 30:
-        return "Green and Pink"
-    elif probability > 15:
-        return "Pale Green"
+    return AURORA_COLORS[bisect_left(COLOR_THRESHOLDS, probability)]
+
+def generate_description_batch(probabilities, latitudes):
+    """Vectorized version of generate_description; returns an array of strings."""
+    import numpy as np
+    descriptions = np.array([
+        [template.format(hemisphere=hemisphere) for template in AURORA_DESCRIPTIONS]
+        for hemisphere in ("Southern", "Northern")
+    ])
+    bands = np.searchsorted(DESCRIPTION_THRESHOLDS, probabilities, side='left')
+    return descriptions[(np.asarray(latitudes) >= 0).astype(np.intp), bands]
+
+def get_aurora_colors_batch(probabilities):
+    """Vectorized version of get_aurora_colors; returns an array of strings."""
+    import numpy as np
+    bands = np.searchsorted(COLOR_THRESHOLDS, probabilities, side='left')
+    return np.array(AURORA_COLORS)[bands]
+
+def validate_coordinates(latitude, longitude):
+    """Raise ValueError if the coordinates are outside the valid range."""
+    if not (-90 <= latitude <= 90):
+        raise ValueError("Latitude must be between -90 and 90")
+    if not (-180 <= longitude <= 180):
+        raise ValueError("Longitude must be between -180 and 180")
+
+def request_from_server(socket_path, latitude, longitude, timestamp=None):
+    """
+    Ask a running aurora_server.py for a prediction over its Unix socket.
+    
+    Args:
+        timestamp (str): Time to predict for from the forecast cube, if any
+    
+    Returns:
+        dict: The server's response, without the request id
+    """
+    import socket
+    
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(10)
+        sock.connect(socket_path)
+        request = {'id': 0, 'latitude': latitude, 'longitude': longitude}
+        if timestamp is not None:
+            request['time'] = timestamp
+        sock.sendall((json.dumps(request) + '\n').encode('utf-8'))
+        
+        with sock.makefile('r', encoding='utf-8') as stream:
+            line = stream.readline()
+    
+    if not line:
+        raise ConnectionError('Prediction server closed the connection')
+    
+    result = json.loads(line)
+    result.pop('id', None)
+    return result
+
+def parse_batch_line(line):
+    """
+    Parse one batch-mode input line, CSV or NDJSON, into (latitude,
+    longitude, time), where time is None unless the line gives one and
+    Unix seconds otherwise.
+    
+    Raises:
+        ValueError: If a field is missing its value or holds an invalid one
+    """
+    if line.startswith('{'):
+        record = json.loads(line)
+        timestamp = record.get('time')
+        latitude, longitude = float(record['latitude']), float(record['longitude'])
     else:
-        return "Faint Green (if visible)"
+        fields = line.split(',')
+        timestamp = fields[2].strip() if len(fields) > 2 and fields[2].strip() else None
+        latitude, longitude = float(fields[0]), float(fields[1])
+    
+    # Parsed here so a bad time fails its own line, and rows for the same
+    # moment share one forecast lookup however it was written
+    return latitude, longitude, None if timestamp is None else parse_time(timestamp)
+
+def split_batch_result(batch):
+    """
+    Split a predict_aurora_batch result into per-point results shaped like
+    predict_aurora's.
+    
+    Returns:
+        list: One JSON-serializable dict per point
+    """
+    with span('postprocess'):
+        predictions = batch['predictions']
+        columns = zip(
+            predictions['intensity'].tolist(),
+            predictions['color'].tolist(),
+            predictions['description'].tolist(),
+            predictions['latitude'].tolist(),
+            predictions['longitude'].tolist()
+        )
+        
+        results = []
+        for intensity, color, description, latitude, longitude in columns:
+            result = {
+                'success': True,
+                'prediction': {
+                    'intensity': intensity,
+                    'color': color,
+                    'description': description,
+                    'latitude': latitude,
+                    'longitude': longitude
+                },
+                'model_type': batch['model_type'],
+                'model_version': batch['model_version']
+            }
+            for key in ('note', 'forecast'):
+                if key in batch:
+                    result[key] = batch[key]
+            results.append(result)
+    return results
+
+def write_batch(rows, output_stream):
+    """Predict a chunk of parsed batch rows and write one JSON line per row."""
+    # Rows are predicted together per time; None means the model
+    groups = {}
+    for index, row in enumerate(rows):
+        if not isinstance(row, str):
+            groups.setdefault(row[2], []).append(index)
+    
+    results = {}
+    for timestamp, indices in groups.items():
+        latitudes = [rows[index][0] for index in indices]
+        longitudes = [rows[index][1] for index in indices]
+        if timestamp is None:
+            results.update(zip(indices, split_batch_result(predict_aurora_batch(latitudes, longitudes))))
+            continue
+        
+        try:
+            batch = predict_forecast_batch(latitudes, longitudes, timestamp)
+            results.update(zip(indices, split_batch_result(batch)))
+        except ValueError as e:
+            results.update((index, {'success': False, 'error': f'Invalid input: {str(e)}'}) for index in indices)
+        except Exception as e:
+            results.update((index, {'success': False, 'error': f'Prediction failed: {str(e)}'}) for index in indices)
+    
+    lines = []
+    for index, row in enumerate(rows):
+        if isinstance(row, str):
+            lines.append(json.dumps({'success': False, 'error': row}))
+        else:
+            lines.append(json.dumps(results[index]))
+    
+    output_stream.write('\n'.join(lines) + '\n')
+    output_stream.flush()
+
+def run_batch(input_stream, output_stream):
+    """
+    Stream batch predictions: read CSV or NDJSON coordinates from input_stream
+    and write one JSON result line per input line to output_stream.
+    
+    Lines are evaluated in chunks of BATCH_CHUNK_SIZE so results start flowing
+    before the input ends. An optional "latitude,longitude" CSV header is skipped.
+    """
+    rows = []
+    for line in input_stream:
+        line = line.strip()
+        if not line or line.lower().startswith('lat'):
+            continue
+        
+        try:
+            latitude, longitude, timestamp = parse_batch_line(line)
+            validate_coordinates(latitude, longitude)
+            rows.append((latitude, longitude, timestamp))
+        except (ValueError, KeyError, TypeError) as e:
+            rows.append(f'Invalid input: {str(e)}')
+        
+        if len(rows) >= BATCH_CHUNK_SIZE:
+            write_batch(rows, output_stream)
+            rows = []
+    
+    if rows:
+        write_batch(rows, output_stream)
 
 def main():
     """Main entry point for the script."""
-    if len(sys.argv) != 3:
+    if sys.argv[1:] == ['--batch']:
+        try:
+            run_batch(sys.stdin, sys.stdout)
+        except Exception as e:
+            print(json.dumps({
+                'success': False,
+                'error': f'Prediction failed: {str(e)}'
+            }))
+            sys.exit(1)
+        return
+    
+    if len(sys.argv) not in (3, 4):
         print(json.dumps({
             'success': False,
-            'error': 'Usage: python aurora_prediction.py <latitude> <longitude>'
+            'error': 'Usage: python aurora_prediction.py <latitude> <longitude> [time] | --batch'
         }))
         sys.exit(1)
     
     try:
         latitude = float(sys.argv[1])
         longitude = float(sys.argv[2])
+        timestamp = sys.argv[3] if len(sys.argv) == 4 else None
         
         # Validate coordinates
-        if not (-90 <= latitude <= 90):
-            raise ValueError("Latitude must be between -90 and 90")
-        if not (-180 <= longitude <= 180):
-            raise ValueError("Longitude must be between -180 and 180")
+        validate_coordinates(latitude, longitude)
+        
+        # Prefer a running prediction server, which already has the model loaded
+        result = None
+        socket_path = os.environ.get(SERVER_SOCKET_ENV)
+        if socket_path and os.path.exists(socket_path):
+            try:
+                result = request_from_server(socket_path, latitude, longitude, timestamp)
+            except (OSError, ValueError) as e:
+                log('warning', "Prediction server unavailable: %s, predicting locally...", e)
         
-        # Make prediction
-        result = predict_aurora(latitude, longitude)
+        # Make prediction, from the forecast cube for a time, else from the
+        # compact grid if possible
+        if result is None and timestamp is not None:
+            result = predict_aurora_at(latitude, longitude, timestamp)
+        if result is None:
+            result = predict_aurora_fast(latitude, longitude)
+        if result is None:
+            result = predict_aurora(latitude, longitude)
         
         # Output JSON result
         print(json.dumps(result))
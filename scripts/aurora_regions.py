@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Aurora Region and Path Aggregates
+Answers "where in this area is best?" queries: the max, mean and
+percentiles of aurora intensity over a latitude/longitude bounding box or
+polygon, or along a great-circle route through waypoints (e.g. a flight),
+together with the best spot and its intensity.
+
+Boxes and polygons are sampled at the grid nodes inside them, routes every
+step_km along each great-circle leg, and all samples are predicted with one
+batch call to the loaded model, or to the forecast cube when a time is given.
+
+Aggregate request (aurora_server.py {"aggregate": {...}}, or the JSON argument
+of this script):
+
+    {"bbox": [south, west, north, east]}         west > east crosses the 180 meridian
+    {"polygon": [[lat, lon], [lat, lon], ...]}   not crossing the 180 meridian
+    {"path": [[lat, lon], [lat, lon], ...]}      waypoints of a route
+
+plus optional "percentiles" (default [50, 90]), "resolution" in degrees for
+areas (default 0.25), "step_km" for routes (default 25) and "time".
+
+Usage:
+    python aurora_regions.py '{"bbox": [60, 5, 72, 30]}'
+    python aurora_regions.py '{"path": [[60.3, 5.2], [64.1, -21.9]], "time": "2025-10-01T22:00:00Z"}'
+"""
+
+import sys
+import json
+import numpy as np
+
+from aurora_prediction import load_forecast_cube, parse_time, predict_probabilities, validate_coordinates
+
+# Defaults for sampling areas and routes
+DEFAULT_RESOLUTION = 0.25
+DEFAULT_STEP_KM = 25.0
+DEFAULT_PERCENTILES = [50, 90]
+
+# Largest number of samples evaluated for one query
+MAX_POINTS = 2000000
+
+EARTH_RADIUS_KM = 6371.0
+
+def axis_nodes(low, high, resolution):
+    """Return the multiples of resolution from low to high, or the midpoint if there are none."""
+    nodes = np.arange(np.ceil(low / resolution), np.floor(high / resolution) + 1) * resolution
+    return nodes if len(nodes) else np.array([(low + high) / 2])
+
+def bbox_points(south, west, north, east, resolution=DEFAULT_RESOLUTION):
+    """
+    Sample a bounding box at the grid nodes inside it.
+
+    A box with west > east crosses the 180 meridian.
+
+    Returns:
+        tuple: (latitudes, longitudes) arrays
+    """
+    validate_coordinates(south, west)
+    validate_coordinates(north, east)
+    if south > north:
+        raise ValueError("Bounding box south must not be above north")
+
+    latitudes = axis_nodes(south, north, resolution)
+    if west <= east:
+        longitudes = axis_nodes(west, east, resolution)
+    else:
+        longitudes = np.concatenate((axis_nodes(west, 180.0, resolution), axis_nodes(-180.0, east, resolution)))
+
+    if len(latitudes) * len(longitudes) > MAX_POINTS:
+        raise ValueError(f"Area has more than {MAX_POINTS} points at {resolution:g} degrees, "
+                         f"use a coarser resolution")
+    lat_mesh, lon_mesh = np.meshgrid(latitudes, longitudes, indexing='ij')
+    return lat_mesh.ravel(), lon_mesh.ravel()
+
+def points_in_polygon(latitudes, longitudes, vertices):
+    """
+    Return a mask of the points inside a lat/lon polygon (even-odd rule),
+    looping over the edges and vectorized over the points.
+    """
+    inside = np.zeros(len(latitudes), dtype=bool)
+    for (lat1, lon1), (lat2, lon2) in zip(vertices, np.roll(vertices, 1, axis=0)):
+        if lat1 == lat2:
+            continue
+        crosses = (lat1 > latitudes) != (lat2 > latitudes)
+        edge_longitudes = lon1 + (latitudes - lat1) * (lon2 - lon1) / (lat2 - lat1)
+        inside ^= crosses & (longitudes < edge_longitudes)
+    return inside
+
+def polygon_points(vertices, resolution=DEFAULT_RESOLUTION):
+    """
+    Sample a polygon, given as [latitude, longitude] vertices, at the grid
+    nodes inside it.
+
+    Returns:
+        tuple: (latitudes, longitudes) arrays
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    if vertices.ndim != 2 or vertices.shape[1] != 2 or len(vertices) < 3:
+        raise ValueError("Polygon must have at least 3 [latitude, longitude] vertices")
+    for latitude, longitude in vertices:
+        validate_coordinates(latitude, longitude)
+
+    south, west = vertices.min(axis=0)
+    north, east = vertices.max(axis=0)
+    latitudes, longitudes = bbox_points(south, west, north, east, resolution)
+    inside = points_in_polygon(latitudes, longitudes, vertices)
+    if not inside.any():
+        # Smaller than a grid cell: use the vertices' centroid
+        return vertices[:, :1].mean(axis=0), vertices[:, 1:].mean(axis=0)
+    return latitudes[inside], longitudes[inside]
+
+def to_unit_vectors(latitudes, longitudes):
+    """Convert degrees to (n, 3) unit vectors."""
+    lat = np.radians(latitudes)
+    lon = np.radians(longitudes)
+    return np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+
+def from_unit_vectors(vectors):
+    """Convert (n, 3) unit vectors to (latitudes, longitudes) in degrees."""
+    latitudes = np.degrees(np.arcsin(np.clip(vectors[:, 2], -1.0, 1.0)))
+    longitudes = np.degrees(np.arctan2(vectors[:, 1], vectors[:, 0]))
+    return latitudes, longitudes
+
+def path_points(waypoints, step_km=DEFAULT_STEP_KM):
+    """
+    Sample a route along the great circles between consecutive waypoints,
+    given as [latitude, longitude], at most step_km apart.
+
+    Returns:
+        tuple: (latitudes, longitudes, distance along the route in km) arrays
+    """
+    waypoints = np.asarray(waypoints, dtype=np.float64)
+    if waypoints.ndim != 2 or waypoints.shape[1] != 2 or len(waypoints) < 2:
+        raise ValueError("Path must have at least 2 [latitude, longitude] waypoints")
+    if step_km <= 0:
+        raise ValueError("step_km must be positive")
+    for latitude, longitude in waypoints:
+        validate_coordinates(latitude, longitude)
+
+    ends = to_unit_vectors(waypoints[:, 0], waypoints[:, 1])
+    angles = np.arccos(np.clip(np.einsum('ij,ij->i', ends[:-1], ends[1:]), -1.0, 1.0))
+    steps = np.maximum(np.ceil(angles * EARTH_RADIUS_KM / step_km).astype(np.intp), 1)
+    if steps.sum() + 1 > MAX_POINTS:
+        raise ValueError(f"Path has more than {MAX_POINTS} points at {step_km:g} km, use a longer step")
+
+    # Fractions along each leg, with the final waypoint added once at the end
+    leg = np.repeat(np.arange(len(steps)), steps)
+    fraction = np.arange(len(leg)) - np.repeat(np.cumsum(steps) - steps, steps)
+    fraction = fraction / steps[leg]
+    leg = np.append(leg, len(steps) - 1)
+    fraction = np.append(fraction, 1.0)
+
+    # Spherical linear interpolation; legs between (nearly) equal points stay put
+    angle = angles[leg]
+    sin_angle = np.sin(angle)
+    flat = sin_angle < 1e-12
+    safe = np.where(flat, 1.0, sin_angle)
+    start_weight = np.where(flat, 1.0 - fraction, np.sin((1.0 - fraction) * angle) / safe)
+    end_weight = np.where(flat, fraction, np.sin(fraction * angle) / safe)
+    vectors = start_weight[:, None] * ends[leg] + end_weight[:, None] * ends[leg + 1]
+    vectors /= np.linalg.norm(vectors, axis=1)[:, None]
+
+    latitudes, longitudes = from_unit_vectors(vectors)
+    distances = (np.concatenate(([0.0], np.cumsum(angles)))[leg] + fraction * angle) * EARTH_RADIUS_KM
+    return latitudes, longitudes, distances
+
+def evaluate(latitudes, longitudes, timestamp=None):
+    """
+    Predict every sample with one batch call.
+
+    Returns:
+        tuple: (intensities clamped to 0-100, model_type, model version,
+                forecast dict or None)
+    """
+    if timestamp is not None:
+        values, forecast = load_forecast_cube().predict(latitudes, longitudes, parse_time(timestamp))
+        return np.clip(values, 0, 100), 'Cube', None, forecast
+
+    outcome = predict_probabilities(latitudes, longitudes, use_cache=False)
+    if outcome is None:
+        raise RuntimeError("No aurora model available")
+    values, model_type, version = outcome
+    return np.clip(np.asarray(values, dtype=np.float64), 0, 100), model_type, version, None
+
+def summarize(values, latitudes, longitudes, percentiles=DEFAULT_PERCENTILES):
+    """
+    Aggregate sampled intensities.
+
+    Returns:
+        dict: points, max, mean, percentiles and the best spot
+    """
+    best = int(np.argmax(values))
+    levels = np.percentile(values, percentiles) if len(percentiles) else []
+    return {
+        'points': len(values),
+        'max': round(float(values[best]), 2),
+        'mean': round(float(values.mean()), 2),
+        'percentiles': {f'{q:g}': round(float(level), 2) for q, level in zip(percentiles, levels)},
+        'best': {
+            'latitude': round(float(latitudes[best]), 4),
+            'longitude': round(float(longitudes[best]), 4),
+            'intensity': round(float(values[best]), 2),
+        },
+    }
+
+def aggregate_query(query):
+    """
+    Answer one aggregate request (see the module docstring).
+
+    Returns:
+        dict: {'success', 'aggregate', 'model_type', 'model_version'} plus 'forecast' for timed queries
+    """
+    percentiles = [float(q) for q in query.get('percentiles', DEFAULT_PERCENTILES)]
+    if any(not 0 <= q <= 100 for q in percentiles):
+        raise ValueError("Percentiles must be between 0 and 100")
+    resolution = float(query.get('resolution', DEFAULT_RESOLUTION))
+    if resolution <= 0:
+        raise ValueError("resolution must be positive")
+
+    distances = None
+    if 'bbox' in query:
+        south, west, north, east = (float(value) for value in query['bbox'])
+        latitudes, longitudes = bbox_points(south, west, north, east, resolution)
+    elif 'polygon' in query:
+        latitudes, longitudes = polygon_points(query['polygon'], resolution)
+    elif 'path' in query:
+        latitudes, longitudes, distances = path_points(query['path'], float(query.get('step_km', DEFAULT_STEP_KM)))
+    else:
+        raise ValueError("Aggregate request needs a bbox, polygon or path")
+
+    values, model_type, version, forecast = evaluate(latitudes, longitudes, query.get('time'))
+    aggregate = summarize(values, latitudes, longitudes, percentiles)
+    if distances is not None:
+        aggregate['distance_km'] = round(float(distances[-1]), 1)
+        aggregate['best']['distance_km'] = round(float(distances[int(np.argmax(values))]), 1)
+
+    result = {'success': True, 'aggregate': aggregate, 'model_type': model_type, 'model_version': version}
+    if forecast is not None:
+        result['forecast'] = forecast
+    return result
+
+def main():
+    """Main entry point for the script."""
+    if len(sys.argv) != 2:
+        print(json.dumps({
+            'success': False,
+            'error': 'Usage: python aurora_regions.py \'{"bbox": [south, west, north, east]}\''
+        }))
+        sys.exit(1)
+
+    try:
+        print(json.dumps(aggregate_query(json.loads(sys.argv[1]))))
+    except (ValueError, KeyError, TypeError) as e:
+        print(json.dumps({
+            'success': False,
+            'error': f'Invalid input: {str(e)}'
+        }))
+        sys.exit(1)
+    except Exception as e:
+        print(json.dumps({
+            'success': False,
+            'error': f'Prediction failed: {str(e)}'
+        }))
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Aurora Model Registry
+Manages ml/model_manifest.json, the manifest naming the model versions the
+prediction service can serve and the current one:
+
+    {"current": "20251001T000000Z",
+     "models": {"20251001T000000Z": {"backend": "QForest",
+                                     "path": "registry/20251001T000000Z/aurora_forest.qbin",
+                                     "feature_order": ["longitude", "latitude"],
+                                     "sha256": "...",
+                                     "registered": "2025-10-01T00:00:00Z"}}}
+
+Registering copies the model file (or directory) into ml/registry/VERSION/,
+so a version's files never change once registered and promoting an older
+version rolls back. The manifest is replaced atomically on every change, and
+a running aurora_server.py picks up a new current version within a second,
+without a restart (see start_model_watcher in aurora_prediction.py).
+
+Usage:
+    python aurora_registry.py register PATH --backend QForest [--version V] [--promote]
+    python aurora_registry.py promote VERSION
+    python aurora_registry.py list
+    python aurora_registry.py verify
+"""
+
+import sys
+import json
+import os
+import argparse
+import shutil
+import time
+
+from aurora_prediction import BACKENDS, MANIFEST_PATH, MODEL_FEATURE_ORDER, format_time, model_hash, read_manifest
+
+# Directory, next to the manifest, holding one subdirectory per version
+REGISTRY_DIR_NAME = 'registry'
+
+def load_manifest(manifest_path):
+    """Return the manifest, or an empty one if there is none yet."""
+    if not os.path.exists(manifest_path):
+        return {'current': None, 'models': {}}
+    return read_manifest(manifest_path)
+
+def write_manifest(manifest, manifest_path):
+    """Replace the manifest atomically, so readers never see a partial file."""
+    temporary_path = f'{manifest_path}.{os.getpid()}.tmp'
+    with open(temporary_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary_path, manifest_path)
+
+def register(manifest, manifest_path, model_path, backend, version):
+    """
+    Copy a model into the registry and add it to the manifest.
+
+    Returns:
+        dict: The new manifest entry
+    """
+    if version in manifest['models']:
+        raise ValueError(f"Model version {version} is already registered")
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"No model at {model_path}")
+
+    manifest_dir = os.path.dirname(os.path.abspath(manifest_path))
+    destination = os.path.join(manifest_dir, REGISTRY_DIR_NAME, version, os.path.basename(os.path.normpath(model_path)))
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    if os.path.isdir(model_path):
+        shutil.copytree(model_path, destination)
+    else:
+        shutil.copy2(model_path, destination)
+
+    entry = {
+        'backend': backend,
+        'path': os.path.relpath(destination, manifest_dir),
+        'feature_order': MODEL_FEATURE_ORDER,
+        'sha256': model_hash(destination),
+        'registered': format_time(time.time()),
+    }
+    manifest['models'][version] = entry
+    return entry
+
+def verify(manifest, manifest_path, version):
+    """Return None if a version's files match its checksum, else the problem."""
+    entry = manifest['models'][version]
+    path = os.path.join(os.path.dirname(os.path.abspath(manifest_path)), entry['path'])
+    if not os.path.exists(path):
+        return f"missing {path}"
+    if model_hash(path) != entry['sha256']:
+        return f"checksum mismatch at {path}"
+    return None
+
+def main():
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description='Manage the aurora model registry')
+    parser.add_argument('--manifest', default=MANIFEST_PATH, help='Manifest path (default: ml/model_manifest.json)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    register_parser = commands.add_parser('register', help='Copy a model into the registry')
+    register_parser.add_argument('path', help='Model file or directory')
+    register_parser.add_argument('--backend', required=True, choices=list(BACKENDS), help='Backend that loads it')
+    register_parser.add_argument('--version', help='Version name (default: the current UTC time)')
+    register_parser.add_argument('--promote', action='store_true', help='Make it the current version')
+
+    promote_parser = commands.add_parser('promote', help='Make a registered version the current one')
+    promote_parser.add_argument('version')
+
+    commands.add_parser('list', help='List registered versions')
+    commands.add_parser('verify', help='Check every version against its checksum')
+    args = parser.parse_args()
+
+    manifest = load_manifest(args.manifest)
+
+    try:
+        if args.command == 'register':
+            version = args.version or time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())
+            entry = register(manifest, args.manifest, args.path, args.backend, version)
+            if args.promote or manifest['current'] is None:
+                manifest['current'] = version
+            write_manifest(manifest, args.manifest)
+            print(f"[v0] Registered {args.backend} model version {version} ({entry['sha256'][:12]})"
+                  f"{', now current' if manifest['current'] == version else ''}", file=sys.stderr)
+
+        elif args.command == 'promote':
+            if args.version not in manifest['models']:
+                raise ValueError(f"Model version {args.version} is not registered")
+            problem = verify(manifest, args.manifest, args.version)
+            if problem:
+                raise ValueError(f"Model version {args.version}: {problem}")
+            manifest['current'] = args.version
+            write_manifest(manifest, args.manifest)
+            print(f"[v0] Model version {args.version} is now current", file=sys.stderr)
+
+        elif args.command == 'list':
+            for version, entry in sorted(manifest['models'].items(), key=lambda item: item[1]['registered']):
+                mark = '*' if version == manifest['current'] else ' '
+                print(f"{mark} {version:<24} {entry['backend']:<8} {entry['sha256'][:12]}  {entry['path']}")
+
+        elif args.command == 'verify':
+            problems = {version: verify(manifest, args.manifest, version) for version in manifest['models']}
+            for version, problem in problems.items():
+                print(f"{version}: {problem or 'ok'}")
+            if any(problems.values()):
+                sys.exit(1)
+
+    except (ValueError, FileNotFoundError) as e:
+        print(f"[v0] {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Aurora Micro-Batching Scheduler
+Collects concurrent single-point prediction requests for a short window and
+answers them with one vectorized predict_aurora_batch call.
+
+A request waits at most the batching window plus one batch inference, so
+latency stays bounded while bursts of clicks share a single model call. The
+window is only waited out while requests arrive together: a lone request,
+with nothing queued behind it after a single-request batch, runs at once.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from functools import partial
+
+from aurora_prediction import predict_aurora_batch, split_batch_result
+
+# Defaults for the batching window and the largest batch run at once
+DEFAULT_WINDOW_MS = 2.0
+DEFAULT_MAX_BATCH_SIZE = 256
+
+class MicroBatchScheduler:
+    """Runs queued prediction requests in batches on a background thread."""
+
+    def __init__(self, window_ms=DEFAULT_WINDOW_MS, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 predict_batch=partial(predict_aurora_batch, use_cache=True)):
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.predict_batch = predict_batch
+
+        # Counters for tuning the window and batch size
+        self.requests_served = 0
+        self.batches_run = 0
+        self.largest_batch = 0
+        self.immediate_batches = 0
+
+        # Size of the last batch collected, > 1 while requests arrive together
+        self._last_batch_size = 0
+
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name='aurora-batcher', daemon=True)
+        self._worker.start()
+
+    def submit(self, latitude, longitude):
+        """
+        Queue one prediction.
+
+        Returns:
+            Future: Resolves to a dict shaped like predict_aurora's result
+        """
+        future = Future()
+        self._queue.put((latitude, longitude, future))
+        return future
+
+    def predict(self, latitude, longitude):
+        """Queue one prediction and wait for its result."""
+        return self.submit(latitude, longitude).result()
+
+    def close(self):
+        """Finish the queued requests and stop the worker thread."""
+        self._queue.put(None)
+        self._worker.join()
+
+    def stats(self):
+        """Return the batching counters as a dict."""
+        return {
+            'requests_served': self.requests_served,
+            'batches_run': self.batches_run,
+            'largest_batch': self.largest_batch,
+            'immediate_batches': self.immediate_batches,
+            'mean_batch_size': self.requests_served / self.batches_run if self.batches_run else 0.0,
+        }
+
+    def _collect(self, first):
+        """
+        Gather requests arriving within the window after the first one, or
+        none if the first is alone: nothing is queued behind it and the last
+        batch was a single request too.
+        """
+        batch = [first]
+        if self._queue.empty() and self._last_batch_size <= 1:
+            self._last_batch_size = 1
+            self.immediate_batches += 1
+            return batch
+
+        deadline = time.perf_counter() + self.window
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Leave the stop marker for the main loop
+                self._queue.put(None)
+                break
+            batch.append(item)
+
+        self._last_batch_size = len(batch)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = self._collect(first)
+            futures = [future for _, _, future in batch]
+
+            try:
+                latitudes = [latitude for latitude, _, _ in batch]
+                longitudes = [longitude for _, longitude, _ in batch]
+                results = split_batch_result(self.predict_batch(latitudes, longitudes))
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+
+            self.requests_served += len(batch)
+            self.batches_run += 1
+            self.largest_batch = max(self.largest_batch, len(batch))
+
+            for future, result in zip(futures, results):
+                future.set_result(result)
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Aurora Prediction Server
+Keeps the aurora model loaded in a long-lived process and answers
+newline-delimited JSON requests over stdin/stdout or a local Unix socket.
+
+Request:  {"id": 1, "latitude": 69.65, "longitude": 18.96}
+Response: {"id": 1, "success": true, "prediction": {...}, "model_type": "ONNX", "model_version": "20251001T000000Z"}
+
+The model is the model registry's current version (see aurora_registry.py),
+and model_version reports the version that answered. When the manifest or
+the model files change, the new model is loaded and warmed up on a
+background thread and swapped in at once; requests meanwhile are answered by
+the previous model.
+
+A request with a "time" (ISO 8601 or Unix seconds) is answered from the
+forecast cube instead (see ingest_aurora_cube.py):
+
+Request:  {"id": 1, "latitude": 69.65, "longitude": 18.96, "time": "2025-10-01T22:00:00Z"}
+Response: {"id": 1, "success": true, "prediction": {...}, "model_type": "Cube", "forecast": {...}}
+
+Concurrent requests are collected for a few milliseconds and answered with
+one vectorized inference (see aurora_scheduler.py); responses then arrive in
+completion order and are matched to requests by id.
+
+An aggregate request returns the max, mean, percentiles and best spot over
+a bounding box, polygon or route (see aurora_regions.py):
+
+Request:  {"id": 3, "aggregate": {"bbox": [60, 5, 72, 30]}}
+Response: {"id": 3, "success": true, "aggregate": {"max": ..., "best": {...}, ...}, "model_type": "Table"}
+
+A nearest request returns the closest grid cells whose intensity reaches a
+threshold (see aurora_nearby.py):
+
+Request:  {"id": 4, "nearest": {"latitude": 59.9, "longitude": 10.7, "threshold": 30}}
+Response: {"id": 4, "success": true, "locations": [{"latitude": ..., "distance_km": ...}, ...], ...}
+
+A stats request returns the worker's timing spans (see aurora_metrics.py),
+prediction cache and batching counters, as JSON or as Prometheus text:
+
+Request:  {"id": 2, "stats": "json"}          (or "prometheus")
+Response: {"id": 2, "success": true, "stats": {...}}
+          {"id": 2, "success": true, "prometheus": "# TYPE ..."}
+
+With --workers, each response covers the worker that answered it.
+
+Usage:
+    python aurora_server.py                  # serve on stdin/stdout
+    python aurora_server.py --socket PATH    # serve on a Unix socket
+    python aurora_server.py --socket PATH --workers 4    # pre-forked worker pool
+    python aurora_server.py --batch-window-ms 0    # answer each request on its own
+    python aurora_server.py --log-level info       # log model loading (default: warning)
+    AURORA_CACHE_SIZE=10000 python aurora_server.py    # cache predictions per 0.1 degree cell
+"""
+
+import sys
+import json
+import os
+import argparse
+import signal
+import socketserver
+import threading
+import time
+import traceback
+from collections import deque
+
+from aurora_metrics import DEFAULT_LOG_LEVEL, LOG_LEVELS, log, prometheus_text, set_log_level, timings
+from aurora_prediction import (load_model, predict_aurora, predict_aurora_at, prediction_cache, start_model_watcher,
+                               validate_coordinates)
+from aurora_nearby import nearest_query
+from aurora_regions import aggregate_query
+from aurora_scheduler import DEFAULT_MAX_BATCH_SIZE, DEFAULT_WINDOW_MS, MicroBatchScheduler
+
+# Errors that mean the request itself was malformed
+INVALID_REQUEST_ERRORS = (ValueError, KeyError, TypeError, AttributeError)
+
+# Failed workers are restarted after a delay doubling from the first to the
+# largest, and the pool gives up after this many failures within the window
+WORKER_RESTART_DELAY = 0.1
+WORKER_MAX_RESTART_DELAY = 10.0
+WORKER_FAILURE_LIMIT = 5
+WORKER_FAILURE_WINDOW = 60.0
+
+def parse_request(request):
+    """
+    Read and validate the coordinates of one decoded request.
+
+    Returns:
+        tuple: (latitude, longitude)
+    """
+    latitude = float(request['latitude'])
+    longitude = float(request['longitude'])
+    validate_coordinates(latitude, longitude)
+    return latitude, longitude
+
+def collect_stats(scheduler=None):
+    """
+    Gather this worker's instrumentation.
+
+    Returns:
+        dict: Timing spans, prediction cache and batching counters
+    """
+    model = load_model()
+    stats = {
+        'pid': os.getpid(),
+        'model_type': model[0] if model else 'Fallback',
+        'model_version': model[2] if model else None,
+        'spans': timings.snapshot(),
+        'cache': prediction_cache.stats(),
+    }
+    if scheduler is not None:
+        stats['batching'] = scheduler.stats()
+    return stats
+
+def stats_response(stats_format, scheduler=None):
+    """
+    Answer a stats request.
+
+    Args:
+        stats_format (str): 'json' for a stats dict, 'prometheus' for text exposition
+
+    Returns:
+        dict: The response, without the request id
+    """
+    stats = collect_stats(scheduler)
+    if stats_format == 'json':
+        return {'success': True, 'stats': stats}
+    if stats_format != 'prometheus':
+        raise ValueError(f"Unknown stats format {stats_format!r}, expected json or prometheus")
+
+    gauges = {f'aurora_cache_{name}': value for name, value in stats['cache'].items()}
+    for name, value in stats.get('batching', {}).items():
+        gauges[f'aurora_batching_{name}'] = value
+    return {'success': True, 'prometheus': prometheus_text(gauges)}
+
+def handle_request(line, scheduler=None):
+    """
+    Answer one JSON request line.
+
+    Args:
+        line (str): A JSON object with id, latitude, longitude and optionally
+                    time, or id and one of aggregate, nearest or stats
+        scheduler (MicroBatchScheduler): Included in stats responses, if given
+
+    Returns:
+        dict: Prediction results or stats, tagged with the request id
+    """
+    request_id = None
+    try:
+        request = json.loads(line)
+        request_id = request.get('id')
+        if 'stats' in request:
+            return {'id': request_id, **stats_response(request['stats'], scheduler)}
+        if 'aggregate' in request:
+            return {'id': request_id, **aggregate_query(request['aggregate'])}
+        if 'nearest' in request:
+            return {'id': request_id, **nearest_query(request['nearest'])}
+        latitude, longitude = parse_request(request)
+
+        if request.get('time') is not None:
+            result = predict_aurora_at(latitude, longitude, request['time'])
+        else:
+            result = predict_aurora(latitude, longitude)
+
+    except INVALID_REQUEST_ERRORS as e:
+        result = {
+            'success': False,
+            'error': f'Invalid input: {str(e)}'
+        }
+    except Exception as e:
+        result = {
+            'success': False,
+            'error': f'Prediction failed: {str(e)}'
+        }
+
+    return {'id': request_id, **result}
+
+def serve_lines(lines, write, scheduler=None):
+    """
+    Answer newline-delimited JSON requests from lines, passing each response
+    line to write.
+
+    With a scheduler, requests are queued for micro-batching and responses
+    are written as their batches finish, so they may arrive out of order;
+    clients match them to requests by id. Returns once every response has
+    been written.
+    """
+    if scheduler is None:
+        for line in lines:
+            if line.strip():
+                write(json.dumps(handle_request(line)) + '\n')
+        return
+
+    write_lock = threading.Lock()
+    outstanding = threading.Condition()
+    in_flight = 0
+
+    def respond(response):
+        with write_lock:
+            write(json.dumps(response) + '\n')
+
+    def on_done(request_id, future):
+        nonlocal in_flight
+        try:
+            result = future.result()
+        except Exception as e:
+            result = {
+                'success': False,
+                'error': f'Prediction failed: {str(e)}'
+            }
+        respond({'id': request_id, **result})
+
+        with outstanding:
+            in_flight -= 1
+            outstanding.notify_all()
+
+    for line in lines:
+        if not line.strip():
+            continue
+
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get('id')
+            # Only single-point model predictions are micro-batched
+            if any(key in request for key in ('stats', 'aggregate', 'nearest')) or request.get('time') is not None:
+                respond(handle_request(line, scheduler))
+                continue
+            latitude, longitude = parse_request(request)
+        except INVALID_REQUEST_ERRORS as e:
+            respond({'id': request_id, 'success': False, 'error': f'Invalid input: {str(e)}'})
+            continue
+
+        with outstanding:
+            in_flight += 1
+        future = scheduler.submit(latitude, longitude)
+        future.add_done_callback(lambda future, request_id=request_id: on_done(request_id, future))
+
+    with outstanding:
+        outstanding.wait_for(lambda: in_flight == 0)
+
+def serve_stdio(scheduler=None):
+    """Serve requests read from stdin, writing one response line per request to stdout."""
+    def write(response):
+        sys.stdout.write(response)
+        sys.stdout.flush()
+
+    serve_lines(sys.stdin, write, scheduler)
+
+class PredictionRequestHandler(socketserver.StreamRequestHandler):
+    """Serves newline-delimited JSON requests on one socket connection."""
+
+    def handle(self):
+        def write(response):
+            self.wfile.write(response.encode('utf-8'))
+            self.wfile.flush()
+
+        lines = (raw_line.decode('utf-8') for raw_line in self.rfile)
+        serve_lines(lines, write, self.server.scheduler)
+
+class PredictionServer(socketserver.ThreadingUnixStreamServer):
+    """Unix socket server answering each connection on its own thread."""
+
+    daemon_threads = True
+    # socketserver's default backlog of 5 refuses bursts of new connections
+    request_queue_size = 128
+
+def make_scheduler(batch_window_ms, max_batch_size):
+    """Create the micro-batching scheduler, or None if batching is disabled."""
+    if batch_window_ms <= 0:
+        return None
+    return MicroBatchScheduler(batch_window_ms, max_batch_size)
+
+def run_worker(server, batch_window_ms, max_batch_size):
+    """Load the model and serve connections from the listening socket."""
+    # Load the model before the first request arrives, and swap in updated
+    # models from the background
+    start_model_watcher()
+    server.scheduler = make_scheduler(batch_window_ms, max_batch_size)
+    server.serve_forever()
+
+def run_worker_pool(server, workers, batch_window_ms, max_batch_size):
+    """
+    Fork workers that all accept connections on the listening socket, and
+    replace any worker that exits, until interrupted. Workers that fail are
+    restarted with an exponential backoff; after WORKER_FAILURE_LIMIT
+    failures within WORKER_FAILURE_WINDOW seconds the pool gives up.
+
+    Each worker loads the model after the fork. With the Table or Forest
+    backend the model is a read-only memory map, so every worker shares the
+    same physical pages; ONNX and PKL models are loaded once per worker.
+    """
+    children = set()
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            status = 0
+            try:
+                run_worker(server, batch_window_ms, max_batch_size)
+            except KeyboardInterrupt:
+                pass
+            except BaseException:
+                log('error', "Prediction worker %d failed", os.getpid())
+                traceback.print_exc()
+                status = 1
+            finally:
+                sys.stderr.flush()
+                os._exit(status)
+        children.add(pid)
+
+    for _ in range(workers):
+        spawn()
+    log('info', "Started %d prediction workers", workers)
+
+    failures = deque()
+    try:
+        while True:
+            pid, status = os.wait()
+            children.discard(pid)
+            code = os.waitstatus_to_exitcode(status)
+            if code == 0:
+                log('warning', "Prediction worker %d exited, restarting...", pid)
+                spawn()
+                continue
+
+            now = time.monotonic()
+            failures.append(now)
+            while failures[0] < now - WORKER_FAILURE_WINDOW:
+                failures.popleft()
+            if len(failures) >= WORKER_FAILURE_LIMIT:
+                raise RuntimeError(f"Prediction workers failed {len(failures)} times within "
+                                   f"{WORKER_FAILURE_WINDOW:g}s, giving up")
+            delay = min(WORKER_RESTART_DELAY * 2 ** (len(failures) - 1), WORKER_MAX_RESTART_DELAY)
+            log('warning', "Prediction worker %d exited with status %d, restarting in %.1fs...", pid, code, delay)
+            time.sleep(delay)
+            spawn()
+    finally:
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
+        for pid in children:
+            os.waitpid(pid, 0)
+
+def serve_socket(socket_path, batch_window_ms, max_batch_size, workers=1):
+    """Serve requests on a Unix socket until interrupted."""
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    with PredictionServer(socket_path, PredictionRequestHandler) as server:
+        # Treat SIGTERM like Ctrl+C so the socket file is cleaned up
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        log('info', "Aurora prediction server listening on %s", socket_path)
+        try:
+            if workers > 1:
+                run_worker_pool(server, workers, batch_window_ms, max_batch_size)
+            else:
+                run_worker(server, batch_window_ms, max_batch_size)
+        except (KeyboardInterrupt, SystemExit):
+            pass
+        finally:
+            os.remove(socket_path)
+
+def main():
+    """Main entry point for the server."""
+    parser = argparse.ArgumentParser(description='Long-running aurora prediction server')
+    parser.add_argument('--socket', help='Unix socket path to listen on (default: stdin/stdout)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Pre-forked worker processes sharing the socket (default: 1)')
+    parser.add_argument('--batch-window-ms', type=float, default=DEFAULT_WINDOW_MS,
+                        help=f'How long to collect concurrent requests into one batch; '
+                             f'0 disables batching (default: {DEFAULT_WINDOW_MS})')
+    parser.add_argument('--max-batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE,
+                        help=f'Largest batch run at once (default: {DEFAULT_MAX_BATCH_SIZE})')
+    parser.add_argument('--log-level', choices=list(LOG_LEVELS),
+                        help=f'Lowest level logged to stderr (default: AURORA_LOG_LEVEL or {DEFAULT_LOG_LEVEL})')
+    args = parser.parse_args()
+
+    if args.log_level:
+        set_log_level(args.log_level)
+
+    if args.socket:
+        try:
+            serve_socket(args.socket, args.batch_window_ms, args.max_batch_size, args.workers)
+        except RuntimeError as e:
+            log('error', "%s", e)
+            sys.exit(1)
+    elif args.workers > 1:
+        parser.error('--workers requires --socket')
+    else:
+        # Load the model before the first request arrives, and swap in updated
+        # models from the background
+        start_model_watcher()
+        serve_stdio(make_scheduler(args.batch_window_ms, args.max_batch_size))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Aurora Texture Generator
+Renders the whole globe's aurora intensity as an equirectangular texture for
+the 3D Earth: an RGBA PNG colored with the same intensity bands as
+get_aurora_colors, or a raw little-endian Float32 buffer of intensities.
+
+Pixel (row, column) covers the cell centered on latitude
+90 - (row + 0.5) * step and longitude -180 + (column + 0.5) * step, so row 0
+is the north pole. The texture shows the model the prediction service
+serves: the manifest's current version when one is registered. Textures are
+cached under ml/textures by model version, hash and resolution; a JSON
+sidecar next to each texture records its size and model.
+
+Usage:
+    python aurora_texture.py [--resolution DEG] [--format png|f32] [--backend NAME] [--output PATH]
+"""
+
+import sys
+import json
+import os
+import argparse
+import shutil
+import struct
+import zlib
+import numpy as np
+
+from aurora_prediction import (AURORA_COLORS, BACKENDS, COLOR_THRESHOLDS, MODEL_DIR,
+                               load_located_model, locate_model, model_hash)
+
+TEXTURE_CACHE_DIR = os.path.join(MODEL_DIR, 'textures')
+
+# Texture rows evaluated per model call, to bound memory on large textures
+ROWS_PER_CHUNK = 64
+
+# RGB of each intensity band, in the order of AURORA_COLORS
+BAND_RGB = [
+    (120, 200, 140),  # Faint Green (if visible)
+    (110, 240, 150),  # Pale Green
+    (120, 255, 120),  # Green and Pink
+    (200, 120, 255),  # Green, Pink, and Purple
+    (255, 90, 140),   # Green, Pink, Purple, and Red
+]
+
+def texture_axes(resolution):
+    """Return the pixel-center (latitudes, longitudes) of a texture, north at the top."""
+    height = round(180 / resolution)
+    width = round(360 / resolution)
+    if abs(height * resolution - 180) > 1e-9:
+        raise ValueError(f"Resolution must divide 180 degrees evenly, got {resolution}")
+    latitudes = 90 - (np.arange(height) + 0.5) * resolution
+    longitudes = -180 + (np.arange(width) + 0.5) * resolution
+    return latitudes, longitudes
+
+def render_intensities(predict, resolution):
+    """
+    Evaluate predict at every texture pixel.
+
+    Returns:
+        ndarray: (height, width) float32 intensities clamped to 0-100
+    """
+    latitudes, longitudes = texture_axes(resolution)
+    intensities = np.empty((len(latitudes), len(longitudes)), dtype=np.float32)
+
+    for start in range(0, len(latitudes), ROWS_PER_CHUNK):
+        rows = latitudes[start:start + ROWS_PER_CHUNK]
+        lat_mesh, lon_mesh = np.meshgrid(rows, longitudes, indexing='ij')
+        values = predict(lat_mesh.ravel(), lon_mesh.ravel())
+        intensities[start:start + len(rows)] = np.clip(values, 0, 100).reshape(lat_mesh.shape)
+
+    return intensities
+
+def colorize(intensities):
+    """
+    Map intensities to RGBA with the get_aurora_colors bands.
+
+    The band picks the color and the intensity sets the opacity, so regions
+    without aurora are transparent over the globe.
+
+    Returns:
+        ndarray: (height, width, 4) uint8 pixels
+    """
+    bands = np.searchsorted(COLOR_THRESHOLDS, intensities, side='left')
+    rgba = np.empty(intensities.shape + (4,), dtype=np.uint8)
+    rgba[..., :3] = np.array(BAND_RGB, dtype=np.uint8)[bands]
+    rgba[..., 3] = np.round(intensities * 2.55).astype(np.uint8)
+    return rgba
+
+def write_png(rgba, output_path):
+    """Write RGBA pixels as an 8-bit PNG using only zlib and struct."""
+    height, width, _ = rgba.shape
+
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack('>I', len(data)) + body + struct.pack('>I', zlib.crc32(body) & 0xffffffff)
+
+    # Each scanline starts with filter type 0 (none)
+    scanlines = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    scanlines[:, 1:] = rgba.reshape(height, width * 4)
+
+    with open(output_path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)))
+        f.write(chunk(b'IDAT', zlib.compress(scanlines.tobytes(), 6)))
+        f.write(chunk(b'IEND', b''))
+
+def write_float32(intensities, output_path):
+    """Write intensities as a raw little-endian Float32 buffer, row by row."""
+    np.asarray(intensities, dtype='<f4').tofile(output_path)
+
+def generate_texture(resolution, texture_format, backend=None):
+    """
+    Return the path of the texture for the current model, rendering it only
+    if it isn't cached yet.
+
+    Returns:
+        tuple: (texture path, metadata dict)
+    """
+    name, path, version = locate_model(backend)
+    digest = model_hash(path)
+    extension = 'png' if texture_format == 'png' else 'f32'
+    model_key = f'{name.lower()}-{version}' if version else name.lower()
+    texture_path = os.path.join(TEXTURE_CACHE_DIR, f'{model_key}-{digest[:16]}-{resolution:g}deg.{extension}')
+    metadata_path = texture_path + '.json'
+
+    if os.path.exists(texture_path) and os.path.exists(metadata_path):
+        print(f"[v0] Using cached texture {texture_path}", file=sys.stderr)
+        with open(metadata_path) as f:
+            return texture_path, json.load(f)
+
+    (_, predict, _), _ = load_located_model(backend)
+    intensities = render_intensities(predict, resolution)
+
+    os.makedirs(TEXTURE_CACHE_DIR, exist_ok=True)
+    if texture_format == 'png':
+        write_png(colorize(intensities), texture_path)
+    else:
+        write_float32(intensities, texture_path)
+
+    metadata = {
+        'width': intensities.shape[1],
+        'height': intensities.shape[0],
+        'resolution': resolution,
+        'format': texture_format,
+        'model_type': name,
+        'model_hash': digest,
+        'model_version': version,
+        'bands': [{'above': ([None] + COLOR_THRESHOLDS)[i], 'color': AURORA_COLORS[i], 'rgb': BAND_RGB[i]}
+                  for i in range(len(AURORA_COLORS))],
+    }
+    with open(metadata_path, 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+    print(f"[v0] Rendered {metadata['width']}x{metadata['height']} texture to {texture_path}", file=sys.stderr)
+    return texture_path, metadata
+
+def main():
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description='Render the aurora intensity texture for the 3D globe')
+    parser.add_argument('--resolution', type=float, default=0.5,
+                        help='Degrees per pixel, dividing 180 evenly (default: 0.5)')
+    parser.add_argument('--format', choices=['png', 'f32'], default='png',
+                        help='RGBA PNG or raw Float32 intensities (default: png)')
+    parser.add_argument('--backend', choices=list(BACKENDS), help='Model backend (default: the served model)')
+    parser.add_argument('--output', help='Also copy the texture (and its .json sidecar) to this path')
+    args = parser.parse_args()
+
+    texture_path, metadata = generate_texture(args.resolution, args.format, args.backend)
+
+    if args.output:
+        shutil.copyfile(texture_path, args.output)
+        shutil.copyfile(texture_path + '.json', args.output + '.json')
+        texture_path = args.output
+
+    print(json.dumps({'success': True, 'path': os.path.abspath(texture_path), **metadata}))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Aurora Prediction Benchmark
+Measures every prediction backend (Table, Forest, ONNX, PKL, the heuristic
+fallback and the stdlib-only compact grid) on:
+
+  - cold start: a fresh Python process importing the backend, loading its
+    model and answering one query
+  - warm single-query latency: p50/p95/p99 of one-point calls on a loaded model
+  - batch throughput: points per second at batch sizes from 1 to 100k
+
+With a model manifest (see aurora_registry.py), each model backend is
+measured on its registered version, the served one for the current backend.
+
+Results print as a table or JSON. With --baseline, each metric is compared
+against a saved JSON run and the script exits non-zero on any regression
+beyond --threshold.
+
+Usage:
+    python benchmark_aurora.py [--backends NAME ...] [--json] [--save PATH]
+                               [--baseline PATH] [--threshold 0.2]
+"""
+
+import sys
+import json
+import os
+import argparse
+import statistics
+import subprocess
+import time
+import numpy as np
+
+from aurora_prediction import (BACKENDS, GRID_BIN_PATH, fallback_prediction, fallback_prediction_batch,
+                               load_compact_grid, load_located_model, locate_model)
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Backends measured besides those in BACKENDS
+EXTRA_BACKENDS = ['Compact', 'Fallback']
+
+DEFAULT_BATCH_SIZES = [1, 10, 100, 1000, 10000, 100000]
+
+# Minimum time spent measuring each batch size, in seconds
+MIN_BATCH_SECONDS = 0.2
+
+# Python run in a fresh process to time each backend's cold start
+COLD_START_CODE = {
+    'Compact': "from aurora_prediction import GRID_BIN_PATH, load_compact_grid\n"
+               "load_compact_grid(GRID_BIN_PATH)(69.65, 18.96)",
+    'Fallback': "from aurora_prediction import fallback_prediction\n"
+                "fallback_prediction(69.65, 18.96)",
+}
+MODEL_COLD_START_CODE = ("from aurora_prediction import load_located_model\n"
+                         "load_located_model({name!r})[0][1]([69.65], [18.96])")
+
+def percentile(values, q):
+    """Return the q-th percentile (0-100) of values, by nearest rank."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+def load_predictors(name):
+    """
+    Load one backend for in-process measurements: its registered version
+    when there is a model manifest (see locate_model).
+
+    Returns:
+        tuple: (single, batch, version) with functions taking (latitude,
+               longitude) and (latitudes, longitudes), or None for a missing
+               model
+    """
+    if name == 'Fallback':
+        return fallback_prediction, fallback_prediction_batch, None
+    if name == 'Compact':
+        if not os.path.exists(GRID_BIN_PATH):
+            return None
+        predict = load_compact_grid(GRID_BIN_PATH)
+        return predict, lambda latitudes, longitudes: [predict(a, b) for a, b in zip(latitudes, longitudes)], None
+
+    try:
+        locate_model(name)
+    except FileNotFoundError:
+        return None
+    (_, predict, version), _ = load_located_model(name)
+    return (lambda latitude, longitude: predict([latitude], [longitude])), predict, version
+
+def measure_cold_start(name, runs):
+    """Return the median wall time in ms of a fresh process answering one query."""
+    code = COLD_START_CODE.get(name, MODEL_COLD_START_CODE.format(name=name))
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=SCRIPTS_DIR, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+def measure_single(single, queries, rng):
+    """Return p50/p95/p99 latency in microseconds of one-point calls."""
+    latitudes = rng.uniform(-90, 90, queries).tolist()
+    longitudes = rng.uniform(-180, 180, queries).tolist()
+
+    # Warm up caches and lazy initialization
+    for latitude, longitude in zip(latitudes[:10], longitudes[:10]):
+        single(latitude, longitude)
+
+    latencies = []
+    for latitude, longitude in zip(latitudes, longitudes):
+        start = time.perf_counter()
+        single(latitude, longitude)
+        latencies.append((time.perf_counter() - start) * 1e6)
+
+    return {
+        'p50_us': percentile(latencies, 50),
+        'p95_us': percentile(latencies, 95),
+        'p99_us': percentile(latencies, 99),
+    }
+
+def measure_batch(batch, sizes, rng):
+    """Return points per second for each batch size."""
+    throughput = {}
+    for size in sizes:
+        latitudes = rng.uniform(-90, 90, size)
+        longitudes = rng.uniform(-180, 180, size)
+        batch(latitudes, longitudes)
+
+        calls = 0
+        start = time.perf_counter()
+        while True:
+            batch(latitudes, longitudes)
+            calls += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= MIN_BATCH_SECONDS:
+                break
+        throughput[str(size)] = calls * size / elapsed
+    return throughput
+
+def benchmark_backend(name, args):
+    """
+    Benchmark one backend.
+
+    Returns:
+        dict: Metrics, or a 'skipped' reason if the backend isn't available
+    """
+    try:
+        predictors = load_predictors(name)
+    except ImportError as e:
+        return {'skipped': f'dependencies not installed ({str(e)})'}
+    if predictors is None:
+        return {'skipped': 'model not found'}
+    single, batch, version = predictors
+
+    rng = np.random.default_rng(0)
+    return {
+        'model_version': version,
+        'cold_start_ms': measure_cold_start(name, args.cold_runs),
+        'single': measure_single(single, args.queries, rng),
+        'batch_points_per_s': measure_batch(batch, args.batch_sizes, rng),
+    }
+
+def flatten_metrics(results):
+    """
+    Flatten results into {metric name: (value, higher is better)}.
+    """
+    metrics = {}
+    for name, result in results['backends'].items():
+        if 'skipped' in result:
+            continue
+        metrics[f'{name}.cold_start_ms'] = (result['cold_start_ms'], False)
+        for key, value in result['single'].items():
+            metrics[f'{name}.single.{key}'] = (value, False)
+        for size, value in result['batch_points_per_s'].items():
+            metrics[f'{name}.batch.{size}'] = (value, True)
+    return metrics
+
+def find_regressions(results, baseline, threshold):
+    """
+    Compare results to a baseline run.
+
+    Returns:
+        list: Descriptions of metrics that got worse by more than threshold
+    """
+    current = flatten_metrics(results)
+    previous = flatten_metrics(baseline)
+    regressions = []
+    for metric, (value, higher_is_better) in current.items():
+        if metric not in previous:
+            continue
+        old = previous[metric][0]
+        if higher_is_better and value < old * (1 - threshold):
+            regressions.append(f'{metric}: {value:.1f} vs baseline {old:.1f}')
+        elif not higher_is_better and value > old * (1 + threshold):
+            regressions.append(f'{metric}: {value:.1f} vs baseline {old:.1f}')
+    return regressions
+
+def print_table(results):
+    """Print the results as a human-readable table."""
+    sizes = results['batch_sizes']
+    header = f"{'backend':<9} {'cold ms':>8} {'p50 us':>8} {'p95 us':>8} {'p99 us':>8}"
+    header += ''.join(f" {'b=' + str(size):>10}" for size in sizes)
+    print(header)
+    for name, result in results['backends'].items():
+        if 'skipped' in result:
+            print(f"{name:<9} skipped: {result['skipped']}")
+            continue
+        single = result['single']
+        row = (f"{name:<9} {result['cold_start_ms']:>8.1f} {single['p50_us']:>8.1f} "
+               f"{single['p95_us']:>8.1f} {single['p99_us']:>8.1f}")
+        row += ''.join(f" {result['batch_points_per_s'][str(size)]:>10.0f}" for size in sizes)
+        print(row)
+    print("Batch columns are points per second.")
+
+def main():
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description='Benchmark every aurora prediction backend')
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS) + EXTRA_BACKENDS,
+                        choices=list(BACKENDS) + EXTRA_BACKENDS, help='Backends to measure (default: all)')
+    parser.add_argument('--queries', type=int, default=1000, help='Single queries per backend (default: 1000)')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=DEFAULT_BATCH_SIZES,
+                        help='Batch sizes to measure (default: 1 to 100000)')
+    parser.add_argument('--cold-runs', type=int, default=3, help='Cold start runs per backend (default: 3)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    parser.add_argument('--save', help='Write the JSON results to this file')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Allowed relative regression against the baseline (default: 0.2)')
+    args = parser.parse_args()
+
+    results = {
+        'python': sys.version.split()[0],
+        'cpus': os.cpu_count(),
+        'batch_sizes': args.batch_sizes,
+        'backends': {name: benchmark_backend(name, args) for name in args.backends},
+    }
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"OK: no regression beyond {args.threshold:.0%} of the baseline")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Aurora Worker Pool Benchmark
+Starts aurora_server.py with an increasing number of pre-forked workers,
+drives it with concurrent socket clients, and reports throughput together
+with the memory of each worker.
+
+Memory is read from /proc/<pid>/smaps_rollup (Linux): RSS counts pages
+shared through the memory-mapped model, PSS splits shared pages between the
+processes using them, and USS is memory private to the worker. With the
+Table or Forest backend, USS and PSS per worker should stay flat as workers
+are added.
+
+Usage:
+    python benchmark_worker_pool.py [--workers 1 2 4 8] [--clients N] [--duration S] [--backend Forest]
+"""
+
+import sys
+import json
+import os
+import argparse
+import multiprocessing
+import random
+import signal
+import socket
+import subprocess
+import tempfile
+import time
+
+SERVER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'aurora_server.py')
+
+def run_client(socket_path, duration, seed):
+    """
+    Send sequential requests on one connection for duration seconds.
+
+    Returns:
+        int: Number of successful responses
+    """
+    rng = random.Random(seed)
+    completed = 0
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        stream = sock.makefile('r', encoding='utf-8')
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            request = {'id': completed, 'latitude': rng.uniform(-90, 90), 'longitude': rng.uniform(-180, 180)}
+            sock.sendall((json.dumps(request) + '\n').encode('utf-8'))
+            if json.loads(stream.readline()).get('success'):
+                completed += 1
+    return completed
+
+def wait_for_socket(socket_path, timeout=60):
+    """Wait until the server accepts connections."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(socket_path)
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError(f"Server did not start listening on {socket_path}")
+
+def child_pids(parent_pid):
+    """Return the pids whose parent is parent_pid, from /proc."""
+    pids = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # The command name may contain spaces; fields resume after ')'
+                fields = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == parent_pid:
+            pids.append(int(entry))
+    return pids
+
+def memory_kb(pid):
+    """
+    Read a process's memory from /proc/<pid>/smaps_rollup.
+
+    Returns:
+        dict: rss, pss and uss in kB
+    """
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                values[parts[0][:-1]] = int(parts[1])
+    return {
+        'rss': values.get('Rss', 0),
+        'pss': values.get('Pss', 0),
+        'uss': values.get('Private_Clean', 0) + values.get('Private_Dirty', 0),
+    }
+
+def benchmark(workers, clients, duration, backend):
+    """
+    Benchmark one pool size.
+
+    Returns:
+        dict: Throughput and mean per-worker memory for this pool size
+    """
+    socket_path = os.path.join(tempfile.mkdtemp(), 'aurora.sock')
+    env = dict(os.environ, AURORA_BACKEND=backend) if backend else dict(os.environ)
+    command = [sys.executable, SERVER_PATH, '--socket', socket_path, '--workers', str(workers)]
+    server = subprocess.Popen(command, env=env, stderr=subprocess.DEVNULL)
+
+    try:
+        wait_for_socket(socket_path)
+
+        with multiprocessing.Pool(clients) as pool:
+            # Warm every worker before measuring
+            pool.starmap(run_client, [(socket_path, 0.5, seed) for seed in range(clients)])
+
+            start = time.perf_counter()
+            counts = pool.starmap(run_client, [(socket_path, duration, seed) for seed in range(clients)])
+            elapsed = time.perf_counter() - start
+
+        # With one worker the server process itself serves requests
+        pids = child_pids(server.pid) if workers > 1 else [server.pid]
+        memory = [memory_kb(pid) for pid in pids]
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait()
+
+    return {
+        'workers': workers,
+        'clients': clients,
+        'requests': sum(counts),
+        'throughput_rps': sum(counts) / elapsed,
+        'rss_mb_per_worker': sum(m['rss'] for m in memory) / len(memory) / 1024,
+        'pss_mb_per_worker': sum(m['pss'] for m in memory) / len(memory) / 1024,
+        'uss_mb_per_worker': sum(m['uss'] for m in memory) / len(memory) / 1024,
+    }
+
+def main():
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description='Benchmark the pre-forked aurora worker pool')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help='Pool sizes to test (default: 1 2 4 8)')
+    parser.add_argument('--clients', type=int, default=None,
+                        help='Concurrent client connections (default: 4 per worker)')
+    parser.add_argument('--duration', type=float, default=5.0, help='Seconds per pool size (default: 5)')
+    parser.add_argument('--backend', default='Forest',
+                        help='AURORA_BACKEND for the server; Table and Forest share a memory map (default: Forest)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    results = []
+    for workers in args.workers:
+        clients = args.clients or 4 * workers
+        results.append(benchmark(workers, clients, args.duration, args.backend))
+
+    if args.json:
+        print(json.dumps({'backend': args.backend, 'cpus': os.cpu_count(), 'results': results}, indent=2))
+        return
+
+    print(f"Backend: {args.backend}, CPUs: {os.cpu_count()}")
+    print(f"{'workers':>7} {'clients':>7} {'req/s':>10} {'RSS MB':>8} {'PSS MB':>8} {'USS MB':>8}")
+    for r in results:
+        print(f"{r['workers']:>7} {r['clients']:>7} {r['throughput_rps']:>10.0f} "
+              f"{r['rss_mb_per_worker']:>8.1f} {r['pss_mb_per_worker']:>8.1f} {r['uss_mb_per_worker']:>8.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Aurora Lookup Grid Builder
+Evaluates the aurora model once over a global latitude/longitude grid and
+writes the intensities to a .npy file, plus a compact binary copy that the
+one-shot CLI reads with the standard library alone. aurora_prediction.py
+memory-maps these files and answers queries by bilinear interpolation, with
+no model load.
+
+Usage:
+    python build_aurora_grid.py [--resolution 1|0.5|0.25] [--backend ONNX|PKL]
+                                [--output PATH] [--compact-output PATH]
+"""
+
+import sys
+import argparse
+import numpy as np
+
+from aurora_prediction import (GRID_PATH, GRID_BIN_PATH, GRID_BIN_HEADER, GRID_BIN_MAGIC,
+                               GRID_BIN_VERSION, load_backend)
+
+# Grid rows evaluated per model call, to bound memory on fine grids
+ROWS_PER_CHUNK = 32
+
+def grid_axes(resolution):
+    """
+    Return the (latitudes, longitudes) axes of a global grid.
+
+    Latitudes run from -90 to 90 and longitudes from -180 to 180, both
+    inclusive, so the grid can be interpolated at the edges.
+    """
+    n_lat = round(180 / resolution) + 1
+    n_lon = round(360 / resolution) + 1
+    if abs((n_lat - 1) * resolution - 180) > 1e-9:
+        raise ValueError(f"Resolution must divide 180 degrees evenly, got {resolution}")
+    return np.linspace(-90, 90, n_lat), np.linspace(-180, 180, n_lon)
+
+def build_grid(predict, resolution, output_path):
+    """
+    Evaluate predict over the grid and write it to output_path as float32.
+
+    Args:
+        predict (function): Maps latitude and longitude arrays to probabilities
+        resolution (float): Grid step in degrees
+        output_path (str): Destination .npy file
+
+    Returns:
+        tuple: Shape of the written grid
+    """
+    latitudes, longitudes = grid_axes(resolution)
+    grid = np.lib.format.open_memmap(output_path, mode='w+', dtype=np.float32,
+                                     shape=(len(latitudes), len(longitudes)))
+
+    for start in range(0, len(latitudes), ROWS_PER_CHUNK):
+        rows = latitudes[start:start + ROWS_PER_CHUNK]
+        lat_mesh, lon_mesh = np.meshgrid(rows, longitudes, indexing='ij')
+        values = predict(lat_mesh.ravel(), lon_mesh.ravel())
+        grid[start:start + len(rows)] = np.clip(values, 0, 100).reshape(lat_mesh.shape)
+
+    grid.flush()
+    return grid.shape
+
+def write_compact_grid(grid, output_path):
+    """Write a grid in the compact binary format read by load_compact_grid."""
+    with open(output_path, 'wb') as f:
+        f.write(GRID_BIN_HEADER.pack(GRID_BIN_MAGIC, GRID_BIN_VERSION, *grid.shape))
+        np.asarray(grid, dtype='<f4').tofile(f)
+
+def main():
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description='Precompute the global aurora lookup grid')
+    parser.add_argument('--resolution', type=float, default=1.0, choices=[1.0, 0.5, 0.25],
+                        help='Grid step in degrees (default: 1)')
+    parser.add_argument('--backend', default='ONNX', choices=['ONNX', 'PKL'],
+                        help='Model backend to evaluate (default: ONNX)')
+    parser.add_argument('--output', default=GRID_PATH, help='Output .npy path')
+    parser.add_argument('--compact-output', default=GRID_BIN_PATH,
+                        help='Output path of the compact binary copy')
+    args = parser.parse_args()
+
+    predict = load_backend(args.backend)
+    shape = build_grid(predict, args.resolution, args.output)
+    write_compact_grid(np.load(args.output, mmap_mode='r'), args.compact_output)
+
+    print(f"[v0] Wrote {shape[0]}x{shape[1]} aurora grid at {args.resolution} degrees to {args.output}",
+          file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
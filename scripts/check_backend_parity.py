@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Aurora Backend Parity Check
+Evaluates every prediction backend over a dense global grid and compares it
+with the trained scikit-learn model queried exactly as in the notebook, with
+features [longitude, latitude]. For each backend it reports the max and mean
+absolute intensity difference, the share of grid cells that disagree, load
+and inference time, and writes a disagreement map.
+
+With a model manifest (see aurora_registry.py), each model backend is
+checked on its registered version, the served one for the current backend.
+
+Each backend is also compared with the reference fed [latitude, longitude].
+If that matches at least twice as closely, the backend builds its features in
+the wrong order and the check fails.
+
+Maps are PNGs laid out like aurora_texture.py textures (north at the top):
+transparent where the backend agrees and red where it disagrees, brighter
+for larger differences. A .npy of the signed differences is written next to
+each map.
+
+Usage:
+    python check_backend_parity.py [--resolution DEG] [--tolerance T] [--maps DIR] [--json]
+"""
+
+import sys
+import json
+import os
+import argparse
+import time
+import numpy as np
+
+from aurora_prediction import (BACKENDS, GRID_BIN_PATH, PKL_MODEL_PATH, fallback_prediction_batch,
+                               load_compact_grid, load_located_model, locate_model, to_ovation_longitude)
+from aurora_texture import texture_axes, write_png
+from export_aurora_forest import load_sklearn_model
+
+# Backends checked besides those in BACKENDS
+EXTRA_BACKENDS = ['Compact', 'Fallback']
+
+def grid_points(resolution):
+    """
+    Return the flattened (latitudes, longitudes) of every grid cell center,
+    and the grid's (height, width).
+    """
+    latitudes, longitudes = texture_axes(resolution)
+    lat_mesh, lon_mesh = np.meshgrid(latitudes, longitudes, indexing='ij')
+    return lat_mesh.ravel(), lon_mesh.ravel(), lat_mesh.shape
+
+def load_predictor(name):
+    """
+    Load one backend: its registered version when there is a model manifest
+    (see locate_model).
+
+    Returns:
+        tuple: ((latitudes, longitudes) -> intensities, version), or None for a missing model
+    """
+    if name == 'Fallback':
+        return (lambda latitudes, longitudes:
+                fallback_prediction_batch(latitudes, longitudes)['predictions']['intensity']), None
+    if name == 'Compact':
+        if not os.path.exists(GRID_BIN_PATH):
+            return None
+        predict = load_compact_grid(GRID_BIN_PATH)
+        return (lambda latitudes, longitudes: np.array([predict(a, b) for a, b in zip(latitudes, longitudes)])), None
+    try:
+        locate_model(name)
+    except FileNotFoundError:
+        return None
+    (_, predict, version), _ = load_located_model(name)
+    return predict, version
+
+def disagreement_map(difference, tolerance):
+    """
+    Color per-cell differences for a PNG.
+
+    Returns:
+        ndarray: (height, width, 4) uint8 pixels, red with opacity growing with |difference|
+    """
+    magnitude = np.abs(difference)
+    rgba = np.zeros(difference.shape + (4,), dtype=np.uint8)
+    rgba[..., 0] = 255
+    rgba[..., 3] = np.where(magnitude > tolerance, np.clip(64 + magnitude * 1.91, 0, 255), 0).astype(np.uint8)
+    return rgba
+
+def compare(values, reference, swapped_reference, tolerance):
+    """
+    Compare a backend's intensities with the reference.
+
+    Returns:
+        dict: Difference statistics and the feature order verdict
+    """
+    difference = np.abs(values - reference)
+    swapped_mean = float(np.mean(np.abs(values - swapped_reference)))
+    mean = float(np.mean(difference))
+    return {
+        'max_abs_diff': float(np.max(difference)),
+        'mean_abs_diff': mean,
+        'disagreement': float(np.mean(difference > tolerance)),
+        'mean_abs_diff_swapped_features': swapped_mean,
+        'feature_order': 'swapped' if swapped_mean < 0.5 * mean else 'ok',
+    }
+
+def check_backend(name, latitudes, longitudes, reference, swapped_reference, args):
+    """
+    Evaluate one backend over the grid and compare it with the reference.
+
+    Returns:
+        tuple: (result dict, per-cell signed differences or None)
+    """
+    start = time.perf_counter()
+    try:
+        predictor = load_predictor(name)
+    except ImportError as e:
+        return {'skipped': f'dependencies not installed ({str(e)})'}, None
+    if predictor is None:
+        return {'skipped': 'model not found'}, None
+    predict, version = predictor
+    load_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    values = np.clip(np.asarray(predict(latitudes, longitudes), dtype=np.float64), 0, 100)
+    predict_s = time.perf_counter() - start
+
+    result = compare(values, reference, swapped_reference, args.tolerance)
+    result.update({
+        'model_version': version,
+        'load_ms': load_ms,
+        'predict_ms': predict_s * 1000,
+        'points_per_s': len(values) / predict_s,
+    })
+    return result, values - reference
+
+def print_table(results):
+    """Print the results as a human-readable table."""
+    print(f"Reference: {results['reference']}, {results['points']} points at {results['resolution']:g} deg, "
+          f"tolerance {results['tolerance']:g}")
+    print(f"{'backend':<9} {'max diff':>9} {'mean diff':>10} {'disagree':>9} {'features':>9} "
+          f"{'load ms':>9} {'predict ms':>11} {'points/s':>11}")
+    for name, r in results['backends'].items():
+        if 'skipped' in r:
+            print(f"{name:<9} skipped: {r['skipped']}")
+            continue
+        print(f"{name:<9} {r['max_abs_diff']:>9.2f} {r['mean_abs_diff']:>10.3f} {r['disagreement']:>9.2%} "
+              f"{r['feature_order']:>9} {r['load_ms']:>9.1f} {r['predict_ms']:>11.1f} {r['points_per_s']:>11.0f}")
+
+def main():
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description='Check that the aurora backends agree with the trained model')
+    parser.add_argument('--model', default=PKL_MODEL_PATH, help='Trained scikit-learn model used as the reference')
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS) + EXTRA_BACKENDS,
+                        choices=list(BACKENDS) + EXTRA_BACKENDS, help='Backends to check (default: all)')
+    parser.add_argument('--resolution', type=float, default=0.5,
+                        help='Grid spacing in degrees, dividing 180 evenly (default: 0.5)')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='Absolute intensity difference counted as a disagreement (default: 0.5)')
+    parser.add_argument('--maps', help='Directory to write disagreement maps to')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    latitudes, longitudes, shape = grid_points(args.resolution)
+
+    print(f"[v0] Evaluating reference model on {len(latitudes)} points...", file=sys.stderr)
+    model = load_sklearn_model(args.model)
+    model_longitudes = to_ovation_longitude(longitudes)
+    reference = np.clip(model.predict(np.column_stack((model_longitudes, latitudes))).astype(np.float64), 0, 100)
+    swapped_reference = np.clip(model.predict(np.column_stack((latitudes, model_longitudes))).astype(np.float64), 0, 100)
+
+    results = {
+        'reference': os.path.abspath(args.model),
+        'resolution': args.resolution,
+        'tolerance': args.tolerance,
+        'points': len(latitudes),
+        'backends': {},
+    }
+    if args.maps:
+        os.makedirs(args.maps, exist_ok=True)
+
+    for name in args.backends:
+        print(f"[v0] Checking {name} backend...", file=sys.stderr)
+        result, difference = check_backend(name, latitudes, longitudes, reference, swapped_reference, args)
+        results['backends'][name] = result
+
+        if args.maps and difference is not None:
+            difference = difference.reshape(shape)
+            map_path = os.path.join(args.maps, f'{name.lower()}-diff.png')
+            write_png(disagreement_map(difference, args.tolerance), map_path)
+            np.save(os.path.join(args.maps, f'{name.lower()}-diff.npy'), difference.astype(np.float32))
+            result['map'] = os.path.abspath(map_path)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+
+    swapped = [name for name, r in results['backends'].items() if r.get('feature_order') == 'swapped']
+    if swapped:
+        print(f"FAIL: feature order looks swapped for: {', '.join(swapped)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
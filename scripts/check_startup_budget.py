@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Aurora CLI Startup Budget Check
+Runs the one-shot aurora_prediction.py CLI under `python -X importtime` and
+fails if its import time or total process time exceeds the budget, or if a
+heavy module is imported on the compact-grid fast path.
+
+Usage:
+    python check_startup_budget.py [--runs N] [--import-budget-ms MS] [--startup-budget-ms MS]
+"""
+
+import sys
+import os
+import argparse
+import statistics
+import subprocess
+import time
+
+from aurora_prediction import BACKEND_ENV, GRID_BIN_PATH
+
+SCRIPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'aurora_prediction.py')
+
+# Modules that must only load when a model backend actually needs them
+HEAVY_MODULES = ['numpy', 'onnxruntime', 'sklearn', 'joblib', 'pickle']
+
+def parse_importtime(stderr):
+    """
+    Parse `-X importtime` output.
+
+    Returns:
+        list: (module, self_us, cumulative_us, depth) for every import
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return imports
+
+def run_cli(latitude, longitude):
+    """
+    Run the CLI once.
+
+    Returns:
+        tuple: (wall time in ms, parsed imports, exit code)
+    """
+    env = dict(os.environ)
+    env.pop(BACKEND_ENV, None)
+    command = [sys.executable, '-X', 'importtime', SCRIPT_PATH, str(latitude), str(longitude)]
+
+    start = time.perf_counter()
+    completed = subprocess.run(command, capture_output=True, text=True, env=env)
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    return wall_ms, parse_importtime(completed.stderr), completed.returncode
+
+def main():
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description='Check the aurora CLI startup budget')
+    parser.add_argument('--runs', type=int, default=7, help='Number of CLI runs (default: 7)')
+    parser.add_argument('--import-budget-ms', type=float, default=30.0,
+                        help='Maximum median import time in ms (default: 30)')
+    parser.add_argument('--startup-budget-ms', type=float, default=120.0,
+                        help='Maximum median process time in ms (default: 120)')
+    parser.add_argument('--top', type=int, default=10, help='Slowest imports to list (default: 10)')
+    args = parser.parse_args()
+
+    if not os.path.exists(GRID_BIN_PATH):
+        print(f"Compact grid not found at {GRID_BIN_PATH}; run build_aurora_grid.py first")
+        sys.exit(1)
+
+    # Discard one run so the page cache is warm
+    run_cli(69.65, 18.96)
+
+    runs = [run_cli(69.65, 18.96) for _ in range(args.runs)]
+    wall_times = [wall_ms for wall_ms, _, _ in runs]
+    import_times = [sum(cumulative for _, _, cumulative, depth in imports if depth == 0) / 1000
+                    for _, imports, _ in runs]
+
+    median_wall = statistics.median(wall_times)
+    median_import = statistics.median(import_times)
+    _, imports, returncode = runs[wall_times.index(sorted(wall_times)[len(wall_times) // 2])]
+
+    print(f"Process time (median of {args.runs}): {median_wall:.1f} ms (budget {args.startup_budget_ms:.1f} ms)")
+    print(f"Import time  (median of {args.runs}): {median_import:.1f} ms (budget {args.import_budget_ms:.1f} ms)")
+    print(f"Slowest top-level imports:")
+    top_level = sorted((imp for imp in imports if imp[3] == 0), key=lambda imp: imp[2], reverse=True)
+    for name, _, cumulative, _ in top_level[:args.top]:
+        print(f"  {cumulative / 1000:8.2f} ms  {name}")
+
+    failures = []
+    if returncode != 0:
+        failures.append(f"CLI exited with code {returncode}")
+    heavy = sorted({name for name, _, _, _ in imports if name.split('.')[0] in HEAVY_MODULES})
+    if heavy:
+        failures.append(f"heavy modules imported on the fast path: {', '.join(heavy)}")
+    if median_import > args.import_budget_ms:
+        failures.append(f"import time {median_import:.1f} ms exceeds {args.import_budget_ms:.1f} ms")
+    if median_wall > args.startup_budget_ms:
+        failures.append(f"process time {median_wall:.1f} ms exceeds {args.startup_budget_ms:.1f} ms")
+
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        sys.exit(1)
+
+    print("OK: startup within budget")
+
+if __name__ == '__main__':
+    main()
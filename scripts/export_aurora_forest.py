@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Aurora Forest Exporter
+Flattens the trained scikit-learn RandomForestClassifier into contiguous
+NumPy arrays that aurora_prediction.py evaluates without importing sklearn.
+
+Every tree's nodes are concatenated into one set of arrays, written as .npy
+files in the output directory so they can be memory-mapped:
+
+    roots.npy      (n_trees,)             int32    root node of each tree
+    feature.npy    (n_nodes,)             int8     split feature (0 at leaves)
+    threshold.npy  (n_nodes,)             float64  go left if x[feature] <= threshold
+    left.npy       (n_nodes,)             int32    left child, -1 at leaves
+    right.npy      (n_nodes,)             int32    right child, -1 at leaves
+    leaf.npy       (n_nodes,)             int32    row of value.npy, -1 at internal nodes
+    value.npy      (n_leaves, n_classes)  float64  class probabilities of each leaf
+    classes.npy    (n_classes,)           float64  class labels (aurora 0-100)
+
+Features are [longitude, latitude], the order the model was trained with.
+
+Usage:
+    python export_aurora_forest.py [--model PATH] [--output DIR] [--verify N]
+"""
+
+import sys
+import os
+import argparse
+import numpy as np
+
+from aurora_prediction import FOREST_PATH, PKL_MODEL_PATH, make_forest_evaluator, to_ovation_longitude
+
+def load_sklearn_model(pkl_model_path):
+    """Load a forest saved with joblib.dump (as in the notebook) or pickle.dump."""
+    try:
+        import joblib
+        return joblib.load(pkl_model_path)
+    except ImportError:
+        import pickle
+        with open(pkl_model_path, 'rb') as f:
+            return pickle.load(f)
+
+def flatten_forest(model):
+    """
+    Flatten a fitted RandomForestClassifier into the exported arrays.
+
+    Returns:
+        dict: Array name -> NumPy array, as described in the module docstring
+    """
+    roots, features, thresholds, lefts, rights, leaves, values = [], [], [], [], [], [], []
+    offset = 0
+    n_leaves = 0
+
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        is_leaf = tree.children_left < 0
+
+        # Older scikit-learn stores class counts in leaves and normalizes
+        # them in predict_proba; newer versions store the fractions directly
+        value = tree.value[:, 0, :]
+        normalizer = value.sum(axis=1, keepdims=True)
+        if not np.allclose(normalizer, 1.0):
+            normalizer[normalizer == 0.0] = 1.0
+            value = value / normalizer
+
+        leaf = np.full(tree.node_count, -1, dtype=np.int32)
+        leaf[is_leaf] = n_leaves + np.arange(is_leaf.sum())
+
+        roots.append(offset)
+        features.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(tree.threshold)
+        lefts.append(np.where(is_leaf, -1, tree.children_left + offset))
+        rights.append(np.where(is_leaf, -1, tree.children_right + offset))
+        leaves.append(leaf)
+        values.append(value[is_leaf])
+
+        offset += tree.node_count
+        n_leaves += int(is_leaf.sum())
+
+    return {
+        'roots': np.array(roots, dtype=np.int32),
+        'feature': np.concatenate(features).astype(np.int8),
+        'threshold': np.concatenate(thresholds).astype(np.float64),
+        'left': np.concatenate(lefts).astype(np.int32),
+        'right': np.concatenate(rights).astype(np.int32),
+        'leaf': np.concatenate(leaves),
+        'value': np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+        'classes': np.asarray(model.classes_, dtype=np.float64),
+    }
+
+def save_forest(arrays, output_dir):
+    """Write the exported arrays as .npy files in output_dir."""
+    os.makedirs(output_dir, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(os.path.join(output_dir, f'{name}.npy'), array)
+
+def verify_forest(model, arrays, n_points):
+    """
+    Check the NumPy evaluator against model.predict on random coordinates.
+
+    Returns:
+        int: Number of points where the two disagree
+    """
+    rng = np.random.default_rng(0)
+    latitudes = rng.uniform(-90, 90, n_points)
+    longitudes = rng.uniform(-180, 180, n_points)
+
+    expected = model.predict(np.column_stack((to_ovation_longitude(longitudes), latitudes)))
+    actual = make_forest_evaluator(arrays)(latitudes, longitudes)
+    return int(np.count_nonzero(actual != expected))
+
+def main():
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description='Export the aurora random forest as NumPy arrays')
+    parser.add_argument('--model', default=PKL_MODEL_PATH, help='Pickled RandomForestClassifier')
+    parser.add_argument('--output', default=FOREST_PATH, help='Output directory')
+    parser.add_argument('--verify', type=int, default=10000, metavar='N',
+                        help='Compare against model.predict on N random points (0 to skip)')
+    args = parser.parse_args()
+
+    model = load_sklearn_model(args.model)
+    arrays = flatten_forest(model)
+
+    if args.verify:
+        mismatches = verify_forest(model, arrays, args.verify)
+        if mismatches:
+            print(f"[v0] Exported forest disagrees with model.predict on {mismatches} of {args.verify} points",
+                  file=sys.stderr)
+            sys.exit(1)
+        print(f"[v0] Exported forest matches model.predict on {args.verify} points", file=sys.stderr)
+
+    save_forest(arrays, args.output)
+
+    size_mb = sum(array.nbytes for array in arrays.values()) / (1024 * 1024)
+    print(f"[v0] Wrote {len(arrays['roots'])} trees, {len(arrays['left'])} nodes ({size_mb:.2f} MB) to {args.output}",
+          file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
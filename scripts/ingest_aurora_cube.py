@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Aurora Forecast Cube Ingestion
+Appends OVATION snapshots (ovation_aurora_latest.json) to the time-indexed
+forecast cube that aurora_prediction.py answers timestamped queries from.
+Each snapshot becomes one time slice: its 1 degree intensity grid, laid out
+like the lookup grid (see build_aurora_grid.py), stamped with the snapshot's
+Forecast Time.
+
+Snapshots are parsed in chunks by aurora_ovation.py and scattered straight
+into the memory-mapped slice, so memory use stays constant however large the
+snapshot or the cube. The header's snapshot count is only updated once a
+slice is flushed, so an interrupted run leaves the cube as it was.
+
+Snapshots are appended in time order. A snapshot whose time is already in
+the cube is skipped, and one older than the cube's latest is refused.
+
+Usage:
+    python ingest_aurora_cube.py SNAPSHOT [SNAPSHOT ...] [--cube PATH]
+"""
+
+import sys
+import os
+import argparse
+import time
+import numpy as np
+
+from aurora_ovation import iter_coordinates, read_header
+from aurora_prediction import (CUBE_HEADER, CUBE_MAGIC, CUBE_PATH, CUBE_VERSION, cube_record_dtype,
+                               format_time, from_ovation_longitude, parse_time)
+from build_aurora_grid import grid_axes
+
+# OVATION reports whole-degree points
+CUBE_RESOLUTION = 1.0
+
+def snapshot_time(snapshot_path):
+    """Return a snapshot's Forecast Time (or Observation Time) in Unix seconds."""
+    with open(snapshot_path, 'rb') as f:
+        metadata = read_header(f)
+    value = metadata.get('Forecast Time') or metadata.get('Observation Time')
+    if value is None:
+        raise ValueError(f"{snapshot_path} has no Forecast Time or Observation Time")
+    return parse_time(value)
+
+def read_cube_header(cube_path):
+    """
+    Read the cube header, creating an empty cube if the file doesn't exist.
+
+    Returns:
+        tuple: (latitude rows, longitude columns, snapshots)
+    """
+    if not os.path.exists(cube_path):
+        latitudes, longitudes = grid_axes(CUBE_RESOLUTION)
+        with open(cube_path, 'wb') as f:
+            f.write(CUBE_HEADER.pack(CUBE_MAGIC, CUBE_VERSION, len(latitudes), len(longitudes), 0))
+
+    with open(cube_path, 'rb') as f:
+        magic, version, n_lat, n_lon, count = CUBE_HEADER.unpack(f.read(CUBE_HEADER.size))
+    if magic != CUBE_MAGIC or version != CUBE_VERSION:
+        raise ValueError(f"{cube_path} is not a version {CUBE_VERSION} aurora forecast cube")
+    return n_lat, n_lon, count
+
+def cube_times(cube_path, n_lat, n_lon, count):
+    """Return the snapshot times in the cube, oldest first."""
+    if count == 0:
+        return []
+    records = np.memmap(cube_path, dtype=cube_record_dtype(n_lat, n_lon), mode='r',
+                        offset=CUBE_HEADER.size, shape=(count,))
+    return records['time'].tolist()
+
+def grid_indices(coordinates, n_lat, n_lon):
+    """
+    Map OVATION [longitude 0-359, latitude, aurora] rows to cube cells.
+
+    The cube is laid out like the lookup grid, in request longitudes
+    (-180..180, east positive), so OVATION longitudes (0..360 east) are
+    converted with from_ovation_longitude, the inverse of the mapping every
+    model backend applies to its features.
+
+    Returns:
+        tuple: (row indices, column indices)
+    """
+    step = 180.0 / (n_lat - 1)
+    rows = (coordinates[:, 1] + 90.0) / step
+    # Longitudes 180-359 are -180 to -1; the 180 meridian lands in column 0
+    cols = (from_ovation_longitude(coordinates[:, 0]) + 180.0) / step
+    if np.any(np.abs(rows - np.round(rows)) > 1e-6) or np.any(np.abs(cols - np.round(cols)) > 1e-6):
+        raise ValueError(f"OVATION points must lie on the {step:g} degree cube grid")
+    return np.round(rows).astype(np.intp), np.round(cols).astype(np.intp)
+
+def append_snapshot(cube_path, snapshot_path, timestamp, n_lat, n_lon, count):
+    """
+    Stream one snapshot into a new slice at the end of the cube, then commit
+    it by bumping the header's snapshot count.
+    """
+    record_dtype = np.dtype(cube_record_dtype(n_lat, n_lon))
+    offset = CUBE_HEADER.size + count * record_dtype.itemsize
+
+    # Sized to exactly one more record, dropping anything an interrupted run left
+    with open(cube_path, 'r+b') as f:
+        f.truncate(offset + record_dtype.itemsize)
+
+    record = np.memmap(cube_path, dtype=record_dtype, mode='r+', offset=offset, shape=(1,))
+    grid = record['grid'][0]
+    grid[:] = np.nan
+
+    with open(snapshot_path, 'rb') as f:
+        read_header(f)
+        for coordinates in iter_coordinates(f):
+            rows, cols = grid_indices(coordinates, n_lat, n_lon)
+            grid[rows, cols] = coordinates[:, 2]
+
+    # -180 and 180 are the same meridian
+    grid[:, -1] = grid[:, 0]
+    if np.isnan(grid).any():
+        raise ValueError(f"{snapshot_path} doesn't cover every point of the {n_lat}x{n_lon} grid")
+
+    record['time'][0] = timestamp
+    record.flush()
+    del grid, record
+
+    with open(cube_path, 'r+b') as f:
+        f.write(CUBE_HEADER.pack(CUBE_MAGIC, CUBE_VERSION, n_lat, n_lon, count + 1))
+
+def main():
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description='Append OVATION snapshots to the aurora forecast cube')
+    parser.add_argument('snapshots', nargs='+', help='OVATION JSON snapshots')
+    parser.add_argument('--cube', default=CUBE_PATH, help='Forecast cube file (default: ml/aurora_cube.bin)')
+    args = parser.parse_args()
+
+    n_lat, n_lon, count = read_cube_header(args.cube)
+    times = cube_times(args.cube, n_lat, n_lon, count)
+
+    failures = 0
+    for timestamp, snapshot_path in sorted((snapshot_time(path), path) for path in args.snapshots):
+        if timestamp in times:
+            print(f"[v0] {snapshot_path} ({format_time(timestamp)}) is already in the cube, skipping",
+                  file=sys.stderr)
+            continue
+        if times and timestamp < times[-1]:
+            print(f"[v0] {snapshot_path} ({format_time(timestamp)}) is older than the cube's latest "
+                  f"snapshot ({format_time(times[-1])}), not appended", file=sys.stderr)
+            failures += 1
+            continue
+
+        start = time.perf_counter()
+        try:
+            append_snapshot(args.cube, snapshot_path, timestamp, n_lat, n_lon, count)
+        except ValueError as e:
+            print(f"[v0] {snapshot_path}: {e}, not appended", file=sys.stderr)
+            failures += 1
+            continue
+        count += 1
+        times.append(timestamp)
+        print(f"[v0] Appended {snapshot_path} ({format_time(timestamp)}) as snapshot {count} "
+              f"in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+    if failures:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Aurora Prediction Load Test
+Replays click-like traffic against the prediction service to size capacity:
+requests arrive as a Poisson process at each offered rate in turn, at
+coordinates drawn mostly around a few hot spots (aurora destinations and
+big cities) and otherwise anywhere on the globe.
+
+Targets, all local:
+
+    server   a long-running aurora_server.py on a Unix socket, started here
+             (or an already running one with --socket), one request in
+             flight per connection
+    cli      one aurora_prediction.py process per request, as the backend
+             spawned it before the server existed
+
+At most --concurrency requests are in flight; later arrivals queue for a
+slot. Latency is measured from each request's scheduled arrival, so queueing
+counts and an overloaded target shows up as latency, not as a lower rate.
+
+For each rate the report gives the achieved throughput and p50/p99/p999
+latency (the throughput-vs-latency curve), the highest rate that met the
+--slo-p99-ms objective, and with --histograms a log-scale latency histogram.
+With --baseline, p99 latency and throughput are compared against a saved run
+and the script exits non-zero on a regression beyond --threshold.
+
+Usage:
+    python load_test_aurora.py [--target server|cli] [--rates 100 200 400 800] [--duration 10]
+                               [--concurrency 32] [--workers N] [--socket PATH] [--backend NAME]
+                               [--histograms] [--json] [--save PATH] [--baseline PATH]
+"""
+
+import sys
+import json
+import os
+import argparse
+import asyncio
+import math
+import random
+import signal
+import subprocess
+import tempfile
+from bisect import bisect_left
+
+from benchmark_aurora import percentile
+from benchmark_worker_pool import wait_for_socket
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_PATH = os.path.join(SCRIPTS_DIR, 'aurora_server.py')
+PREDICTION_PATH = os.path.join(SCRIPTS_DIR, 'aurora_prediction.py')
+
+# Where clicks cluster: (latitude, longitude, relative weight)
+HOT_SPOTS = [
+    (69.65, 18.96, 4),     # Tromso
+    (64.15, -21.94, 3),    # Reykjavik
+    (64.84, -147.72, 3),   # Fairbanks
+    (62.45, -114.37, 2),   # Yellowknife
+    (66.50, 25.73, 2),     # Rovaniemi
+    (-42.88, 147.33, 1),   # Hobart
+    (51.51, -0.13, 2),     # London
+    (40.71, -74.01, 2),    # New York
+    (30.04, 31.24, 2),     # Cairo
+]
+
+# Share of clicks near a hot spot, and their spread in degrees
+HOT_SPOT_FRACTION = 0.8
+HOT_SPOT_SPREAD = 1.0
+
+DEFAULT_RATES = {'server': [100, 200, 400, 800, 1600], 'cli': [2, 5, 10, 20]}
+
+# Upper bounds of the latency histogram buckets in seconds: 50 us doubling to about 26 s
+HISTOGRAM_BOUNDS = [0.00005 * 2 ** k for k in range(20)]
+
+def click_coordinates(rng):
+    """Draw one (latitude, longitude), near a hot spot or uniformly over the globe."""
+    if rng.random() < HOT_SPOT_FRACTION:
+        latitude, longitude, _ = rng.choices(HOT_SPOTS, weights=[spot[2] for spot in HOT_SPOTS])[0]
+        latitude = min(max(rng.gauss(latitude, HOT_SPOT_SPREAD), -90.0), 90.0)
+        longitude = (rng.gauss(longitude, HOT_SPOT_SPREAD) + 180.0) % 360.0 - 180.0
+        return round(latitude, 4), round(longitude, 4)
+    # Uniform over the sphere's area, not over latitude
+    return round(math.degrees(math.asin(rng.uniform(-1.0, 1.0))), 4), round(rng.uniform(-180.0, 180.0), 4)
+
+class ServerTarget:
+    """Requests over a pool of connections to aurora_server.py."""
+
+    def __init__(self, socket_path, connections):
+        self.socket_path = socket_path
+        self.connections = connections
+        self._pool = asyncio.Queue()
+        self._next_id = 0
+
+    async def open(self):
+        for _ in range(self.connections):
+            self._pool.put_nowait(await asyncio.open_unix_connection(self.socket_path))
+
+    async def request(self, latitude, longitude):
+        reader, writer = await self._pool.get()
+        try:
+            self._next_id += 1
+            request = {'id': self._next_id, 'latitude': latitude, 'longitude': longitude}
+            writer.write((json.dumps(request) + '\n').encode('utf-8'))
+            await writer.drain()
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError('Prediction server closed the connection')
+        except OSError:
+            # Replace the broken connection, so later requests don't fail on it
+            writer.close()
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.socket_path)
+            except OSError:
+                pass
+            raise
+        finally:
+            self._pool.put_nowait((reader, writer))
+        return json.loads(line)
+
+    async def close(self):
+        while not self._pool.empty():
+            _, writer = self._pool.get_nowait()
+            writer.close()
+
+class CliTarget:
+    """Requests as one-shot aurora_prediction.py processes."""
+
+    def __init__(self, env):
+        self.env = env
+
+    async def open(self):
+        pass
+
+    async def request(self, latitude, longitude):
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, PREDICTION_PATH, str(latitude), str(longitude),
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL, env=self.env)
+        output, _ = await process.communicate()
+        return json.loads(output)
+
+    async def close(self):
+        pass
+
+def histogram(latencies):
+    """Count latencies (seconds) into HISTOGRAM_BOUNDS buckets, the last one open-ended."""
+    counts = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+    for latency in latencies:
+        counts[bisect_left(HISTOGRAM_BOUNDS, latency)] += 1
+    return counts
+
+async def run_rate(target, rate, duration, concurrency, rng):
+    """
+    Offer Poisson traffic at rate requests per second for duration seconds.
+
+    Returns:
+        dict: Throughput, latency percentiles in ms, errors and the histogram
+    """
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+    last_done = loop.time()
+
+    async def send(arrival, latitude, longitude):
+        nonlocal errors, last_done
+        async with slots:
+            try:
+                ok = (await target.request(latitude, longitude)).get('success')
+            except (OSError, ValueError):
+                ok = False
+        last_done = loop.time()
+        if ok:
+            latencies.append(last_done - arrival)
+        else:
+            errors += 1
+
+    tasks = []
+    start = arrival = loop.time()
+    while True:
+        arrival += rng.expovariate(rate)
+        if arrival >= start + duration:
+            break
+        await asyncio.sleep(max(arrival - loop.time(), 0))
+        tasks.append(asyncio.create_task(send(arrival, *click_coordinates(rng))))
+    await asyncio.gather(*tasks)
+
+    elapsed = max(last_done - start, 1e-9)
+    result = {
+        'offered_rps': rate,
+        'requests': len(tasks),
+        'errors': errors,
+        'achieved_rps': len(latencies) / elapsed,
+        'histogram': histogram(latencies),
+    }
+    if latencies:
+        result.update({
+            'p50_ms': percentile(latencies, 50) * 1000,
+            'p99_ms': percentile(latencies, 99) * 1000,
+            'p999_ms': percentile(latencies, 99.9) * 1000,
+            'max_ms': max(latencies) * 1000,
+        })
+    return result
+
+async def run_load_test(target, rates, duration, concurrency, warmup, seed):
+    """Run every rate against target, after a warm-up at the first rate."""
+    rng = random.Random(seed)
+    await target.open()
+    try:
+        if warmup > 0:
+            await run_rate(target, rates[0], warmup, concurrency, rng)
+        return [await run_rate(target, rate, duration, concurrency, rng) for rate in rates]
+    finally:
+        await target.close()
+
+def start_server(workers, backend):
+    """
+    Start aurora_server.py on a temporary socket.
+
+    Returns:
+        tuple: (server process, socket path)
+    """
+    socket_path = os.path.join(tempfile.mkdtemp(), 'aurora.sock')
+    env = dict(os.environ, AURORA_BACKEND=backend) if backend else dict(os.environ)
+    command = [sys.executable, SERVER_PATH, '--socket', socket_path, '--workers', str(workers)]
+    server = subprocess.Popen(command, env=env, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_socket(socket_path)
+    except TimeoutError:
+        server.kill()
+        raise
+    return server, socket_path
+
+def sustainable_rate(results, slo_p99_ms):
+    """Return the highest offered rate served within 95% and the p99 objective, or None."""
+    passing = [r['offered_rps'] for r in results
+               if not r['errors'] and 'p99_ms' in r and r['p99_ms'] <= slo_p99_ms
+               and r['achieved_rps'] >= 0.95 * r['offered_rps']]
+    return max(passing) if passing else None
+
+def find_regressions(results, baseline, threshold):
+    """
+    Compare per-rate p99 latency and throughput with a baseline run.
+
+    Returns:
+        list: Descriptions of metrics that got worse by more than threshold
+    """
+    previous = {r['offered_rps']: r for r in baseline['results']}
+    regressions = []
+    for r in results['results']:
+        old = previous.get(r['offered_rps'])
+        if old is None:
+            continue
+        if 'p99_ms' in r and 'p99_ms' in old and r['p99_ms'] > old['p99_ms'] * (1 + threshold):
+            regressions.append(f"{r['offered_rps']:g} rps p99: {r['p99_ms']:.1f} ms vs baseline {old['p99_ms']:.1f} ms")
+        if r['achieved_rps'] < old['achieved_rps'] * (1 - threshold):
+            regressions.append(f"{r['offered_rps']:g} rps throughput: {r['achieved_rps']:.0f} "
+                               f"vs baseline {old['achieved_rps']:.0f}")
+    return regressions
+
+def print_histogram(counts, width=40):
+    """Print a latency histogram with one bar per non-empty bucket."""
+    largest = max(counts) or 1
+    for index, count in enumerate(counts):
+        if not count:
+            continue
+        if index < len(HISTOGRAM_BOUNDS):
+            label = f"<= {HISTOGRAM_BOUNDS[index] * 1000:9.2f} ms"
+        else:
+            label = f" > {HISTOGRAM_BOUNDS[-1] * 1000:9.2f} ms"
+        print(f"  {label} {count:>8} {'#' * max(1, round(count / largest * width))}")
+
+def print_table(results, show_histograms):
+    """Print the throughput-vs-latency curve."""
+    print(f"Target: {results['target']}, concurrency {results['concurrency']}, "
+          f"{results['duration_s']:g}s per rate, CPUs: {results['cpus']}")
+    print(f"{'offered':>8} {'achieved':>9} {'p50 ms':>8} {'p99 ms':>8} {'p999 ms':>8} {'max ms':>8} {'errors':>7}")
+    for r in results['results']:
+        if 'p50_ms' in r:
+            latency = f"{r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['p999_ms']:>8.2f} {r['max_ms']:>8.2f}"
+        else:
+            latency = f"{'-':>8} {'-':>8} {'-':>8} {'-':>8}"
+        print(f"{r['offered_rps']:>8g} {r['achieved_rps']:>9.1f} {latency} {r['errors']:>7}")
+        if show_histograms:
+            print_histogram(r['histogram'])
+
+    rate = results['sustainable_rps']
+    if rate is None:
+        print(f"No rate met p99 <= {results['slo_p99_ms']:g} ms")
+    else:
+        print(f"Highest rate meeting p99 <= {results['slo_p99_ms']:g} ms: {rate:g} requests/s")
+
+def main():
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description='Load test the aurora prediction service')
+    parser.add_argument('--target', choices=['server', 'cli'], default='server',
+                        help='Long-running server or one-shot CLI (default: server)')
+    parser.add_argument('--rates', type=float, nargs='+',
+                        help='Offered request rates per second (default: 100 to 1600 for the server, '
+                             '2 to 20 for the CLI)')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per rate (default: 10)')
+    parser.add_argument('--warmup', type=float, default=2.0, help='Seconds of warm-up traffic (default: 2)')
+    parser.add_argument('--concurrency', type=int, default=32,
+                        help='Requests in flight at most; server connections (default: 32)')
+    parser.add_argument('--socket', help='Use an already running server on this socket')
+    parser.add_argument('--workers', type=int, default=1, help='Workers of the started server (default: 1)')
+    parser.add_argument('--backend', help='AURORA_BACKEND for the started server or the CLI')
+    parser.add_argument('--slo-p99-ms', type=float, default=100.0,
+                        help='p99 latency objective for the sustainable rate (default: 100)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for arrivals and coordinates')
+    parser.add_argument('--histograms', action='store_true', help='Print a latency histogram per rate')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    parser.add_argument('--save', help='Write the JSON results to this file')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Allowed relative regression against the baseline (default: 0.2)')
+    args = parser.parse_args()
+
+    rates = args.rates or DEFAULT_RATES[args.target]
+    server = None
+    if args.target == 'cli':
+        env = dict(os.environ, AURORA_BACKEND=args.backend) if args.backend else dict(os.environ)
+        target = CliTarget(env)
+    else:
+        socket_path = args.socket
+        if socket_path is None:
+            server, socket_path = start_server(args.workers, args.backend)
+        target = ServerTarget(socket_path, args.concurrency)
+
+    try:
+        curve = asyncio.run(run_load_test(target, rates, args.duration, args.concurrency, args.warmup, args.seed))
+    finally:
+        if server is not None:
+            server.send_signal(signal.SIGTERM)
+            server.wait()
+
+    results = {
+        'target': args.target,
+        'cpus': os.cpu_count(),
+        'concurrency': args.concurrency,
+        'duration_s': args.duration,
+        'histogram_bounds_s': HISTOGRAM_BOUNDS,
+        'slo_p99_ms': args.slo_p99_ms,
+        'sustainable_rps': sustainable_rate(curve, args.slo_p99_ms),
+        'results': curve,
+    }
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results, args.histograms)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"OK: no regression beyond {args.threshold:.0%} of the baseline")
+
+if __name__ == '__main__':
+    main()
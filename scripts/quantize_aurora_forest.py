@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Aurora Forest Quantizer
+Packs the exported forest arrays (see export_aurora_forest.py) into one
+compact file that aurora_prediction.py loads with a single memory map:
+
+  - Thresholds are int16 multiples of 1/64 degree. The model is trained on
+    whole-degree OVATION points, so its splits fall on half degrees and are
+    stored exactly.
+  - Leaf class distributions are sparse (class, weight) pairs: a uint8 class
+    index (aurora classes are 0-100) and the probability as a uint16 multiple
+    of 1/65535. Classes a leaf never predicts are dropped. uint8 weights were
+    too coarse: summed over the trees they flip close votes on about 0.05% of
+    points, by up to 36 intensity points.
+  - Nodes are renumbered breadth-first within each tree, so both children of
+    a node are adjacent, and packed into 8-byte records (child, threshold,
+    feature).
+
+A leaf entry therefore takes 3 bytes. For the 50-tree model the file is
+2.38 MiB, against 47.10 MiB of float arrays: 1.30 MiB of nodes, 0.33 MiB of
+leaf offsets, and 0.25 MiB of classes plus 0.50 MiB of weights over 263,864
+leaf entries.
+
+Before writing, the quantized forest is validated against the float forest
+on random points and on a global grid. The output is refused unless every
+prediction is within --tolerance intensity points and at most
+--max-mismatch of them differ at all.
+
+Usage:
+    python quantize_aurora_forest.py [--forest DIR] [--output PATH] [--verify N]
+                                     [--tolerance T] [--max-mismatch FRACTION]
+"""
+
+import sys
+import json
+import os
+import argparse
+import numpy as np
+
+from aurora_prediction import (FOREST_ARRAYS, FOREST_PATH, QFOREST_HEADER, QFOREST_MAGIC, QFOREST_NODE_DTYPE,
+                               QFOREST_PATH, QFOREST_VERSION, load_qforest_model, make_forest_evaluator,
+                               make_qforest_evaluator, qforest_layout)
+from build_aurora_grid import grid_axes
+
+# Thresholds are stored as round(threshold * THRESHOLD_SCALE); a power of two
+# keeps the scaling of inputs exact
+THRESHOLD_SCALE = 64
+
+# Leaf probabilities are stored as round(probability * WEIGHT_SCALE)
+WEIGHT_SCALE = 65535
+
+def load_forest_arrays(forest_dir):
+    """Load the arrays written by export_aurora_forest.py."""
+    return {name: np.load(os.path.join(forest_dir, f'{name}.npy')) for name in FOREST_ARRAYS}
+
+def breadth_first_order(roots, left, right):
+    """
+    Order each tree's nodes breadth-first, so every node's right child
+    directly follows its left child.
+
+    Returns:
+        tuple: (old node index of each new position, new root positions)
+    """
+    order = []
+    new_roots = []
+    for root in roots.tolist():
+        new_roots.append(len(order))
+        order.append(root)
+        position = new_roots[-1]
+        while position < len(order):
+            node = order[position]
+            if left[node] >= 0:
+                order.append(int(left[node]))
+                order.append(int(right[node]))
+            position += 1
+    return np.array(order, dtype=np.intp), np.array(new_roots, dtype=np.int32)
+
+def pack_forest(arrays, scale=THRESHOLD_SCALE):
+    """
+    Quantize and pack exported forest arrays.
+
+    Returns:
+        dict: Sections named as in qforest_layout, plus the threshold scale
+    """
+    order, roots = breadth_first_order(arrays['roots'], arrays['left'], arrays['right'])
+    position = np.empty(len(order), dtype=np.int64)
+    position[order] = np.arange(len(order))
+
+    left = arrays['left'][order]
+    is_leaf = left < 0
+    thresholds = np.round(arrays['threshold'][order] * scale)
+    thresholds[is_leaf] = 0
+    if np.abs(thresholds).max() > np.iinfo(np.int16).max:
+        raise ValueError(f"Thresholds don't fit in int16 at scale {scale}")
+
+    nodes = np.zeros(len(order), dtype=QFOREST_NODE_DTYPE)
+    nodes['child'] = np.where(is_leaf, -1 - arrays['leaf'][order], position[np.maximum(left, 0)])
+    nodes['threshold'] = thresholds.astype(np.int16)
+    nodes['feature'] = np.where(is_leaf, 0, arrays['feature'][order])
+
+    classes = arrays['classes']
+    if np.any(classes != np.round(classes)) or classes.min() < 0 or classes.max() > 255:
+        raise ValueError("Class labels must be whole numbers from 0 to 255")
+
+    # Sparse leaf distributions, in leaf order
+    weights = np.round(arrays['value'] * WEIGHT_SCALE).astype(np.uint16)
+    leaf_rows, entry_class = np.nonzero(weights)
+    offsets = np.zeros(len(weights) + 1, dtype=np.uint32)
+    np.cumsum(np.bincount(leaf_rows, minlength=len(weights)), out=offsets[1:])
+
+    return {
+        'scale': scale,
+        'roots': roots,
+        'nodes': nodes,
+        'offsets': offsets,
+        'entry_class': entry_class.astype(np.uint8),
+        'entry_weight': weights[leaf_rows, entry_class],
+        'classes': classes.astype(np.uint8),
+    }
+
+def write_qforest(sections, output_path):
+    """Write packed sections in the file format read by load_qforest_model."""
+    counts = (len(sections['roots']), len(sections['nodes']), len(sections['offsets']) - 1,
+              len(sections['entry_class']), len(sections['classes']))
+    with open(output_path, 'wb') as f:
+        f.write(QFOREST_HEADER.pack(QFOREST_MAGIC, QFOREST_VERSION, *counts, sections['scale']))
+        for name, dtype, length in qforest_layout(*counts):
+            f.write(b'\0' * (-f.tell() % 8))
+            np.asarray(sections[name], dtype=dtype).tofile(f)
+
+def validation_points(n_random, resolution=0.5):
+    """
+    Return random coordinates plus every node of a global grid, as
+    (latitudes, longitudes). Grid nodes fall exactly on the half-degree
+    thresholds, where a comparison error would show.
+    """
+    rng = np.random.default_rng(0)
+    latitudes, longitudes = grid_axes(resolution)
+    lat_mesh, lon_mesh = np.meshgrid(latitudes, longitudes, indexing='ij')
+    return (np.concatenate((rng.uniform(-90, 90, n_random), lat_mesh.ravel())),
+            np.concatenate((rng.uniform(-180, 180, n_random), lon_mesh.ravel())))
+
+def validate(arrays, sections, n_random, resolution=0.5):
+    """
+    Compare the quantized forest's predictions with the float forest's.
+
+    Returns:
+        dict: Points checked, mismatching fraction, max and mean absolute difference
+    """
+    latitudes, longitudes = validation_points(n_random, resolution)
+    expected = make_forest_evaluator(arrays)(latitudes, longitudes)
+    actual = make_qforest_evaluator(sections)(latitudes, longitudes)
+    difference = np.abs(actual - expected)
+    return {
+        'points': len(latitudes),
+        'mismatch': float(np.mean(difference > 0)),
+        'max_abs_diff': float(difference.max()),
+        'mean_abs_diff': float(difference.mean()),
+    }
+
+def main():
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description='Pack the exported aurora forest into a quantized file')
+    parser.add_argument('--forest', default=FOREST_PATH, help='Directory written by export_aurora_forest.py')
+    parser.add_argument('--output', default=QFOREST_PATH, help='Output file')
+    parser.add_argument('--verify', type=int, default=100000, metavar='N',
+                        help='Random points checked, on top of a 0.5 degree global grid (default: 100000)')
+    parser.add_argument('--tolerance', type=float, default=1.0,
+                        help='Largest allowed intensity difference at any point (default: 1)')
+    parser.add_argument('--max-mismatch', type=float, default=0.0001,
+                        help='Largest allowed fraction of points whose intensity changes (default: 0.0001)')
+    args = parser.parse_args()
+
+    arrays = load_forest_arrays(args.forest)
+    sections = pack_forest(arrays)
+
+    report = validate(arrays, sections, args.verify)
+    print(json.dumps(report), file=sys.stderr)
+    if report['max_abs_diff'] > args.tolerance or report['mismatch'] > args.max_mismatch:
+        print(f"[v0] Quantized forest exceeds tolerance {args.tolerance:g} / mismatch {args.max_mismatch:g}, "
+              f"not written", file=sys.stderr)
+        sys.exit(1)
+
+    write_qforest(sections, args.output)
+
+    # Check the written file round-trips through the loader
+    latitudes, longitudes = validation_points(1000)
+    if not np.array_equal(load_qforest_model(args.output)(latitudes, longitudes),
+                          make_qforest_evaluator(sections)(latitudes, longitudes)):
+        print(f"[v0] {args.output} doesn't load back identically", file=sys.stderr)
+        sys.exit(1)
+
+    original_mb = sum(array.nbytes for array in arrays.values()) / (1024 * 1024)
+    packed_mb = os.path.getsize(args.output) / (1024 * 1024)
+    print(f"[v0] Wrote {len(sections['roots'])} trees, {len(sections['nodes'])} nodes to {args.output}: "
+          f"{packed_mb:.2f} MiB (from {original_mb:.2f} MiB)", file=sys.stderr)
+    sizes = ', '.join(f"{name} {sections[name].nbytes / (1024 * 1024):.2f} MiB"
+                      + ('' if sections[name].dtype.names else f" ({sections[name].dtype})")
+                      for name in ('nodes', 'offsets', 'entry_class', 'entry_weight'))
+    print(f"[v0] Sections: {sizes}", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Aurora Model Training Pipeline
+Trains the aurora RandomForestClassifier from a local OVATION snapshot, the
+way ML/Aurora_model_training.ipynb does, using every core, and writes every
+artifact aurora_prediction.py can serve in one run:
+
+    aurora_model_temp.pkl    the scikit-learn model (joblib)
+    aurora_model.onnx        the same model converted with skl2onnx
+    aurora_forest/           flattened tree arrays (see export_aurora_forest.py)
+    aurora_forest.qbin       the quantized forest (see quantize_aurora_forest.py)
+    aurora_grid.npy / .bin   the precomputed lookup grid (see build_aurora_grid.py)
+    training_report.json     timings, holdout accuracy and artifact sizes
+
+Features are [longitude, latitude] and the label is the OVATION aurora value,
+as in the notebook.
+
+Usage:
+    python train_aurora_model.py SNAPSHOT [--output-dir DIR] [--n-estimators 50] [--max-depth 12]
+                                          [--n-jobs -1] [--grid-resolution 0.25] [--skip-onnx]
+"""
+
+import sys
+import json
+import os
+import argparse
+import time
+import numpy as np
+
+from aurora_ovation import read_ovation
+from aurora_prediction import (FOREST_PATH, GRID_BIN_PATH, GRID_PATH, MODEL_DIR, ONNX_MODEL_PATH,
+                               PKL_MODEL_PATH, QFOREST_PATH, to_ovation_longitude)
+from build_aurora_grid import build_grid, write_compact_grid
+from export_aurora_forest import flatten_forest, save_forest, verify_forest
+from quantize_aurora_forest import pack_forest, validate, write_qforest
+
+REPORT_NAME = 'training_report.json'
+
+# Points compared between the exported forest and model.predict
+VERIFY_POINTS = 10000
+
+# Largest intensity change and fraction of changed points accepted from the
+# quantized forest, checked on VERIFY_POINTS random points and a 1 degree grid
+QFOREST_TOLERANCE = 1.0
+QFOREST_MAX_MISMATCH = 0.0001
+
+def path_size(path):
+    """Return the size in bytes of a file, or of every file in a directory."""
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    return os.path.getsize(path)
+
+def train_model(features, labels, n_estimators, max_depth, n_jobs, random_state=42):
+    """
+    Fit the forest on an 80/20 split, as in the notebook.
+
+    Returns:
+        tuple: (fitted model, holdout metrics dict)
+    """
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.model_selection import train_test_split
+
+    X_train, X_test, y_train, y_test = train_test_split(features, labels, test_size=0.2,
+                                                        random_state=random_state)
+    model = RandomForestClassifier(n_estimators=n_estimators, max_depth=max_depth,
+                                   random_state=random_state, n_jobs=n_jobs)
+    model.fit(X_train, y_train)
+
+    predicted = model.predict(X_test)
+    metrics = {
+        'holdout_accuracy': float(np.mean(predicted == y_test)),
+        'holdout_mean_abs_error': float(np.mean(np.abs(predicted - y_test))),
+        'train_points': len(X_train),
+        'holdout_points': len(X_test),
+    }
+    return model, metrics
+
+def export_onnx(model, output_path):
+    """Convert the model with skl2onnx, with the input the prediction script feeds it."""
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+
+    # Input: 2 features (longitude, latitude)
+    initial_type = [('float_input', FloatTensorType([None, 2]))]
+    onnx_model = convert_sklearn(model, initial_types=initial_type)
+    with open(output_path, 'wb') as f:
+        f.write(onnx_model.SerializeToString())
+
+def run_pipeline(snapshot_path, output_dir, args):
+    """
+    Train the model and write every artifact to output_dir.
+
+    Returns:
+        dict: The training report
+    """
+    import joblib
+
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {
+        'pkl': os.path.join(output_dir, os.path.basename(PKL_MODEL_PATH)),
+        'onnx': os.path.join(output_dir, os.path.basename(ONNX_MODEL_PATH)),
+        'forest': os.path.join(output_dir, os.path.basename(FOREST_PATH)),
+        'qforest': os.path.join(output_dir, os.path.basename(QFOREST_PATH)),
+        'grid': os.path.join(output_dir, os.path.basename(GRID_PATH)),
+        'grid_bin': os.path.join(output_dir, os.path.basename(GRID_BIN_PATH)),
+    }
+    timings = {}
+
+    start = time.perf_counter()
+    metadata, coordinates = read_ovation(snapshot_path)
+    timings['ingest_s'] = time.perf_counter() - start
+    print(f"[v0] Read {len(coordinates)} OVATION points in {timings['ingest_s']:.2f}s", file=sys.stderr)
+
+    features = coordinates[:, :2]
+    labels = coordinates[:, 2].astype(np.int64)
+
+    start = time.perf_counter()
+    model, metrics = train_model(features, labels, args.n_estimators, args.max_depth, args.n_jobs)
+    timings['fit_s'] = time.perf_counter() - start
+    print(f"[v0] Trained {args.n_estimators} trees in {timings['fit_s']:.2f}s, "
+          f"holdout accuracy {metrics['holdout_accuracy']:.3f}", file=sys.stderr)
+
+    start = time.perf_counter()
+    arrays = flatten_forest(model)
+    mismatches = verify_forest(model, arrays, VERIFY_POINTS)
+    if mismatches:
+        raise RuntimeError(f"Exported forest disagrees with model.predict on {mismatches} of {VERIFY_POINTS} points")
+    save_forest(arrays, paths['forest'])
+    timings['forest_export_s'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sections = pack_forest(arrays)
+    quantization = validate(arrays, sections, VERIFY_POINTS, resolution=1.0)
+    if quantization['max_abs_diff'] > QFOREST_TOLERANCE or quantization['mismatch'] > QFOREST_MAX_MISMATCH:
+        raise RuntimeError(f"Quantized forest exceeds tolerance: {quantization}")
+    write_qforest(sections, paths['qforest'])
+    timings['qforest_export_s'] = time.perf_counter() - start
+
+    # Evaluate the grid with the fitted model, which still predicts on n_jobs cores
+    start = time.perf_counter()
+    build_grid(lambda latitudes, longitudes: model.predict(
+                   np.column_stack((to_ovation_longitude(longitudes), latitudes))),
+               args.grid_resolution, paths['grid'])
+    write_compact_grid(np.load(paths['grid'], mmap_mode='r'), paths['grid_bin'])
+    timings['grid_build_s'] = time.perf_counter() - start
+
+    # Serve single-point queries without dispatching to a thread pool
+    model.set_params(n_jobs=None)
+
+    start = time.perf_counter()
+    joblib.dump(model, paths['pkl'])
+    timings['pkl_export_s'] = time.perf_counter() - start
+
+    if args.skip_onnx:
+        del paths['onnx']
+    else:
+        start = time.perf_counter()
+        export_onnx(model, paths['onnx'])
+        timings['onnx_export_s'] = time.perf_counter() - start
+
+    tree_depths = [estimator.tree_.max_depth for estimator in model.estimators_]
+    report = {
+        'snapshot': os.path.abspath(snapshot_path),
+        'observation_time': metadata.get('Observation Time'),
+        'forecast_time': metadata.get('Forecast Time'),
+        'points': len(coordinates),
+        'params': {
+            'n_estimators': args.n_estimators,
+            'max_depth': args.max_depth,
+            'n_jobs': args.n_jobs,
+            'grid_resolution': args.grid_resolution,
+        },
+        'max_tree_depth': max(tree_depths),
+        'mean_tree_depth': sum(tree_depths) / len(tree_depths),
+        'nodes': len(arrays['left']),
+        **metrics,
+        'quantization': quantization,
+        'timings': timings,
+        'artifacts': {name: {'path': os.path.abspath(path), 'size_bytes': path_size(path)}
+                      for name, path in paths.items()},
+    }
+    with open(os.path.join(output_dir, REPORT_NAME), 'w') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+def main():
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description='Train the aurora model from a local OVATION snapshot')
+    parser.add_argument('snapshot', help='OVATION JSON snapshot (ovation_aurora_latest.json)')
+    parser.add_argument('--output-dir', default=MODEL_DIR, help='Directory for the model artifacts (default: ml/)')
+    parser.add_argument('--n-estimators', type=int, default=50, help='Trees in the forest (default: 50)')
+    parser.add_argument('--max-depth', type=int, default=12, help='Maximum tree depth (default: 12)')
+    parser.add_argument('--n-jobs', type=int, default=-1, help='Cores used for training (default: all)')
+    parser.add_argument('--grid-resolution', type=float, default=0.25, choices=[1.0, 0.5, 0.25],
+                        help='Lookup grid step in degrees (default: 0.25)')
+    parser.add_argument('--skip-onnx', action='store_true', help='Do not export the ONNX model')
+    args = parser.parse_args()
+
+    report = run_pipeline(args.snapshot, args.output_dir, args)
+
+    total = sum(report['timings'].values())
+    print(f"[v0] Wrote model artifacts to {args.output_dir} in {total:.2f}s", file=sys.stderr)
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
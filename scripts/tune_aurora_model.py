@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Aurora Model Size Search
+Sweeps forest size (n_estimators) and depth (max_depth) for the aurora model
+and reports, for every configuration, the holdout accuracy and mean absolute
+error on an OVATION snapshot, single-query inference latency and model size,
+followed by the Pareto front of accuracy (or error) against latency.
+
+Fits run in parallel in a process pool, one single-threaded fit per worker,
+and each finished fit is cached on disk under a key made of the snapshot's
+hash and the training parameters, so a rerun only fits new configurations.
+Latency is measured afterwards in this process, one configuration at a
+time, so parallel fits don't skew it.
+
+Usage:
+    python tune_aurora_model.py SNAPSHOT [--n-estimators 10 25 50 100] [--max-depths 8 10 12 16 0]
+                                         [--processes N] [--backend forest|pkl] [--objective accuracy|mae]
+                                         [--latency-budget-us US] [--json]
+"""
+
+import sys
+import json
+import os
+import argparse
+import hashlib
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from aurora_ovation import read_ovation
+from aurora_prediction import MODEL_DIR, make_forest_evaluator, model_hash, to_ovation_longitude
+from benchmark_aurora import percentile
+from export_aurora_forest import flatten_forest
+from train_aurora_model import train_model
+
+TUNING_CACHE_DIR = os.path.join(MODEL_DIR, 'tuning_cache')
+
+# Snapshot arrays loaded once per pool worker
+_features = None
+_labels = None
+
+def load_training_data(snapshot_path):
+    """Return the (features, labels) the training pipeline uses."""
+    _, coordinates = read_ovation(snapshot_path)
+    return coordinates[:, :2], coordinates[:, 2].astype(np.int64)
+
+def init_worker(snapshot_path):
+    """Pool initializer: read the snapshot once per worker process."""
+    global _features, _labels
+    _features, _labels = load_training_data(snapshot_path)
+
+def cache_key(snapshot_digest, n_estimators, max_depth):
+    """Return the cache file stem for one configuration."""
+    import sklearn
+    params = json.dumps([snapshot_digest, n_estimators, max_depth, sklearn.__version__])
+    return hashlib.sha256(params.encode('utf-8')).hexdigest()[:16]
+
+def fit_configuration(n_estimators, max_depth, cache_dir, key):
+    """
+    Fit one configuration in a pool worker, or reuse its cached fit.
+
+    Returns:
+        dict: Configuration, holdout metrics, fit time and the cached model path
+    """
+    import joblib
+    model_path = os.path.join(cache_dir, f'{key}.joblib')
+    metrics_path = os.path.join(cache_dir, f'{key}.json')
+
+    if os.path.exists(model_path) and os.path.exists(metrics_path):
+        with open(metrics_path) as f:
+            return {**json.load(f), 'cached': True}
+
+    start = time.perf_counter()
+    model, metrics = train_model(_features, _labels, n_estimators, max_depth, n_jobs=1)
+    fit_s = time.perf_counter() - start
+
+    result = {
+        'n_estimators': n_estimators,
+        'max_depth': max_depth,
+        **metrics,
+        'fit_s': fit_s,
+        'model_path': model_path,
+    }
+
+    # Write the model first: the metrics file marks the fit as complete
+    joblib.dump(model, model_path)
+    with open(metrics_path, 'w') as f:
+        json.dump(result, f, indent=2)
+    return {**result, 'cached': False}
+
+def measure_latency(model, backend, queries, rng):
+    """
+    Measure single-query latency of a fitted model as it would be served.
+
+    Returns:
+        dict: p50_us, p99_us and the served model's size in bytes
+    """
+    if backend == 'forest':
+        arrays = flatten_forest(model)
+        evaluator = make_forest_evaluator(arrays)
+        predict = lambda latitude, longitude: evaluator([latitude], [longitude])
+        size = sum(array.nbytes for array in arrays.values())
+    else:
+        import pickle
+        predict = lambda latitude, longitude: model.predict([[float(to_ovation_longitude(longitude)), latitude]])
+        size = len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+
+    latitudes = rng.uniform(-90, 90, queries).tolist()
+    longitudes = rng.uniform(-180, 180, queries).tolist()
+    for latitude, longitude in zip(latitudes[:10], longitudes[:10]):
+        predict(latitude, longitude)
+
+    latencies = []
+    for latitude, longitude in zip(latitudes, longitudes):
+        start = time.perf_counter()
+        predict(latitude, longitude)
+        latencies.append((time.perf_counter() - start) * 1e6)
+
+    return {
+        'p50_us': percentile(latencies, 50),
+        'p99_us': percentile(latencies, 99),
+        'size_bytes': size,
+    }
+
+def objective_score(result, objective):
+    """Return a result's holdout score for objective, higher is better."""
+    if objective == 'mae':
+        return -result['holdout_mean_abs_error']
+    return result['holdout_accuracy']
+
+def pareto_front(results, objective='accuracy'):
+    """
+    Return the configurations no other configuration beats on both the
+    holdout objective and p50 latency, fastest first.
+    """
+    front = []
+    for r in sorted(results, key=lambda r: (r['p50_us'], -objective_score(r, objective))):
+        if not front or objective_score(r, objective) > objective_score(front[-1], objective):
+            front.append(r)
+    return front
+
+def print_table(results, front, best, objective):
+    """Print every configuration, marking the Pareto front and the pick."""
+    on_front = {id(r) for r in front}
+    print(f"{'trees':>5} {'depth':>5} {'accuracy':>9} {'MAE':>6} {'p50 us':>8} {'p99 us':>8} "
+          f"{'size MB':>8} {'fit s':>7}")
+    for r in sorted(results, key=lambda r: (r['n_estimators'], r['max_depth'] or 0)):
+        mark = ' *' if id(r) in on_front else ''
+        if r is best:
+            mark += ' <- best within budget'
+        print(f"{r['n_estimators']:>5} {str(r['max_depth'] or '-'):>5} {r['holdout_accuracy']:>9.4f} "
+              f"{r['holdout_mean_abs_error']:>6.3f} {r['p50_us']:>8.1f} {r['p99_us']:>8.1f} "
+              f"{r['size_bytes'] / (1024 * 1024):>8.2f} {r['fit_s']:>7.2f}{mark}")
+    print(f"* Pareto front ({objective} vs p50 latency)")
+
+def main():
+    """Main entry point for the script."""
+    parser = argparse.ArgumentParser(description='Search aurora forest sizes for the accuracy/latency trade-off')
+    parser.add_argument('snapshot', help='OVATION JSON snapshot to train and evaluate on')
+    parser.add_argument('--n-estimators', type=int, nargs='+', default=[10, 25, 50, 100],
+                        help='Forest sizes to try (default: 10 25 50 100)')
+    parser.add_argument('--max-depths', type=int, nargs='+', default=[8, 10, 12, 16, 0],
+                        help='Tree depths to try, 0 for unlimited (default: 8 10 12 16 0)')
+    parser.add_argument('--processes', type=int, default=os.cpu_count(),
+                        help='Parallel fits (default: one per CPU)')
+    parser.add_argument('--backend', choices=['forest', 'pkl'], default='forest',
+                        help='How latency and size are measured: exported forest arrays or the '
+                             'scikit-learn model (default: forest)')
+    parser.add_argument('--objective', choices=['accuracy', 'mae'], default='accuracy',
+                        help='Holdout score traded against latency: exact-label accuracy or mean '
+                             'absolute error of the intensity (default: accuracy)')
+    parser.add_argument('--queries', type=int, default=500, help='Single queries timed per configuration')
+    parser.add_argument('--latency-budget-us', type=float,
+                        help='Pick the best-scoring configuration with p50 latency within this budget')
+    parser.add_argument('--cache-dir', default=TUNING_CACHE_DIR, help='Directory of cached fits')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    os.makedirs(args.cache_dir, exist_ok=True)
+    digest = model_hash(args.snapshot)
+    configurations = [(n_estimators, max_depth or None)
+                      for n_estimators in args.n_estimators for max_depth in args.max_depths]
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(args.processes, initializer=init_worker, initargs=(args.snapshot,)) as pool:
+        futures = [pool.submit(fit_configuration, n_estimators, max_depth, args.cache_dir,
+                               cache_key(digest, n_estimators, max_depth))
+                   for n_estimators, max_depth in configurations]
+        results = [future.result() for future in futures]
+    fitted = sum(not r['cached'] for r in results)
+    print(f"[v0] Fitted {fitted} configurations ({len(results) - fitted} cached) "
+          f"in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    import joblib
+    rng = np.random.default_rng(0)
+    for r in results:
+        r.update(measure_latency(joblib.load(r['model_path']), args.backend, args.queries, rng))
+
+    front = pareto_front(results, args.objective)
+    best = None
+    if args.latency_budget_us is not None:
+        within = [r for r in front if r['p50_us'] <= args.latency_budget_us]
+        best = within[-1] if within else None
+
+    if args.json:
+        print(json.dumps({
+            'snapshot': os.path.abspath(args.snapshot),
+            'backend': args.backend,
+            'objective': args.objective,
+            'results': results,
+            'pareto_front': [(r['n_estimators'], r['max_depth']) for r in front],
+            'best': (best['n_estimators'], best['max_depth']) if best else None,
+        }, indent=2))
+    else:
+        print_table(results, front, best, args.objective)
+        if args.latency_budget_us is not None and best is None:
+            print(f"No configuration meets the {args.latency_budget_us:g} us budget")
+
+if __name__ == '__main__':
+    main()